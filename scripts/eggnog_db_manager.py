@@ -15,6 +15,23 @@ Uso:
     python eggnog_db_manager.py --force        # Descargar sin confirmación
     python eggnog_db_manager.py --clean        # Limpiar archivos temporales
     python eggnog_db_manager.py --info         # Mostrar información detallada
+    python eggnog_db_manager.py --verify       # Verificar integridad (rápida)
+    python eggnog_db_manager.py --verify --full  # Verificar integridad (hash completo)
+
+La descarga usa el motor nativo de eggnog_download.py (bloques en paralelo
+por rangos HTTP, reanudable tras una interrupción y con descompresión y
+sumas SHA-256 al vuelo). --docker usa en su lugar download_eggnog_data.py
+dentro del contenedor de eggNOG-mapper.
+
+La integridad se comprueba contra un manifiesto (eggnog_manifest.py) con
+tamaño, mtime y árbol de hashes de cada archivo: --check sólo compara stat,
+--verify vuelve a hashear los archivos cuyo stat cambió y --verify --full
+hashea todo en paralelo (y registra los archivos que aún no estaban).
+
+El estado se cachea con una firma de stat (directorio y archivos requeridos)
+y se publica de forma atómica en <data_dir>/.status/status.json, que el
+servicio Node de eggNOG lee en /database/status. La comprobación de Docker
+se reutiliza durante EGGNOG_DOCKER_PROBE_TTL segundos (300 por defecto).
 """
 
 import os
@@ -22,10 +39,23 @@ import sys
 import subprocess
 import argparse
 import json
+import time
 from pathlib import Path
 from datetime import datetime
 import shutil
 
+from eggnog_download import (DATABASE_FILES, DEFAULT_BASE_URL, DEFAULT_WORKERS,
+                             DownloadError, download_file, has_resumable_state)
+from eggnog_manifest import DEFAULT_WORKERS as HASH_WORKERS, Manifest, print_progress, summarize
+
+# Estado en JSON para otros servicios (el servidor Node de eggNOG lo lee en
+# /database/status). Vive en un subdirectorio para que reescribirlo no cambie
+# el mtime del directorio de la base de datos, que forma parte de la firma.
+STATUS_DIRNAME = '.status'
+STATUS_FILENAME = 'status.json'
+STATUS_VERSION = 1
+DOCKER_PROBE_TTL = float(os.environ.get('EGGNOG_DOCKER_PROBE_TTL', 300))
+
 class EggNOGDatabaseManager:
     def __init__(self, data_dir='./data/eggnog_db'):
         self.data_dir = Path(data_dir).resolve()
@@ -39,41 +69,132 @@ class EggNOGDatabaseManager:
             'pfam.hmm.h3m',
             'pfam.hmm.h3p'
         ]
+        self.manifest = Manifest(self.data_dir)
+        self.status_path = self.data_dir / STATUS_DIRNAME / STATUS_FILENAME
+        self._required_paths = [(name, str(self.data_dir / name)) for name in self.required_files]
+        # (firma, estado) y (disponible, instante de la comprobación)
+        self._status_cache = None
+        self._docker_probe = None
+        self._load_status_file()
         
     def check_docker(self):
-        """Verificar que Docker esté disponible"""
+        """Verificar que Docker esté disponible (resultado válido DOCKER_PROBE_TTL segundos)"""
+        now = time.time()
+        if self._docker_probe and now - self._docker_probe[1] < DOCKER_PROBE_TTL:
+            return self._docker_probe[0]
+        
+        available = shutil.which('docker') is not None
+        if available:
+            try:
+                subprocess.run(['docker', '--version'], 
+                             capture_output=True, check=True)
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                available = False
+        self._docker_probe = (available, now)
+        self._write_status_file()
+        return available
+    
+    # ========== CACHÉ DE ESTADO ==========
+    
+    def _status_signature(self):
+        """
+        Firma barata del estado en disco: mtime del directorio (altas, bajas y
+        renombrados) y tamaño/mtime de cada archivo requerido (escrituras en
+        el sitio). None si el directorio no existe.
+        """
         try:
-            subprocess.run(['docker', '--version'], 
-                         capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            dir_stat = os.stat(self.data_dir)
+        except FileNotFoundError:
+            return None
+        files = []
+        for file_name, file_path in self._required_paths:
+            try:
+                stat = os.stat(file_path)
+                files.append([file_name, stat.st_size, stat.st_mtime_ns])
+            except FileNotFoundError:
+                files.append([file_name, None, None])
+        return [dir_stat.st_mtime_ns, files]
+    
+    def _load_status_file(self):
+        """Reutilizar el estado y la comprobación de Docker de una ejecución anterior"""
+        try:
+            payload = json.loads(self.status_path.read_text())
+            if payload.get('version') != STATUS_VERSION:
+                return
+            self._status_cache = (payload['signature'], payload['status'])
+            docker = payload.get('docker')
+            if docker:
+                self._docker_probe = (docker['available'], docker['checked_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
+    def _write_status_file(self):
+        """Escribir el estado de forma atómica (archivo temporal + os.replace)"""
+        if self._status_cache is None or self._status_cache[0] is None:
+            return
+        signature, status = self._status_cache
+        payload = {
+            'version': STATUS_VERSION,
+            'generated_at': datetime.now().isoformat(),
+            # En texto: los enteros de 64 bits no caben en un número de JavaScript
+            'directory_mtime_ns': str(signature[0]),
+            'signature': signature,
+            'status': status,
+            'docker': ({'available': self._docker_probe[0], 'checked_at': self._docker_probe[1]}
+                       if self._docker_probe else None)
+        }
+        tmp = self.status_path.with_name(f"{STATUS_FILENAME}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp, self.status_path)
+        except OSError as e:
+            print(f"⚠️  No se pudo escribir {self.status_path}: {e}")
     
     def get_database_status(self):
-        """Obtener estado actual de la base de datos"""
-        if not self.data_dir.exists():
+        """
+        Obtener estado actual de la base de datos
+        
+        El estado se recalcula sólo cuando cambia la firma de _status_signature
+        (unas pocas llamadas a stat); si no, se sirve desde la caché en memoria
+        o desde el archivo de estado escrito por una ejecución anterior.
+        """
+        signature = self._status_signature()
+        if signature is not None and not self.status_path.parent.is_dir():
+            # Crear el subdirectorio cambia el mtime del directorio: firma de nuevo
+            self.status_path.parent.mkdir(exist_ok=True)
+            signature = self._status_signature()
+        if self._status_cache is not None and self._status_cache[0] == signature:
+            return self._status_cache[1]
+        
+        status = self._compute_database_status(signature)
+        self._status_cache = (signature, status)
+        self._write_status_file()
+        return status
+    
+    def _compute_database_status(self, signature):
+        """Calcular el estado a partir de los stat de la firma"""
+        if signature is None:
             return {
                 'status': 'not_found',
                 'files_found': 0,
                 'total_files': len(self.required_files),
                 'size_gb': 0,
-                'last_modified': None
+                'last_modified': None,
+                'missing_files': list(self.required_files)
             }
         
-        files_found = 0
-        total_size = 0
-        last_modified = None
+        present = [(name, size, mtime_ns) for name, size, mtime_ns in signature[1] if size is not None]
+        files_found = len(present)
+        total_size = sum(size for _, size, _ in present)
+        last_modified = max((mtime_ns for _, _, mtime_ns in present), default=None)
         
-        for file_name in self.required_files:
-            file_path = self.data_dir / file_name
-            if file_path.exists():
-                files_found += 1
-                stat = file_path.stat()
-                total_size += stat.st_size
-                if last_modified is None or stat.st_mtime > last_modified:
-                    last_modified = stat.st_mtime
-        
-        if files_found == len(self.required_files):
+        # Sólo stat contra el manifiesto: detecta truncados sin leer datos
+        integrity = summarize(self.manifest.verify([name for name, _, _ in present], mode='stat'))
+        
+        if integrity['problems']:
+            status = 'corrupt'
+        elif files_found == len(self.required_files):
             status = 'complete'
         elif files_found > 0:
             status = 'partial'
@@ -85,7 +206,9 @@ class EggNOGDatabaseManager:
             'files_found': files_found,
             'total_files': len(self.required_files),
             'size_gb': total_size / (1024**3),
-            'last_modified': datetime.fromtimestamp(last_modified).isoformat() if last_modified else None
+            'last_modified': datetime.fromtimestamp(last_modified / 1e9).isoformat() if last_modified else None,
+            'missing_files': [name for name, size, _ in signature[1] if size is None],
+            'integrity': integrity
         }
     
     def print_status(self):
@@ -103,6 +226,17 @@ class EggNOGDatabaseManager:
             print(f"💾 Tamaño: {status['size_gb']:.2f} GB")
             if status['last_modified']:
                 print(f"🕐 Última modificación: {status['last_modified']}")
+            integrity = status['integrity']
+            print(f"🔒 Integridad: {integrity['verified']}/{status['total_files']} archivos coinciden con el manifiesto")
+            if integrity['unrecorded'] or integrity['modified']:
+                print(f"🔄 Recomendación: Ejecutar --verify"
+                      f"{' --full' if integrity['unrecorded'] else ''} para comprobar el contenido")
+        elif status['status'] == 'corrupt':
+            print("❌ Estado: DAÑADA")
+            print(f"📁 Ubicación: {self.data_dir}")
+            for file_name, problem in status['integrity']['problems'].items():
+                print(f"   • {file_name}: {problem}")
+            print("🔄 Recomendación: Ejecutar --download para volver a descargar los archivos dañados")
         elif status['status'] == 'partial':
             print(f"⚠️  Estado: PARCIAL ({status['files_found']}/{status['total_files']} archivos)")
             print(f"📁 Ubicación: {self.data_dir}")
@@ -143,15 +277,17 @@ class EggNOGDatabaseManager:
             else:
                 print("Por favor, responda 's' para sí o 'n' para no.")
     
-    def download_database(self, force=False):
+    def download_database(self, force=False, use_docker=False, workers=DEFAULT_WORKERS,
+                          base_url=DEFAULT_BASE_URL):
         """Descargar base de datos eggNOG"""
-        if not self.check_docker():
-            print("❌ Error: Docker no está disponible. Por favor, instale Docker primero.")
-            return False
-        
         status = self.get_database_status()
         
-        if status['status'] == 'complete' and not force:
+        # 'corrupt' (p. ej. tras --verify) nunca cuenta como completa: se
+        # vuelven a descargar sólo los archivos dañados
+        if status['status'] == 'corrupt' and not force:
+            damaged = ', '.join(status['integrity']['problems'])
+            print(f"⚠️  Archivos dañados que se volverán a descargar: {damaged}")
+        elif status['status'] == 'complete' and not force:
             print("✅ La base de datos ya está completa.")
             print(f"📊 Archivos: {status['files_found']}/{status['total_files']}")
             print(f"💾 Tamaño: {status['size_gb']:.2f} GB")
@@ -167,6 +303,50 @@ class EggNOGDatabaseManager:
         print(f"\n📥 Iniciando descarga de base de datos eggNOG...")
         print(f"📁 Directorio destino: {self.data_dir}")
         
+        if use_docker:
+            return self._download_with_docker()
+        return self._download_native(force, workers, base_url)
+    
+    def _download_native(self, force, workers, base_url):
+        """Descargar con el motor nativo (reanudable, por bloques en paralelo)"""
+        damaged = self.get_database_status().get('integrity', {}).get('problems', {})
+        pending = {name: remote for name, remote in DATABASE_FILES.items()
+                   if force or name in damaged or not (self.data_dir / name).exists()}
+        
+        for file_name, remote_name in pending.items():
+            url = f"{base_url.rstrip('/')}/{remote_name}"
+            print(f"\n🚀 {file_name} <- {url} ({workers} conexiones)")
+            try:
+                result = download_file(url, self.data_dir / file_name, workers=workers)
+            except DownloadError as e:
+                print(f"❌ Error en la descarga: {e}")
+                print("🔄 Vuelva a ejecutar la descarga para reanudarla desde el último bloque completo.")
+                return False
+            except KeyboardInterrupt:
+                print("\n⏸️  Descarga interrumpida; se reanudará en la próxima ejecución.")
+                raise
+            # El árbol de hashes se construyó durante la descarga: no hay que releer el archivo
+            self.manifest.record(file_name, result.tree)
+            self.manifest.save()
+            print(f"✅ {file_name}: {result.size / (1024**3):.2f} GB en {result.seconds:.0f}s")
+            print(f"   Raíz del árbol de hashes: {result.tree.root}")
+        
+        not_native = [f for f in self.required_files
+                      if f not in DATABASE_FILES and not (self.data_dir / f).exists()]
+        if not_native:
+            print("\n⚠️  Archivos no incluidos en la descarga nativa: " + ', '.join(not_native))
+            print("   Use --docker para obtenerlos con download_eggnog_data.py.")
+        
+        print("\n✅ Descarga completada exitosamente!")
+        self.print_status()
+        return True
+    
+    def _download_with_docker(self):
+        """Descargar con download_eggnog_data.py dentro del contenedor"""
+        if not self.check_docker():
+            print("❌ Error: Docker no está disponible. Por favor, instale Docker primero.")
+            return False
+        
         try:
             # Comando para descargar la base de datos
             cmd = [
@@ -208,15 +388,49 @@ class EggNOGDatabaseManager:
             print(f"❌ Error ejecutando descarga: {e}")
             return False
     
-    def clean_temporary_files(self):
-        """Limpiar archivos temporales"""
+    def verify_database(self, full=False, workers=HASH_WORKERS):
+        """Verificar la integridad de los archivos contra el manifiesto"""
+        mode = 'full' if full else 'quick'
+        print(f"\n🔍 Verificación {'completa' if full else 'rápida'} de {self.data_dir}")
+        checks = self.manifest.verify(self.required_files, mode=mode, workers=workers,
+                                      progress=print_progress)
+        
+        icons = {'ok': '✅', 'recorded': '📝', 'modified': '🔄', 'unrecorded': '❔'}
+        for check in checks:
+            icon = '❌' if check.problem else icons.get(check.status, '•')
+            detail = f" ({check.detail})" if check.detail else ''
+            print(f"   {icon} {check.name}: {check.status}{detail}")
+            if check.bad_chunks:
+                shown = ', '.join(str(i) for i in check.bad_chunks[:10])
+                print(f"      Bloques dañados: {shown}{' ...' if len(check.bad_chunks) > 10 else ''}")
+        
+        problems = [c for c in checks if c.problem]
+        if problems:
+            print(f"\n❌ {len(problems)} archivos con problemas. Ejecute --download para repararlos.")
+        elif any(c.status == 'unrecorded' for c in checks):
+            print("\n⚠️  Hay archivos sin registrar; ejecute --verify --full para registrarlos.")
+        else:
+            print("\n✅ Integridad verificada")
+        return not problems
+    
+    def clean_temporary_files(self, discard_partial=False):
+        """
+        Limpiar archivos temporales
+        
+        Las descargas reanudables (.partial con su mapa de bloques .download)
+        se conservan salvo con discard_partial=True.
+        """
         temp_extensions = ['.tmp', '.temp', '.download', '.partial']
         cleaned_files = []
+        kept_files = []
         
         if self.data_dir.exists():
             for file_path in self.data_dir.rglob('*'):
                 if file_path.is_file():
                     if any(file_path.name.endswith(ext) for ext in temp_extensions):
+                        if not discard_partial and has_resumable_state(file_path):
+                            kept_files.append(file_path.name)
+                            continue
                         try:
                             file_path.unlink()
                             cleaned_files.append(file_path.name)
@@ -229,6 +443,10 @@ class EggNOGDatabaseManager:
                 print(f"   • {file_name}")
         else:
             print("✨ No se encontraron archivos temporales para limpiar")
+        
+        if kept_files:
+            print(f"♻️  Descargas reanudables conservadas: {len(kept_files)} archivos "
+                  f"(use --discard-partial para eliminarlas)")
     
     def get_detailed_info(self):
         """Obtener información detallada"""
@@ -244,17 +462,15 @@ class EggNOGDatabaseManager:
         }
         
         if status['status'] == 'complete':
-            # Obtener información detallada de cada archivo
-            file_details = {}
-            for file_name in self.required_files:
-                file_path = self.data_dir / file_name
-                if file_path.exists():
-                    stat = file_path.stat()
-                    file_details[file_name] = {
-                        'size_mb': stat.st_size / (1024**2),
-                        'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    }
-            info['file_details'] = file_details
+            # Detalle de cada archivo desde los stat de la firma del estado
+            info['file_details'] = {
+                file_name: {
+                    'size_mb': size / (1024**2),
+                    'modified': datetime.fromtimestamp(mtime_ns / 1e9).isoformat()
+                }
+                for file_name, size, mtime_ns in self._status_cache[0][1]
+                if size is not None
+            }
         
         return info
     
@@ -276,6 +492,10 @@ class EggNOGDatabaseManager:
         print(f"   Estado: {status['status'].upper()}")
         print(f"   Archivos encontrados: {status['files_found']}/{status['total_files']}")
         print(f"   Tamaño total: {status['size_gb']:.2f} GB")
+        integrity = status.get('integrity')
+        if integrity:
+            print(f"   Integridad: {integrity['verified']} verificados, "
+                  f"{len(integrity['unrecorded'])} sin registrar, {len(integrity['problems'])} con problemas")
         
         if 'file_details' in info:
             print(f"\n📋 DETALLES DE ARCHIVOS:")
@@ -302,7 +522,11 @@ Ejemplos de uso:
   python %(prog)s --download                 # Descargar con confirmación
   python %(prog)s --force                    # Descargar sin confirmación
   python %(prog)s --clean                    # Limpiar archivos temporales
+  python %(prog)s --download --workers 8     # Descarga nativa con 8 conexiones
+  python %(prog)s --download --docker        # Descargar con el contenedor de eggNOG-mapper
   python %(prog)s --info                     # Información detallada
+  python %(prog)s --verify                   # Verificar integridad (sólo archivos modificados)
+  python %(prog)s --verify --full            # Verificar integridad (hash completo en paralelo)
   python %(prog)s --data-dir /path/to/db     # Usar directorio personalizado
         """
     )
@@ -321,10 +545,23 @@ Ejemplos de uso:
                        help='Directorio de la base de datos (default: ./data/eggnog_db)')
     parser.add_argument('--json', action='store_true',
                        help='Salida en formato JSON')
+    parser.add_argument('--docker', action='store_true',
+                       help='Descargar con download_eggnog_data.py en Docker en lugar del motor nativo')
+    parser.add_argument('--verify', action='store_true',
+                       help='Verificar la integridad de los archivos contra el manifiesto')
+    parser.add_argument('--full', action='store_true',
+                       help='Con --verify, hashear todos los archivos (y registrar los nuevos)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help=f'Conexiones de la descarga nativa (default: {DEFAULT_WORKERS}) '
+                            f'o hilos de --verify (default: {HASH_WORKERS})')
+    parser.add_argument('--mirror', default=DEFAULT_BASE_URL,
+                       help='URL base de los archivos de la base de datos (default: EGGNOG_DB_BASE_URL o eggnog5.embl.de)')
+    parser.add_argument('--discard-partial', action='store_true',
+                       help='Con --clean, eliminar también las descargas reanudables')
     
     args = parser.parse_args()
     
-    if not any([args.check, args.download, args.force, args.clean, args.info]):
+    if not any([args.check, args.download, args.force, args.clean, args.info, args.verify]):
         parser.print_help()
         return
     
@@ -345,11 +582,17 @@ Ejemplos de uso:
             else:
                 manager.print_status()
         
+        elif args.verify:
+            if not manager.verify_database(full=args.full, workers=args.workers or HASH_WORKERS):
+                sys.exit(1)
+        
         elif args.clean:
-            manager.clean_temporary_files()
+            manager.clean_temporary_files(discard_partial=args.discard_partial)
         
         elif args.download or args.force:
-            success = manager.download_database(force=args.force)
+            success = manager.download_database(force=args.force, use_docker=args.docker,
+                                                workers=args.workers or DEFAULT_WORKERS,
+                                                base_url=args.mirror)
             if not success:
                 sys.exit(1)
     
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Motor de Descarga Reanudable para la Base de Datos eggNOG
+=========================================================
+
+Descarga archivos grandes (la base de datos completa son decenas de GB) por
+rangos HTTP en paralelo, sin depender de Docker ni de download_eggnog_data.py:
+
+- El archivo remoto se divide en bloques de chunk_bytes que descargan varios
+  hilos con peticiones `Range`; cada hilo escribe su bloque en su posición
+  del archivo `<remoto>.partial`.
+- Un mapa de bits de bloques terminados se guarda (de forma atómica) en
+  `<remoto>.download` después de sincronizar los datos del bloque; al
+  relanzar la descarga sólo se piden los bloques que faltan. Si el archivo
+  remoto cambió (tamaño, ETag o Last-Modified) se empieza de cero.
+- Mientras los hilos descargan, el hilo principal sigue el prefijo contiguo
+  de bloques terminados: calcula el SHA-256 (y MD5) de los bytes tal como
+  se sirven y, si el archivo es .gz, lo descomprime directamente en
+  `<destino>.partial` (zlib verifica el CRC de cada miembro gzip), a la vez
+  que construye el árbol de hashes del manifiesto de integridad
+  (eggnog_manifest.py). No hay una pasada de verificación ni de
+  descompresión al final.
+- Al terminar se comprueba la suma esperada, si se conoce, y el archivo se
+  mueve a su sitio con os.replace.
+
+Para probar la descarga o montar un espejo en la red local, `serve` sirve
+un directorio con soporte de rangos:
+
+    python eggnog_download.py serve ./espejo --port 8765
+    python eggnog_download.py download http://localhost:8765/eggnog.db.gz ./data/eggnog_db/eggnog.db
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+from eggnog_manifest import HashTree, TreeHasher
+
+DEFAULT_BASE_URL = os.environ.get('EGGNOG_DB_BASE_URL',
+                                  'http://eggnog5.embl.de/download/emapperdb-5.0.2')
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_WORKERS = 4
+BLOCK_BYTES = 1024 * 1024
+RETRIES = 5
+TIMEOUT = 60
+PROGRESS_INTERVAL = 5.0
+
+PARTIAL_SUFFIX = '.partial'
+STATE_SUFFIX = '.download'
+
+# Archivo local -> archivo remoto (relativo a DEFAULT_BASE_URL)
+DATABASE_FILES = {
+    'eggnog.db': 'eggnog.db.gz',
+    'eggnog_proteins.dmnd': 'eggnog_proteins.dmnd.gz',
+}
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class DownloadError(Exception):
+    """Error irrecuperable de descarga (tras agotar los reintentos)."""
+
+
+class RemoteFile(NamedTuple):
+    """Metadatos de un archivo remoto."""
+    url: str
+    size: Optional[int]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    accepts_ranges: bool
+
+
+class DownloadResult(NamedTuple):
+    """Resultado de una descarga completada."""
+    path: Path
+    size: int
+    source_size: int
+    source_sha256: str
+    source_md5: str
+    tree: HashTree
+    resumed_bytes: int
+    seconds: float
+
+
+def probe(url: str, timeout: float = TIMEOUT) -> RemoteFile:
+    """
+    Consultar tamaño, validadores y soporte de rangos de un archivo remoto.
+
+    Se pide el primer byte con `Range: bytes=0-0` en lugar de HEAD (que
+    algunos espejos no implementan): un 206 confirma el soporte de rangos y
+    Content-Range da el tamaño total.
+    """
+    request = Request(url, headers={'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            headers = response.headers
+            match = _CONTENT_RANGE.match(headers.get('Content-Range', ''))
+            if response.status == 206 and match and match.group(3) != '*':
+                size, accepts_ranges = int(match.group(3)), True
+            else:
+                length = headers.get('Content-Length')
+                size, accepts_ranges = (int(length) if length else None), False
+            return RemoteFile(url, size, headers.get('ETag'), headers.get('Last-Modified'), accepts_ranges)
+    except HTTPError as e:
+        if e.code == 416:  # archivo vacío: no hay byte 0
+            return RemoteFile(url, 0, e.headers.get('ETag'), e.headers.get('Last-Modified'), True)
+        raise DownloadError(f"{url}: HTTP {e.code}") from e
+    except URLError as e:
+        raise DownloadError(f"{url}: {e.reason}") from e
+
+
+class ChunkBitmap:
+    """Mapa de bits de bloques terminados, serializable como hexadecimal."""
+
+    def __init__(self, count: int, bits: Optional[bytearray] = None):
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((count + 7) // 8)
+
+    def set(self, index: int) -> None:
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def done(self) -> int:
+        return sum(bin(byte).count('1') for byte in self.bits)
+
+    def missing(self):
+        return [i for i in range(self.count) if i not in self]
+
+    def to_hex(self) -> str:
+        return self.bits.hex()
+
+    @classmethod
+    def from_hex(cls, count: int, value: str) -> 'ChunkBitmap':
+        bits = bytearray.fromhex(value)
+        if len(bits) != (count + 7) // 8:
+            raise ValueError('mapa de bits de longitud incorrecta')
+        return cls(count, bits)
+
+
+def _parse_checksum(checksum: Optional[str]) -> Optional[Tuple[str, str]]:
+    """'sha256:<hex>' o 'md5:<hex>' -> (algoritmo, hex)."""
+    if not checksum:
+        return None
+    algorithm, _, digest = checksum.partition(':')
+    algorithm = algorithm.lower()
+    if algorithm not in ('sha256', 'md5') or not digest:
+        raise ValueError(f"Suma de verificación no válida: {checksum} (use sha256:<hex> o md5:<hex>)")
+    return algorithm, digest.lower()
+
+
+def _fsync(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _replace_json(path: Path, payload: dict) -> None:
+    """Escribir JSON de forma atómica (archivo temporal + os.replace)."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+        _fsync(f)
+    os.replace(tmp, path)
+
+
+class ChunkedDownload:
+    """
+    Descarga reanudable de un archivo por bloques en paralelo.
+
+    Args:
+        url: URL del archivo remoto
+        target: Ruta final (sin .gz si se descomprime)
+        chunk_bytes: Tamaño de cada bloque pedido con Range
+        workers: Hilos de descarga simultáneos
+        decompress: Descomprimir gzip al vuelo (por defecto, si la URL acaba en .gz)
+        checksum: Suma esperada de los bytes servidos, 'sha256:<hex>' o 'md5:<hex>'
+        progress: Función llamada con (bytes descargados, tamaño total o None)
+    """
+
+    def __init__(self, url: str, target: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 workers: int = DEFAULT_WORKERS, decompress: Optional[bool] = None,
+                 checksum: Optional[str] = None,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 timeout: float = TIMEOUT):
+        self.url = url
+        self.target = Path(target)
+        self.chunk_bytes = int(chunk_bytes)
+        self.workers = max(1, int(workers))
+        remote_name = Path(urlparse(url).path).name or self.target.name
+        self.decompress = remote_name.endswith('.gz') if decompress is None else decompress
+        self.checksum = _parse_checksum(checksum)
+        self.progress = progress or self._print_progress
+        self.timeout = timeout
+
+        self.part_path = self.target.parent / (remote_name + PARTIAL_SUFFIX)
+        self.state_path = self.target.parent / (remote_name + STATE_SUFFIX)
+        self.output_path = self.target.with_name(self.target.name + PARTIAL_SUFFIX)
+
+        self.remote: Optional[RemoteFile] = None
+        self.bitmap: Optional[ChunkBitmap] = None
+        self._downloaded = 0
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._last_report = 0.0
+
+    # ========== ESTADO ==========
+
+    def _chunk_range(self, index: int) -> Tuple[int, Optional[int]]:
+        """Primer y último byte (inclusive) del bloque; None si el tamaño es desconocido."""
+        start = index * self.chunk_bytes
+        if self.remote.size is None:
+            return start, None
+        return start, min(start + self.chunk_bytes, self.remote.size) - 1
+
+    def _state_payload(self) -> dict:
+        return {
+            'url': self.url,
+            'size': self.remote.size,
+            'etag': self.remote.etag,
+            'last_modified': self.remote.last_modified,
+            'chunk_bytes': self.chunk_bytes,
+            'bitmap': self.bitmap.to_hex()
+        }
+
+    def _load_state(self) -> Optional[ChunkBitmap]:
+        """Mapa de bloques de una descarga anterior del mismo archivo remoto."""
+        if not (self.state_path.exists() and self.part_path.exists()):
+            return None
+        try:
+            state = json.loads(self.state_path.read_text())
+            if (state['url'], state['size'], state['etag'], state['last_modified']) != (
+                    self.url, self.remote.size, self.remote.etag, self.remote.last_modified):
+                print(f"🔄 {self.target.name}: el archivo remoto cambió, se descarga de nuevo")
+                return None
+            self.chunk_bytes = int(state['chunk_bytes'])
+            count = -(-self.remote.size // self.chunk_bytes)
+            return ChunkBitmap.from_hex(count, state['bitmap'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Estado de descarga ilegible ({e}), se descarga de nuevo")
+            return None
+
+    def _prepare(self) -> int:
+        """Cargar o crear el estado; devuelve los bytes ya descargados."""
+        self.remote = probe(self.url, self.timeout)
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+
+        if not self.remote.accepts_ranges:
+            # Sin rangos no se puede paralelizar ni reanudar: un único bloque
+            print(f"⚠️  {urlparse(self.url).netloc} no admite rangos HTTP: descarga secuencial sin reanudación")
+            self.workers = 1
+            self.chunk_bytes = max(self.remote.size or 0, 1)
+            self.bitmap = ChunkBitmap(1)
+            self.state_path.unlink(missing_ok=True)
+            open(self.part_path, 'wb').close()
+            return 0
+
+        self.bitmap = self._load_state()
+        if self.bitmap is None:
+            self.bitmap = ChunkBitmap(-(-self.remote.size // self.chunk_bytes))
+            with open(self.part_path, 'wb') as f:
+                f.truncate(self.remote.size)  # disperso donde el sistema lo permite
+            _replace_json(self.state_path, self._state_payload())
+            return 0
+        return sum(self._chunk_size(i) for i in range(self.bitmap.count) if i in self.bitmap)
+
+    def _chunk_size(self, index: int) -> int:
+        start, end = self._chunk_range(index)
+        return end - start + 1
+
+    # ========== DESCARGA DE BLOQUES ==========
+
+    def _fetch_chunk(self, index: int) -> None:
+        """Descargar un bloque (con reintentos) y marcarlo como terminado."""
+        start, end = self._chunk_range(index)
+        for attempt in range(1, RETRIES + 1):
+            if self._stop.is_set():
+                return
+            received = 0
+            try:
+                headers = {'Accept-Encoding': 'identity'}
+                if self.remote.accepts_ranges:
+                    headers['Range'] = f'bytes={start}-{end}'
+                with urlopen(Request(self.url, headers=headers), timeout=self.timeout) as response, \
+                        open(self.part_path, 'r+b') as f:
+                    if self.remote.accepts_ranges and response.status != 206:
+                        raise DownloadError(f"el servidor ignoró Range (HTTP {response.status})")
+                    f.seek(start)
+                    while not self._stop.is_set():
+                        block = response.read(BLOCK_BYTES)
+                        if not block:
+                            break
+                        f.write(block)
+                        received += len(block)
+                        self._add_progress(len(block))
+                    if self._stop.is_set():
+                        return
+                    if end is not None and received != end - start + 1:
+                        raise DownloadError(f"bloque {index} incompleto ({received} de {end - start + 1} bytes)")
+                    _fsync(f)
+                self._complete(index)
+                return
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                self._add_progress(-received)
+                if attempt == RETRIES or isinstance(e, HTTPError) and e.code in (403, 404, 410):
+                    raise DownloadError(f"{self.target.name}: bloque {index}: {e}") from e
+                time.sleep(min(2 ** attempt, 30))
+
+    def _add_progress(self, nbytes: int) -> None:
+        with self._lock:
+            self._downloaded += nbytes
+
+    def _complete(self, index: int) -> None:
+        """Marcar el bloque (sus datos ya están sincronizados) y persistir el mapa."""
+        with self._lock:
+            self.bitmap.set(index)
+            if self.remote.accepts_ranges:
+                _replace_json(self.state_path, self._state_payload())
+            self._lock.notify_all()
+
+    def _worker_failed(self, future) -> None:
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            with self._lock:
+                if self._error is None:
+                    self._error = error
+                self._stop.set()
+                self._lock.notify_all()
+
+    # ========== CONSUMO SECUENCIAL ==========
+
+    def _wait_for(self, index: int) -> None:
+        """Esperar a que el bloque esté descargado, informando del progreso."""
+        with self._lock:
+            while index not in self.bitmap:
+                if self._error is not None:
+                    raise self._error
+                self._lock.wait(timeout=1.0)
+                self._report()
+        self._report()
+
+    def _report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self.progress(self._downloaded, self.remote.size)
+
+    def _print_progress(self, downloaded: int, total: Optional[int]) -> None:
+        if total:
+            print(f"📥 {self.target.name}: {downloaded / total:6.1%} "
+                  f"({downloaded / 1024 ** 2:,.0f}/{total / 1024 ** 2:,.0f} MB)")
+        else:
+            print(f"📥 {self.target.name}: {downloaded / 1024 ** 2:,.0f} MB")
+
+    def _consume(self, sink) -> tuple:
+        """
+        Recorrer los bloques en orden a medida que terminan.
+
+        Calcula las sumas de los bytes servidos y entrega cada bloque a
+        `sink` (descompresión) sin esperar al final de la descarga.
+
+        Returns:
+            (bytes leídos, hash SHA-256, hash MD5)
+        """
+        sha256, md5 = hashlib.sha256(), hashlib.md5()
+        total = 0
+        with open(self.part_path, 'rb') as f:
+            for index in range(self.bitmap.count):
+                self._wait_for(index)
+                start, end = self._chunk_range(index)
+                f.seek(start)
+                remaining = None if end is None else end - start + 1
+                while remaining != 0:
+                    block = f.read(BLOCK_BYTES if remaining is None else min(BLOCK_BYTES, remaining))
+                    if not block:
+                        break
+                    if remaining is not None:
+                        remaining -= len(block)
+                    sha256.update(block)
+                    md5.update(block)
+                    total += len(block)
+                    sink(block)
+        return total, sha256, md5
+
+    # ========== EJECUCIÓN ==========
+
+    def run(self) -> DownloadResult:
+        """Descargar (o reanudar) y dejar el archivo en su sitio."""
+        started = time.monotonic()
+        resumed = self._prepare()
+        self._downloaded = resumed
+        if resumed:
+            print(f"♻️  {self.target.name}: reanudando, {resumed / 1024 ** 2:,.0f} MB ya descargados")
+
+        tree = TreeHasher()
+        output = open(self.output_path, 'wb') if self.decompress else None
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+        def sink(block: bytes) -> None:
+            nonlocal decompressor
+            if output is None:
+                tree.update(block)
+                return
+            while block:
+                data = decompressor.decompress(block)
+                tree.update(data)
+                output.write(data)
+                # Archivos gzip de varios miembros (p. ej. generados con bgzip o pigz)
+                block = decompressor.unused_data if decompressor.eof else b''
+                if block:
+                    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='eggnog-download')
+        try:
+            for index in self.bitmap.missing():
+                pool.submit(self._fetch_chunk, index).add_done_callback(self._worker_failed)
+            try:
+                source_size, source_sha256, source_md5 = self._consume(sink)
+            except zlib.error as e:
+                raise DownloadError(f"{self.target.name}: gzip corrupto ({e})") from e
+            if output is not None:
+                tail = decompressor.flush()
+                tree.update(tail)
+                output.write(tail)
+                if not decompressor.eof and source_size:
+                    raise DownloadError(f"{self.target.name}: gzip truncado")
+                _fsync(output)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if output is not None:
+                output.close()
+        self._report(force=True)
+
+        if self.checksum:
+            algorithm, expected = self.checksum
+            actual = (source_sha256 if algorithm == 'sha256' else source_md5).hexdigest()
+            if actual != expected:
+                # Los bloques no son fiables: la próxima descarga empieza de cero
+                for path in (self.state_path, self.part_path, self.output_path):
+                    path.unlink(missing_ok=True)
+                raise DownloadError(f"{self.target.name}: {algorithm} no coincide "
+                                    f"(esperado {expected}, obtenido {actual})")
+
+        if self.decompress:
+            os.replace(self.output_path, self.target)
+            self.part_path.unlink(missing_ok=True)
+        else:
+            os.replace(self.part_path, self.target)
+        self.state_path.unlink(missing_ok=True)
+
+        return DownloadResult(
+            path=self.target,
+            size=self.target.stat().st_size,
+            source_size=source_size,
+            source_sha256=source_sha256.hexdigest(),
+            source_md5=source_md5.hexdigest(),
+            tree=tree.tree(),
+            resumed_bytes=resumed,
+            seconds=time.monotonic() - started
+        )
+
+
+def download_file(url: str, target: Path, **kwargs) -> DownloadResult:
+    """Atajo para ChunkedDownload(url, target, **kwargs).run()."""
+    return ChunkedDownload(url, target, **kwargs).run()
+
+
+def has_resumable_state(path: Path) -> bool:
+    """¿Es `path` (.partial o .download) parte de una descarga reanudable?"""
+    name = path.name
+    for suffix in (PARTIAL_SUFFIX, STATE_SUFFIX):
+        if name.endswith(suffix):
+            stem = name[:-len(suffix)]
+            return (path.with_name(stem + STATE_SUFFIX).exists()
+                    and path.with_name(stem + PARTIAL_SUFFIX).exists())
+    return False
+
+
+# ========== ESPEJO LOCAL ==========
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler con soporte de `Range: bytes=a-b` (un solo rango)."""
+
+    def send_head(self):
+        range_header = self.headers.get('Range')
+        path = self.translate_path(self.path)
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header or '')
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        first, last = match.groups()
+        if first:
+            start, end = int(first), int(last) if last else size - 1
+        elif last:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            return super().send_head()
+        if start >= size or start > end:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.end_headers()
+            return None
+
+        end = min(end, size - 1)
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', self.date_time_string(int(os.path.getmtime(path))))
+        self.end_headers()
+        self._range_remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, '_range_remaining', None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            block = source.read(min(BLOCK_BYTES, remaining))
+            if not block:
+                break
+            outputfile.write(block)
+            remaining -= len(block)
+        self._range_remaining = None
+
+
+def serve_directory(root: Path, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """Servidor HTTP con rangos sobre `root` (llamar a serve_forever() o usar en un hilo)."""
+    return ThreadingHTTPServer((host, port), partial(RangeRequestHandler, directory=str(root)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Descarga reanudable por bloques (base de datos eggNOG)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    download = sub.add_parser('download', help='Descargar (o reanudar) un archivo')
+    download.add_argument('url')
+    download.add_argument('target', type=Path)
+    download.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    download.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024))
+    download.add_argument('--checksum', help="Suma esperada: sha256:<hex> o md5:<hex>")
+    download.add_argument('--no-decompress', action='store_true', help='No descomprimir .gz')
+
+    serve = sub.add_parser('serve', help='Servir un directorio con soporte de rangos (espejo local)')
+    serve.add_argument('root', type=Path)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        server = serve_directory(args.root, args.host, args.port)
+        print(f"🌐 Sirviendo {args.root.resolve()} en http://{args.host}:{server.server_port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    try:
+        result = download_file(args.url, args.target, workers=args.workers,
+                               chunk_bytes=args.chunk_mb * 1024 * 1024, checksum=args.checksum,
+                               decompress=False if args.no_decompress else None)
+    except KeyboardInterrupt:
+        print("\n⏸️  Descarga interrumpida; vuelva a ejecutar el comando para reanudarla.")
+        sys.exit(1)
+    except DownloadError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ {result.path} ({result.size / 1024 ** 2:,.1f} MB) en {result.seconds:.1f}s")
+    print(f"   raíz del árbol de hashes: {result.tree.root}")
+
+
+if __name__ == '__main__':
+    main()
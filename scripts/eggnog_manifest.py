@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Manifiesto de Integridad de la Base de Datos eggNOG
+===================================================
+
+Comprobar que los archivos existen no basta: un eggnog.db truncado o un
+pfam.hmm.h3m corrupto pasan por "completos". Rehacer el hash de ~50 GB en
+cada arranque tampoco es viable, así que el manifiesto
+(`<data_dir>/.eggnog_manifest.json`) guarda por archivo:
+
+- tamaño y mtime (st_mtime_ns) de la última verificación
+- un árbol de hashes de dos niveles: el SHA-256 de cada bloque de
+  chunk_bytes y una raíz, el SHA-256 de la concatenación de los hashes de
+  bloque. Una discrepancia señala qué bloques están dañados.
+- el veredicto de la última verificación que falló ('state': 'corrupt',
+  bloques dañados y mtime del archivo en ese momento), que se mantiene hasta
+  que el archivo se vuelve a registrar (p. ej. al descargarlo de nuevo).
+
+Niveles de verificación:
+
+- stat: sólo os.stat; un tamaño distinto al registrado o un veredicto
+  'corrupt' es un error, un mtime distinto deja el archivo como 'modified'.
+  No lee datos (para get_database_status).
+- quick: como stat, pero los archivos cuyo stat cambió (desde el registro o
+  desde el veredicto 'corrupt') se vuelven a hashear y se comparan con el
+  árbol registrado; si coinciden se actualiza el stat.
+- full: se hashean todos los archivos; los que no estaban en el manifiesto se
+  registran (confianza en el primer uso).
+
+El hash se reparte por bloques entre varios hilos (hashlib y la lectura de
+archivos liberan el GIL) con informe de progreso. El motor de descarga
+construye el mismo árbol mientras descomprime (TreeHasher), de modo que un
+archivo recién descargado queda registrado sin volver a leerlo.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MANIFEST_NAME = '.eggnog_manifest.json'
+MANIFEST_VERSION = 1
+DEFAULT_TREE_CHUNK_BYTES = 64 * 1024 * 1024
+READ_BYTES = 4 * 1024 * 1024
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+PROGRESS_INTERVAL = 5.0
+
+VERIFY_MODES = ('stat', 'quick', 'full')
+# Estados que indican un archivo dañado o incompleto
+PROBLEM_STATUSES = ('missing', 'truncated', 'size_changed', 'corrupt')
+
+
+class HashTree(NamedTuple):
+    """Árbol de hashes de un archivo: SHA-256 por bloque y raíz."""
+    chunk_bytes: int
+    size: int
+    chunks: List[str]
+    root: str
+
+    @classmethod
+    def from_chunks(cls, chunk_bytes: int, size: int, chunks: List[str]) -> 'HashTree':
+        root = hashlib.sha256(b''.join(bytes.fromhex(c) for c in chunks)).hexdigest()
+        return cls(chunk_bytes, size, chunks, root)
+
+    def mismatched_chunks(self, other: 'HashTree') -> List[int]:
+        """Índices de bloque cuyo hash difiere (incluye los que sobran o faltan)."""
+        longest = max(len(self.chunks), len(other.chunks))
+        return [i for i in range(longest)
+                if i >= len(self.chunks) or i >= len(other.chunks) or self.chunks[i] != other.chunks[i]]
+
+
+class TreeHasher:
+    """Construcción incremental de un HashTree a partir de un flujo de bytes."""
+
+    def __init__(self, chunk_bytes: int = DEFAULT_TREE_CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self.size = 0
+        self._chunks: List[str] = []
+        self._current = hashlib.sha256()
+        self._filled = 0
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.chunk_bytes - self._filled)
+            self._current.update(view[:take])
+            self._filled += take
+            self.size += take
+            view = view[take:]
+            if self._filled == self.chunk_bytes:
+                self._chunks.append(self._current.hexdigest())
+                self._current = hashlib.sha256()
+                self._filled = 0
+
+    def tree(self) -> HashTree:
+        chunks = list(self._chunks)
+        if self._filled:
+            chunks.append(self._current.hexdigest())
+        return HashTree.from_chunks(self.chunk_bytes, self.size, chunks)
+
+
+class FileCheck(NamedTuple):
+    """Resultado de verificar un archivo."""
+    name: str
+    status: str  # ok, recorded, modified, unrecorded, missing, truncated, size_changed, corrupt
+    detail: str = ''
+    bad_chunks: Tuple[int, ...] = ()
+
+    @property
+    def problem(self) -> bool:
+        return self.status in PROBLEM_STATUSES
+
+
+# ========== HASH EN PARALELO ==========
+
+def _hash_chunk(path: Path, offset: int, length: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while length > 0:
+            block = f.read(min(READ_BYTES, length))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest.hexdigest()
+
+
+def hash_files(paths: Iterable[Path], chunk_bytes: int = DEFAULT_TREE_CHUNK_BYTES,
+               workers: int = DEFAULT_WORKERS,
+               progress: Optional[Callable[[int, int], None]] = None) -> Dict[Path, HashTree]:
+    """
+    Árbol de hashes de varios archivos, repartiendo los bloques entre hilos.
+
+    Args:
+        paths: Archivos a hashear
+        chunk_bytes: Tamaño de bloque del árbol
+        workers: Hilos de hash simultáneos
+        progress: Función llamada periódicamente con (bytes hasheados, bytes totales)
+
+    Returns:
+        Árbol por archivo
+    """
+    sizes = {Path(path): Path(path).stat().st_size for path in paths}
+    total = sum(sizes.values())
+    done = 0
+    lock = threading.Lock()
+    last_report = [time.monotonic()]
+
+    def task(path: Path, offset: int, length: int) -> str:
+        nonlocal done
+        digest = _hash_chunk(path, offset, length)
+        with lock:
+            done += length
+            now = time.monotonic()
+            if progress and now - last_report[0] >= PROGRESS_INTERVAL:
+                last_report[0] = now
+                progress(done, total)
+        return digest
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='eggnog-hash') as pool:
+        futures = {
+            path: [pool.submit(task, path, offset, min(chunk_bytes, size - offset))
+                   for offset in range(0, size, chunk_bytes)]
+            for path, size in sizes.items()
+        }
+        trees = {path: HashTree.from_chunks(chunk_bytes, sizes[path], [f.result() for f in chunk_futures])
+                 for path, chunk_futures in futures.items()}
+    if progress:
+        progress(done, total)
+    return trees
+
+
+def print_progress(done: int, total: int) -> None:
+    """Progreso por defecto de la verificación completa."""
+    if total:
+        print(f"🔍 Verificando: {done / total:6.1%} ({done / 1024 ** 3:.2f}/{total / 1024 ** 3:.2f} GB)")
+
+
+# ========== MANIFIESTO ==========
+
+class Manifest:
+    """
+    Manifiesto de integridad de un directorio de base de datos.
+
+    Uso:
+        manifest = Manifest(data_dir)
+        checks = manifest.verify(required_files, mode='quick')
+    """
+
+    def __init__(self, data_dir: Path, chunk_bytes: int = DEFAULT_TREE_CHUNK_BYTES):
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / MANIFEST_NAME
+        self.chunk_bytes = chunk_bytes
+        self.files: Dict[str, dict] = {}
+        self._loaded_mtime = None
+        self.load()
+
+    def load(self) -> None:
+        """Leer el manifiesto (vacío si no existe o no es válido)."""
+        try:
+            stat = self.path.stat()
+            if stat.st_mtime_ns == self._loaded_mtime:
+                return
+            payload = json.loads(self.path.read_text())
+            if payload.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"versión {payload.get('version')}")
+            self.files = payload['files']
+            self._loaded_mtime = stat.st_mtime_ns
+        except FileNotFoundError:
+            self.files = {}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Manifiesto de integridad ilegible ({e}), se ignora")
+            self.files = {}
+
+    def save(self) -> None:
+        """Guardar de forma atómica (archivo temporal + os.replace)."""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._loaded_mtime = self.path.stat().st_mtime_ns
+
+    def record(self, name: str, tree: HashTree, stat: Optional[os.stat_result] = None) -> None:
+        """Registrar el árbol de un archivo junto con su stat actual."""
+        stat = stat or (self.data_dir / name).stat()
+        self.files[name] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'chunk_bytes': tree.chunk_bytes,
+            'root': tree.root,
+            'chunks': tree.chunks,
+            'verified_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+
+    def mark_corrupt(self, name: str, bad_chunks: Iterable[int], stat: os.stat_result) -> None:
+        """Guardar el veredicto de una verificación fallida (se conserva el árbol válido)."""
+        entry = self.files[name]
+        entry['state'] = 'corrupt'
+        entry['bad_chunks'] = list(bad_chunks)
+        entry['corrupt_mtime_ns'] = stat.st_mtime_ns
+        entry['verified_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    def tree(self, name: str) -> Optional[HashTree]:
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        return HashTree(entry['chunk_bytes'], entry['size'], entry['chunks'], entry['root'])
+
+    def verify(self, names: Iterable[str], mode: str = 'quick', workers: int = DEFAULT_WORKERS,
+               progress: Optional[Callable[[int, int], None]] = None) -> List[FileCheck]:
+        """
+        Verificar archivos contra el manifiesto.
+
+        Args:
+            names: Archivos (relativos a data_dir)
+            mode: 'stat', 'quick' o 'full' (ver la documentación del módulo)
+            workers: Hilos de hash
+            progress: Progreso del hash, (bytes hasheados, bytes totales)
+
+        Returns:
+            Un FileCheck por archivo, en el orden de `names`
+        """
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Modo de verificación no válido: {mode} (use {', '.join(VERIFY_MODES)})")
+        self.load()
+
+        checks: Dict[str, FileCheck] = {}
+        stats: Dict[str, os.stat_result] = {}
+        to_hash: Dict[str, Optional[HashTree]] = {}
+        names = list(names)
+
+        for name in names:
+            try:
+                stat = (self.data_dir / name).stat()
+            except FileNotFoundError:
+                checks[name] = FileCheck(name, 'missing')
+                continue
+            stats[name] = stat
+            entry = self.files.get(name)
+            if entry is None:
+                if mode == 'full':
+                    to_hash[name] = None
+                else:
+                    checks[name] = FileCheck(name, 'unrecorded', 'sin registro en el manifiesto')
+                continue
+            if stat.st_size != entry['size']:
+                status = 'truncated' if stat.st_size < entry['size'] else 'size_changed'
+                checks[name] = FileCheck(name, status, f"{stat.st_size} bytes, registrados {entry['size']}")
+                continue
+            if entry.get('state') == 'corrupt':
+                # El veredicto vale mientras el archivo no cambie; full siempre rehace el hash
+                if mode == 'stat' or (mode == 'quick' and stat.st_mtime_ns == entry['corrupt_mtime_ns']):
+                    bad = tuple(entry['bad_chunks'])
+                    checks[name] = FileCheck(name, 'corrupt', f"{len(bad)} bloques distintos "
+                                             f"(verificado {entry['verified_at']})", bad)
+                else:
+                    to_hash[name] = self.tree(name)
+                continue
+            unchanged = stat.st_mtime_ns == entry['mtime_ns']
+            if mode == 'full' or (mode == 'quick' and not unchanged):
+                to_hash[name] = self.tree(name)
+            elif unchanged:
+                checks[name] = FileCheck(name, 'ok')
+            else:
+                checks[name] = FileCheck(name, 'modified', 'mtime distinto al registrado')
+
+        changed = False
+        if to_hash:
+            # Se respeta el tamaño de bloque con el que se registró cada archivo
+            by_chunk: Dict[int, List[str]] = {}
+            for name, recorded in to_hash.items():
+                by_chunk.setdefault(recorded.chunk_bytes if recorded else self.chunk_bytes, []).append(name)
+            trees: Dict[str, HashTree] = {}
+            for chunk_bytes, group in by_chunk.items():
+                hashed = hash_files([self.data_dir / name for name in group], chunk_bytes, workers, progress)
+                trees.update({name: hashed[self.data_dir / name] for name in group})
+
+            for name, recorded in to_hash.items():
+                tree = trees[name]
+                if recorded is None:
+                    self.record(name, tree, stats[name])
+                    checks[name] = FileCheck(name, 'recorded', 'registrado en el manifiesto')
+                    changed = True
+                elif tree.root == recorded.root:
+                    self.record(name, tree, stats[name])
+                    checks[name] = FileCheck(name, 'ok')
+                    changed = True
+                else:
+                    bad = tuple(recorded.mismatched_chunks(tree))
+                    self.mark_corrupt(name, bad, stats[name])
+                    checks[name] = FileCheck(name, 'corrupt', f"{len(bad)} bloques distintos", bad)
+                    changed = True
+        if changed:
+            self.save()
+        return [checks[name] for name in names]
+
+
+def summarize(checks: List[FileCheck]) -> dict:
+    """Resumen serializable de una verificación (para get_database_status)."""
+    return {
+        'verified': sum(1 for c in checks if c.status in ('ok', 'recorded')),
+        'unrecorded': [c.name for c in checks if c.status == 'unrecorded'],
+        'modified': [c.name for c in checks if c.status == 'modified'],
+        'problems': {c.name: c.status for c in checks if c.problem}
+    }
@@ -262,19 +262,83 @@ const monitorDownloadContainers = async () => {
     }
 };
 
+// Archivos de la base de datos necesarios para el análisis
+const DB_PATH = '/data/eggnog_db';
+const DB_FILES = ['eggnog.db', 'eggnog_proteins.dmnd'];
+
+// Estado escrito de forma atómica por scripts/eggnog_db_manager.py (incluye
+// la verificación de integridad). Está en un subdirectorio para que
+// reescribirlo no cambie el mtime de DB_PATH.
+const STATUS_FILE = path.join(DB_PATH, '.status', 'status.json');
+let statusFileCache = { mtimeMs: null, payload: null };
+
+// Un archivo de la firma sigue igual si conserva tamaño y mtime (o sigue sin
+// existir). El mtime en ns llega como número de JSON y pierde precisión: se
+// compara contra Number(mtimeNs), que se redondea igual
+const signatureEntryMatches = async ([name, size, mtimeNs]) => {
+    try {
+        const stats = await fs.stat(path.join(DB_PATH, name), { bigint: true });
+        return size !== null && Number(stats.size) === size && Number(stats.mtimeNs) === mtimeNs;
+    } catch (error) {
+        return size === null;
+    }
+};
+
+// Leer el archivo de estado si sigue vigente: el mtime del directorio (altas,
+// bajas o renombrados) y el tamaño/mtime de cada archivo requerido (escrituras
+// en el sitio) deben ser los mismos que cuando se escribió
+const readStatusFile = async () => {
+    try {
+        const [fileStats, dirStats] = await Promise.all([
+            fs.stat(STATUS_FILE),
+            fs.stat(DB_PATH, { bigint: true })
+        ]);
+        if (fileStats.mtimeMs !== statusFileCache.mtimeMs) {
+            statusFileCache = {
+                mtimeMs: fileStats.mtimeMs,
+                payload: JSON.parse(await fs.readFile(STATUS_FILE, 'utf8'))
+            };
+        }
+        const payload = statusFileCache.payload;
+        if (payload.directory_mtime_ns !== dirStats.mtimeNs.toString()) {
+            return null;
+        }
+        const matches = await Promise.all(payload.signature[1].map(signatureEntryMatches));
+        if (!matches.every(Boolean)) {
+            return null;
+        }
+        return payload;
+    } catch (error) {
+        // Sin archivo de estado (o ilegible): se comprueba con stat
+        return null;
+    }
+};
+
 // Verificar estado de la base de datos eggNOG
 const checkDatabaseStatus = async () => {
     try {
-        // Verificar si existe la base de datos en el volumen montado
-        const dbPath = '/data/eggnog_db';
-        const dbFiles = ['eggnog.db', 'eggnog_proteins.dmnd'];
+        const payload = await readStatusFile();
+        if (payload) {
+            const { status } = payload;
+            const problems = (status.integrity && status.integrity.problems) || {};
+            const missing = status.missing_files || [];
+            
+            databaseStatus.isDownloaded = DB_FILES.every(file => !missing.includes(file) && !(file in problems));
+            databaseStatus.size = `${status.size_gb.toFixed(2)} GB`;
+            databaseStatus.state = status.status;
+            databaseStatus.integrity = status.integrity || null;
+            databaseStatus.lastCheck = payload.generated_at;
+            databaseStatus.source = 'status-file';
+            return databaseStatus;
+        }
         
+        // Verificar si existe la base de datos en el volumen montado
         let filesFound = 0;
         let totalSize = 0;
         
-        for (const file of dbFiles) {
+        for (const file of DB_FILES) {
             try {
-                const filePath = path.join(dbPath, file);
+                const filePath = path.join(DB_PATH, file);
                 const stats = await fs.stat(filePath);
                 filesFound++;
                 totalSize += stats.size;
@@ -283,9 +347,12 @@ const checkDatabaseStatus = async () => {
             }
         }
         
-        databaseStatus.isDownloaded = filesFound === dbFiles.length;
+        databaseStatus.isDownloaded = filesFound === DB_FILES.length;
         databaseStatus.size = `${(totalSize / (1024 * 1024 * 1024)).toFixed(2)} GB`;
+        databaseStatus.state = undefined;
+        databaseStatus.integrity = null;
         databaseStatus.lastCheck = new Date().toISOString();
+        databaseStatus.source = 'stat';
         
         return databaseStatus;
     } catch (error) {
@@ -751,7 +818,8 @@ app.post('/database/clean', async (req, res) => {
             const files = await fs.readdir(dbDir);
             for (const file of files) {
                 const filePath = path.join(dbDir, file);
-                await fs.unlink(filePath);
+                // Incluye subdirectorios como .status/
+                await fs.rm(filePath, { recursive: true, force: true });
                 console.log(`🗑️ Eliminado: ${file}`);
             }
         } catch (error) {
@@ -7,6 +7,11 @@ import seaborn as sns
 from collections import Counter
 import os
 import sys
+from pathlib import Path
+
+# Lector compartido del servicio de visualización (paralelo, admite .gz/.zst)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from visualizers.annotations_visualizer import read_emapper_annotations
 
 def main():
     # Verificar que se proporcionen los argumentos necesarios
@@ -29,27 +34,12 @@ def main():
     sns.set(style='whitegrid', font_scale=1.2)
     
     # Leer el archivo de anotaciones, manejando el encabezado correctamente
-    header_line = None
-    skip_rows = 0
-    with open(input_file, 'r') as f:
-        for line in f:
-            if line.startswith('##'):
-                skip_rows += 1
-                continue
-            elif line.startswith('#'):
-                header_line = line[1:].strip().split('\t')
-                skip_rows += 1
-                break
-            else:
-                skip_rows += 1
-    
-    if header_line is None:
-        print("No se encontró la línea de encabezado en el archivo.")
+    try:
+        df = read_emapper_annotations(input_file)
+    except ValueError as e:
+        print(f"{e}.")
         sys.exit(1)
     
-    # Leer el archivo en un DataFrame de pandas
-    df = pd.read_csv(input_file, sep='\t', header=None, names=header_line, skiprows=skip_rows, low_memory=False)
-    
     # Gráfico de Categorías COG
     if 'COG_category' in df.columns:
         df_cog = df.dropna(subset=['COG_category'])
@@ -6,7 +6,14 @@ import seaborn as sns
 import numpy as np
 import os
 import sys
-from matplotlib.ticker import ScalarFormatter
+import json
+from pathlib import Path
+from matplotlib.ticker import FormatStrFormatter
+
+# Lector compartido del servicio de visualización (paralelo, admite .gz/.zst)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from visualizers.hmmer_visualizer import domain_summary, read_domtblout
+from visualizers.top_n import top_n_rows
 
 def setup_plot_style():
     """Configurar el estilo general de los gráficos"""
@@ -17,13 +24,13 @@ def setup_plot_style():
     plt.rcParams['axes.labelsize'] = 11
     plt.rcParams['figure.figsize'] = (12, 8)
 
-def create_frequency_plot(df, output_dir, top_n=20):
+def create_frequency_plot(summary, output_dir, top_n=20):
     """Crear gráfico de frecuencia de dominios horizontal con los top N más frecuentes"""
-    domain_counts = df['Query Name'].value_counts()
+    domain_counts = summary['Count']
     
     # Separar los top N dominios y agrupar el resto como "Otros"
-    top_domains = domain_counts.head(top_n)
-    others_sum = domain_counts[top_n:].sum()
+    top_domains = top_n_rows(summary, 'Count', top_n)['Count']
+    others_sum = domain_counts.sum() - top_domains.sum()
     
     if len(domain_counts) > top_n:
         top_domains = pd.concat([top_domains, pd.Series({'Otros': others_sum})])
@@ -46,49 +53,49 @@ def create_frequency_plot(df, output_dir, top_n=20):
     plt.savefig(os.path.join(output_dir, 'domain_frequency.png'), dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_evalue_distribution(df, output_dir, top_n=20):
-    """Crear gráfico de caja para la distribución de E-values"""
-    # Filtrar por los dominios más frecuentes
-    top_domains = df['Query Name'].value_counts().head(top_n).index
-    filtered_df = df[df['Query Name'].isin(top_domains)]
-    
-    plt.figure(figsize=(12, 8))
+def create_evalue_distribution(summary, output_dir, top_n=20):
+    """Crear gráfico de caja para la distribución de E-values desde los cuantiles precalculados"""
+    # Dominios más frecuentes, ordenados por mediana de E-value
+    top = top_n_rows(summary, 'Count', top_n).sort_values('log10_Evalue_q50', kind='stable')
+    box_stats = [{
+        'label': domain,
+        'med': 10.0 ** row['log10_Evalue_q50'],
+        'q1': 10.0 ** row['log10_Evalue_q25'],
+        'q3': 10.0 ** row['log10_Evalue_q75'],
+        'whislo': 10.0 ** row['log10_Evalue_whislo'],
+        'whishi': 10.0 ** row['log10_Evalue_whishi'],
+    } for domain, row in top.iterrows()]
+    
+    fig, ax = plt.subplots(figsize=(12, 8))
     # Crear boxplot horizontal
-    sns.boxplot(data=filtered_df, y='Query Name', x='E-value', whis=1.5, 
-                order=filtered_df.groupby('Query Name')['E-value'].median().sort_values().index)
+    ax.bxp(box_stats, vert=False, showfliers=False, patch_artist=True,
+           boxprops={'facecolor': '#9ecae1'}, medianprops={'color': 'black'})
+    ax.invert_yaxis()
     
-    plt.xscale('log')
-    plt.xlabel('E-value (escala logarítmica)')
-    plt.ylabel('Dominio')
-    plt.title('Distribución de E-values por Dominio')
+    ax.set_xscale('log')
+    ax.set_xlabel('E-value (escala logarítmica)')
+    ax.set_ylabel('Dominio')
+    ax.set_title('Distribución de E-values por Dominio')
     
     # Formatear el eje x para valores científicos
-    ax = plt.gca()
-    ax.xaxis.set_major_formatter(ScalarFormatter(useMathText=True))
-    ax.xaxis.set_major_formatter(plt.FormatStrFormatter('%.0e'))
+    ax.xaxis.set_major_formatter(FormatStrFormatter('%.0e'))
     
     plt.tight_layout()
     plt.savefig(os.path.join(output_dir, 'evalue_distribution.png'), dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_score_heatmap(df, output_dir, top_n=20):
+def create_score_heatmap(summary, output_dir, top_n=20):
     """Crear mapa de calor de puntuaciones promedio por dominio"""
-    # Calcular estadísticas por dominio
-    domain_stats = df.groupby('Query Name').agg({
-        'Score': ['mean', 'count'],
-        'E-value': 'mean'
-    }).round(2)
-    
     # Seleccionar top N dominios por frecuencia
-    top_domains = domain_stats.sort_values(('Score', 'count'), ascending=False).head(top_n)
+    top_domains = top_n_rows(summary, 'Count', top_n)
     
     # Crear matriz para el heatmap
     heatmap_data = pd.DataFrame({
-        'Dominio': top_domains.index,
-        'Puntuación Media': top_domains[('Score', 'mean')],
-        'E-value Medio': -np.log10(top_domains[('E-value', 'mean')]),
-        'Frecuencia': top_domains[('Score', 'count')]
-    }).set_index('Dominio')
+        'Puntuación Media': top_domains['Score_mean'].round(2),
+        'E-value Medio': -np.log10(top_domains['Evalue_mean'].clip(lower=1e-300)),
+        'Frecuencia': top_domains['Count']
+    })
+    heatmap_data.index.name = 'Dominio'
     
     plt.figure(figsize=(12, 8))
     sns.heatmap(heatmap_data, annot=True, fmt='.2f', cmap='YlOrRd', 
@@ -99,6 +106,17 @@ def create_score_heatmap(df, output_dir, top_n=20):
     plt.savefig(os.path.join(output_dir, 'domain_summary_heatmap.png'), dpi=300, bbox_inches='tight')
     plt.close()
 
+def write_summary_json(df, summary, output_dir):
+    """Guardar estadísticas y la tabla resumen por dominio en JSON"""
+    stats = {
+        'total_hits': int(len(df)),
+        'unique_domains': int(len(summary)),
+        'unique_targets': int(df['Target Name'].nunique()),
+        'domains': top_n_rows(summary, 'Count', len(summary)).reset_index().to_dict(orient='records')
+    }
+    with open(os.path.join(output_dir, 'domain_summary.json'), 'w') as f:
+        json.dump(stats, f, indent=2)
+
 def main():
     # Verificar argumentos
     if len(sys.argv) != 3:
@@ -121,16 +139,16 @@ def main():
     
     try:
         # Leer datos
-        df = pd.read_csv(input_file, delim_whitespace=True, comment='#', header=None,
-                        names=["Target Name", "Accession", "tlen", "Query Name", "Query Accession",
-                               "qlen", "E-value", "Score", "Bias", "Domain No", "of", "c-Evalue",
-                               "i-Evalue", "Domain Score", "Domain Bias", "Hmm From", "Hmm To",
-                               "Ali From", "Ali To", "Env From", "Env To", "Acc", "Description"])
+        df = read_domtblout(input_file)
+        
+        # Resumen por dominio compartido con HMMERVisualizer (una sola agregación)
+        summary = domain_summary(df)
         
         # Crear visualizaciones
-        create_frequency_plot(df, output_dir)
-        create_evalue_distribution(df, output_dir)
-        create_score_heatmap(df, output_dir)
+        create_frequency_plot(summary, output_dir)
+        create_evalue_distribution(summary, output_dir)
+        create_score_heatmap(summary, output_dir)
+        write_summary_json(df, summary, output_dir)
         
         print(f"Gráficos generados y guardados en {output_dir}")
         
@@ -1,12 +1,16 @@
 const express = require('express');
 const multer = require('multer');
-const { exec } = require('child_process');
+const http = require('http');
 const path = require('path');
 const fs = require('fs');
 const cors = require('cors');
 const app = express();
 const port = 5000;
 
+// Servicio de visualización (src/modules/visualization/app.py)
+const VISUALIZATION_SERVICE_URL = process.env.VISUALIZATION_SERVICE_URL || 'http://localhost:4003';
+const VISUALIZATION_TIMEOUT_MS = parseInt(process.env.VISUALIZATION_TIMEOUT_MS || '600000', 10);
+
 // Configurar CORS - ACTUALIZADO para incluir puerto 4005
 app.use(cors({
     origin: [
@@ -69,6 +73,46 @@ app.use('/graphs', express.static(path.join(__dirname, 'graph_maker', 'output'),
     }
 }));
 
+// Los gráficos generados por el servicio de visualización se sirven a través de él.
+// Se reenvían las cabeceras condicionales y de rango para que las revalidaciones
+// (304) y las descargas parciales (206) las resuelva el servicio o su proxy
+const GRAPH_REQUEST_HEADERS = ['if-none-match', 'if-modified-since', 'range', 'if-range'];
+const GRAPH_RESPONSE_HEADERS = [
+    'content-type', 'content-length', 'etag', 'cache-control', 'last-modified',
+    'accept-ranges', 'content-range', 'x-accel-redirect', 'x-sendfile'
+];
+
+app.use('/graphs', (req, res) => {
+    const headers = {};
+    GRAPH_REQUEST_HEADERS.forEach(header => {
+        if (req.headers[header]) headers[header] = req.headers[header];
+    });
+
+    const upstreamRequest = http.request(new URL(`/graphs${req.url}`, VISUALIZATION_SERVICE_URL), {
+        method: req.method === 'HEAD' ? 'HEAD' : 'GET',
+        headers
+    }, (upstream) => {
+        res.status(upstream.statusCode);
+        GRAPH_RESPONSE_HEADERS.forEach(header => {
+            if (upstream.headers[header]) res.setHeader(header, upstream.headers[header]);
+        });
+        res.setHeader('Access-Control-Allow-Origin', '*');
+        res.setHeader('Access-Control-Expose-Headers', 'ETag, Content-Range, Accept-Ranges, Last-Modified');
+
+        // 304 y HEAD no llevan cuerpo
+        if (upstream.statusCode === 304 || req.method === 'HEAD') {
+            upstream.resume();
+            res.end();
+            return;
+        }
+        upstream.pipe(res);
+    });
+    upstreamRequest.on('error', (error) => {
+        res.status(502).json({ error: 'Servicio de visualización no disponible', details: error.message });
+    });
+    upstreamRequest.end();
+});
+
 // Ruta raíz
 app.get('/', (req, res) => {
     res.json({ status: 'Server is running' });
@@ -90,110 +134,98 @@ app.post('/clear_uploads', (req, res) => {
     res.json({ status: 'success', message: 'Uploads cleared successfully' });
 });
 
-// Endpoint para procesar archivos de anotaciones
-app.post('/process-annotations', upload.single('file'), (req, res) => {
-    if (!req.file) {
-        return res.status(400).json({ error: 'No se subió ningún archivo' });
-    }
-
-    const timestamp = Date.now();
-    const outputDir = path.join(__dirname, 'graph_maker', 'output', `annotations_${timestamp}`);
-    if (!fs.existsSync(outputDir)){
-        fs.mkdirSync(outputDir, { recursive: true });
-    }
-
-    // Usar la ruta correcta del script en PythonScripts
-    const scriptPath = path.join(__dirname, 'PythonScripts', 'process_annotations.py');
-    const command = `python "${scriptPath}" "${req.file.path}" "${outputDir}"`;
-    
-    console.log('Ejecutando comando:', command);
-    
-    exec(command, (error, stdout, stderr) => {
-        if (error) {
-            console.error(`Error: ${error}`);
-            console.error(`stderr: ${stderr}`);
-            return res.status(500).json({ error: error.message });
-        }
-
-        console.log(`stdout: ${stdout}`);
-        
-        const graphs = fs.readdirSync(outputDir)
-            .filter(file => file.endsWith('.png'))
-            .map(file => `/graphs/annotations_${timestamp}/${file}`);
-
-        res.json({ 
-            message: 'Procesamiento completado',
-            graphs: graphs
+// Los archivos se reenvían al servicio de visualización (app.py), que
+// mantiene los visualizadores cargados en memoria en lugar de lanzar un
+// proceso de Python por cada archivo
+function forwardToVisualizer(endpoint, file) {
+    return new Promise((resolve, reject) => {
+        const boundary = `----BioGraphmaker${Date.now().toString(16)}`;
+        const head = Buffer.from(
+            `--${boundary}\r\n` +
+            `Content-Disposition: form-data; name="file"; filename="${path.basename(file.originalname).replace(/"/g, '')}"\r\n` +
+            'Content-Type: application/octet-stream\r\n\r\n'
+        );
+        const tail = Buffer.from(`\r\n--${boundary}--\r\n`);
+        const target = new URL(endpoint, VISUALIZATION_SERVICE_URL);
+
+        const request = http.request({
+            method: 'POST',
+            hostname: target.hostname,
+            port: target.port,
+            path: target.pathname,
+            headers: {
+                'Content-Type': `multipart/form-data; boundary=${boundary}`,
+                'Content-Length': head.length + fs.statSync(file.path).size + tail.length
+            }
+        }, (response) => {
+            const chunks = [];
+            response.on('data', chunk => chunks.push(chunk));
+            response.on('end', () => {
+                try {
+                    resolve({ status: response.statusCode, body: JSON.parse(Buffer.concat(chunks).toString()) });
+                } catch (error) {
+                    reject(new Error(`Respuesta no válida del servicio de visualización (${response.statusCode})`));
+                }
+            });
         });
+        request.setTimeout(VISUALIZATION_TIMEOUT_MS, () => request.destroy(new Error('Tiempo de espera agotado')));
+        request.on('error', reject);
+
+        request.write(head);
+        const stream = fs.createReadStream(file.path);
+        stream.on('error', reject);
+        stream.on('end', () => request.end(tail));
+        stream.pipe(request, { end: false });
     });
-});
+}
 
-// Endpoint para procesar datos HMMER
-app.post('/process-hmmer', upload.single('file'), (req, res) => {
-    // Asegurar que la respuesta sea JSON
-    res.setHeader('Content-Type', 'application/json');
-
-    if (!req.file) {
-        return res.status(400).json({ error: 'No se subió ningún archivo' });
-    }
-
-    const timestamp = Date.now();
-    const outputDir = path.join(__dirname, 'graph_maker', 'output', `hmmer_${timestamp}`);
-    
-    try {
-        if (!fs.existsSync(outputDir)){
-            fs.mkdirSync(outputDir, { recursive: true });
-        }
+function visualizerRoute(endpoint) {
+    return async (req, res) => {
+        res.setHeader('Content-Type', 'application/json');
 
-        // Usar la ruta correcta del script en PythonScripts
-        const scriptPath = path.join(__dirname, 'PythonScripts', 'process_hmmer_data.py');
-        if (!fs.existsSync(scriptPath)) {
-            return res.status(500).json({ 
-                error: 'Script de procesamiento no encontrado' 
-            });
+        if (!req.file) {
+            return res.status(400).json({ error: 'No se subió ningún archivo' });
         }
 
-        const command = process.platform === 'win32' 
-            ? `python "${scriptPath}" "${req.file.path}" "${outputDir}"`
-            : `python3 "${scriptPath}" "${req.file.path}" "${outputDir}"`;
-
-        console.log('Ejecutando comando:', command);
+        try {
+            console.log(`Reenviando ${req.file.originalname} a ${VISUALIZATION_SERVICE_URL}${endpoint}`);
+            const { status, body } = await forwardToVisualizer(endpoint, req.file);
 
-        exec(command, (error, stdout, stderr) => {
-            if (error) {
-                console.error('Error al ejecutar script:', error);
-                console.error('stderr:', stderr);
-                return res.status(500).json({ 
-                    error: 'Error al procesar el archivo',
-                    details: stderr 
+            if (status !== 200) {
+                return res.status(status >= 500 ? 500 : status).json({
+                    error: body.error || 'Error al procesar el archivo',
+                    details: body.details
                 });
             }
-
-            console.log(`stdout: ${stdout}`);
-
-            const graphs = fs.readdirSync(outputDir)
-                .filter(file => file.endsWith('.png'))
-                .map(file => `/graphs/hmmer_${timestamp}/${file}`);
-
-            if (graphs.length === 0) {
-                return res.status(500).json({ 
-                    error: 'No se encontraron gráficos generados' 
-                });
+            if (!body.graphs || body.graphs.length === 0) {
+                return res.status(500).json({ error: 'No se encontraron gráficos generados' });
             }
 
-            res.json({ 
+            res.json({
                 message: 'Procesamiento completado',
-                graphs: graphs
+                graphs: body.graphs,
+                stats: body.stats
             });
-        });
-    } catch (error) {
-        console.error('Error inesperado:', error);
-        res.status(500).json({ 
-            error: 'Error interno del servidor',
-            details: error.message 
-        });
-    }
-});
+        } catch (error) {
+            console.error('Error contactando el servicio de visualización:', error);
+            res.status(502).json({
+                error: 'Servicio de visualización no disponible',
+                details: error.message
+            });
+        } finally {
+            fs.unlink(req.file.path, () => {});
+        }
+    };
+}
+
+// Endpoint para procesar archivos de anotaciones
+app.post('/process-annotations', upload.single('file'), visualizerRoute('/process-annotations'));
+
+// Endpoint para procesar datos HMMER
+app.post('/process-hmmer', upload.single('file'), visualizerRoute('/process-hmmer'));
+
+// Endpoint para procesar archivos seed_orthologs
+app.post('/process-seed-orthologs', upload.single('file'), visualizerRoute('/process-seed-orthologs'));
 
 // Endpoint para limpiar archivos temporales
 app.post('/cleanup', (req, res) => {
@@ -219,79 +251,6 @@ app.post('/cleanup', (req, res) => {
     res.json({ message: 'Limpieza completada' });
 });
 
-// Endpoint para procesar archivos seed_orthologs
-app.post('/process-seed-orthologs', upload.single('file'), (req, res) => {
-    // Asegurar que la respuesta sea JSON
-    res.setHeader('Content-Type', 'application/json');
-
-    if (!req.file) {
-        return res.status(400).json({ error: 'No se subió ningún archivo' });
-    }
-
-    const timestamp = Date.now();
-    const outputDir = path.join(__dirname, 'graph_maker', 'output', `seed_orthologs_${timestamp}`);
-    
-    try {
-        if (!fs.existsSync(outputDir)){
-            fs.mkdirSync(outputDir, { recursive: true });
-        }
-
-        // Usar la ruta correcta del script en PythonScripts
-        const scriptPath = path.join(__dirname, 'PythonScripts', 'process_seed_orthologs.py');
-        if (!fs.existsSync(scriptPath)) {
-            return res.status(500).json({ 
-                error: 'Script de procesamiento no encontrado' 
-            });
-        }
-
-        const command = process.platform === 'win32' 
-            ? `python "${scriptPath}" "${req.file.path}" "${outputDir}"`
-            : `python3 "${scriptPath}" "${req.file.path}" "${outputDir}"`;
-        
-        console.log('Ejecutando comando:', command);
-
-        exec(command, (error, stdout, stderr) => {
-            if (error) {
-                console.error(`Error de ejecución: ${error}`);
-                console.error(`stderr: ${stderr}`);
-                return res.status(500).json({ 
-                    error: 'Error al procesar el archivo',
-                    details: error.message
-                });
-            }
-
-            console.log(`stdout: ${stdout}`);
-
-            if (!fs.existsSync(outputDir)) {
-                return res.status(500).json({ 
-                    error: 'No se generaron gráficos' 
-                });
-            }
-
-            const graphs = fs.readdirSync(outputDir)
-                .filter(file => file.endsWith('.png'))
-                .map(file => `/graphs/seed_orthologs_${timestamp}/${file}`);
-
-            if (graphs.length === 0) {
-                return res.status(500).json({ 
-                    error: 'No se encontraron gráficos generados' 
-                });
-            }
-
-            res.json({ 
-                message: 'Procesamiento completado',
-                graphs: graphs
-            });
-        });
-    } catch (error) {
-        console.error('Error inesperado:', error);
-        res.status(500).json({ 
-            error: 'Error interno del servidor',
-            details: error.message 
-        });
-    }
-});
-
 app.listen(port, () => {
     console.log(`Servidor corriendo en http://localhost:${port}`);
     console.log(`CORS configurado para puertos: 3000, 4000, 4005, 4200`);
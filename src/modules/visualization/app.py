@@ -17,21 +17,33 @@ Visualizadores disponibles:
 
 import os
 import sys
+import hmac
 import json
 import logging
+import importlib
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, Response, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import tempfile
 import shutil
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 
-# Importar visualizadores especializados
+# Los visualizadores (pandas, matplotlib, seaborn, scipy...) se importan bajo
+# demanda: el servidor arranca y responde /health sin cargarlos
 sys.path.append(str(Path(__file__).parent))
-from visualizers.bindash_visualizer import BinDashVisualizer
-from visualizers.base_visualizer import BaseVisualizer
+from visualizers.upload_stream import UploadInfo, UploadSink, save_upload
+from visualizers.compressed_io import detect_compression, open_input, read_head, strip_compression_suffix
+from visualizers.detection import HEAD_BYTES, Detection, detect
+from visualizers.artifact_store import ArtifactStore
+from visualizers.static_files import send_static, versioned_url
+from visualizers.instrumentation import render_metrics
+from visualizers.bundle import BUNDLE_FORMATS, job_files, stream_tar, stream_zip, tar_size
+if TYPE_CHECKING:
+    from visualizers.base_visualizer import BaseVisualizer
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -53,30 +65,55 @@ UPLOAD_DIR = BASE_DIR / 'uploads'
 OUTPUT_DIR = BASE_DIR / 'outputs'
 TEMP_DIR = BASE_DIR / 'temp'
 
+# Token de administración (limpieza de uploads, perfilado de peticiones).
+# Sin VISUALIZATION_ADMIN_TOKEN las rutas de administración quedan deshabilitadas
+ADMIN_TOKEN = os.environ.get('VISUALIZATION_ADMIN_TOKEN', '')
+
 # Crear directorios si no existen
 for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Índice de trabajos en OUTPUT_DIR: caducidad por último acceso, cuota LRU y
+# barrido en segundo plano (sustituye a recorrer los directorios en /cleanup)
+artifact_store = ArtifactStore(
+    OUTPUT_DIR,
+    max_age=float(os.environ.get('VISUALIZATION_MAX_AGE_HOURS', 4)) * 3600,
+    quota_bytes=int(os.environ.get('VISUALIZATION_QUOTA_MB', 0)) * 1024 * 1024,
+    loose_dirs=[UPLOAD_DIR, TEMP_DIR],
+    sweep_interval=float(os.environ.get('VISUALIZATION_SWEEP_INTERVAL', 300))
+)
+
+class StreamingUploadRequest(Request):
+    """
+    Request que escribe los archivos subidos directamente en UPLOAD_DIR,
+    calculando SHA-256, cabecera y número de líneas durante la recepción.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSink(UPLOAD_DIR)
+
+app.request_class = StreamingUploadRequest
+
 # Configuración de archivos permitidos por tipo
 FILE_TYPE_CONFIGS = {
     'bindash': {
         'extensions': ['.txt', '.tsv', '.csv', '.out', '.distances'],
-        'visualizer_class': BinDashVisualizer,
+        'visualizer_class': 'visualizers.bindash_visualizer.BinDashVisualizer',
         'description': 'Análisis genómico comparativo con BinDash'
     },
     'annotations': {
         'extensions': ['.annotations', '.emapper.annotations', '.eggnog'],
-        'visualizer_class': None,  # TODO: Implementar
+        'visualizer_class': 'visualizers.annotations_visualizer.AnnotationsVisualizer',
         'description': 'Anotaciones funcionales de genes'
     },
     'hmmer': {
         'extensions': ['.txt', '.out', '.analyze.txt', '.domtblout'],
-        'visualizer_class': None,  # TODO: Implementar
+        'visualizer_class': 'visualizers.hmmer_visualizer.HMMERVisualizer',
         'description': 'Análisis de dominios proteicos con HMMER'
     },
     'seed_orthologs': {
         'extensions': ['.seed_orthologs', '.orthologs'],
-        'visualizer_class': None,  # TODO: Implementar
+        'visualizer_class': 'visualizers.seed_orthologs_visualizer.SeedOrthologsVisualizer',
         'description': 'Análisis de ortólogos y filogenética'
     },
     'quality_control': {
@@ -86,46 +123,54 @@ FILE_TYPE_CONFIGS = {
     }
 }
 
-def detect_file_type(file_path: Path) -> Optional[str]:
+def detect_file(file_path: Path, head: Optional[bytes] = None) -> Detection:
+    """
+    Detectar el tipo de archivo genómico puntuando la firma de contenido de
+    cada tipo registrado (ver visualizers/detection.py).
+    
+    Args:
+        file_path: Ruta al archivo
+        head: Primeros bytes (descomprimidos) del archivo si ya se conocen
+        
+    Returns:
+        Detection con el tipo ganador y la puntuación de cada tipo
+    """
+    if head is None:
+        head = read_head(file_path, HEAD_BYTES)
+    extensions = {file_type: config['extensions'] for file_type, config in FILE_TYPE_CONFIGS.items()}
+    # La extensión de compresión (.gz/.bgz/.zst) se ignora
+    return detect(head[:HEAD_BYTES], strip_compression_suffix(file_path), extensions)
+
+def detect_file_type(file_path: Path, head: Optional[bytes] = None) -> Optional[str]:
     """
     Detectar automáticamente el tipo de archivo genómico.
     
     Args:
         file_path: Ruta al archivo
+        head: Primeros bytes (descomprimidos) del archivo si ya se conocen
         
     Returns:
         Tipo de archivo detectado o None si no se reconoce
     """
-    # Detectar por extensión
-    suffix = file_path.suffix.lower()
-    
-    for file_type, config in FILE_TYPE_CONFIGS.items():
-        if suffix in config['extensions']:
-            return file_type
-    
-    # Detectar por contenido
     try:
-        with open(file_path, 'r') as f:
-            content = f.read(1000)  # Leer primeras líneas
-            
-        # Detectar BinDash por contenido
-        if any(keyword in content.lower() for keyword in ['query', 'target', 'mutation_distance', 'jaccard']):
-            return 'bindash'
-            
-        # Detectar anotaciones por contenido
-        if any(keyword in content.lower() for keyword in ['go:', 'kegg:', 'pfam:', 'cog']):
-            return 'annotations'
-            
-        # Detectar HMMER por contenido
-        if any(keyword in content.lower() for keyword in ['domain', 'evalue', 'bitscore']):
-            return 'hmmer'
-            
-    except Exception:
-        pass
-    
-    return None
+        return detect_file(file_path, head).file_type
+    except Exception as e:
+        logger.warning(f"No se pudo detectar el tipo de {file_path.name}: {e}")
+        return None
 
-def get_visualizer(file_type: str, output_dir: Path) -> Optional[BaseVisualizer]:
+@lru_cache(maxsize=None)
+def load_visualizer_class(class_path: str):
+    """Importar la clase de un visualizador a partir de 'modulo.Clase'."""
+    module_name, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+def upload_head(upload: UploadInfo) -> bytes:
+    """Cabecera del contenido de una subida, descomprimida si hace falta."""
+    if detect_compression(upload.head) is None:
+        return upload.head
+    return read_head(upload.path)
+
+def get_visualizer(file_type: str, output_dir: Path) -> Optional['BaseVisualizer']:
     """
     Obtener instancia del visualizador apropiado.
     
@@ -140,9 +185,10 @@ def get_visualizer(file_type: str, output_dir: Path) -> Optional[BaseVisualizer]
     if not config or not config['visualizer_class']:
         return None
     
-    return config['visualizer_class'](output_dir)
+    return load_visualizer_class(config['visualizer_class'])(output_dir)
 
-def create_fallback_visualization(file_path: Path, output_dir: Path, file_type: str) -> Dict[str, Any]:
+def create_fallback_visualization(file_path: Path, output_dir: Path, file_type: str,
+                                  upload: Optional[UploadInfo] = None) -> Dict[str, Any]:
     """
     Crear visualización básica cuando no hay visualizador especializado.
     
@@ -150,6 +196,7 @@ def create_fallback_visualization(file_path: Path, output_dir: Path, file_type:
         file_path: Ruta al archivo
         output_dir: Directorio de salida
         file_type: Tipo de archivo
+        upload: Metadatos de la subida (evita releer el archivo para contar líneas)
         
     Returns:
         Resultado de visualización básica
@@ -157,15 +204,19 @@ def create_fallback_visualization(file_path: Path, output_dir: Path, file_type:
     import matplotlib.pyplot as plt
     
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
+        # En archivos comprimidos las líneas contadas al subir no son las reales
+        if upload is not None and detect_compression(upload.head) is None:
+            lines_count = upload.lines
+        else:
+            with open_input(file_path, 'rb') as f:
+                lines_count = sum(1 for _ in f)
         
         plt.figure(figsize=(12, 8))
         plt.text(0.5, 0.5, 
                 f'📊 Archivo Genómico Cargado\n\n'
                 f'Tipo: {file_type.upper()}\n'
                 f'Archivo: {file_path.name}\n'
-                f'Líneas: {len(lines)}\n'
+                f'Líneas: {lines_count}\n'
                 f'Tamaño: {file_path.stat().st_size / 1024:.1f} KB\n\n'
                 f'⚠️ Visualizador especializado en desarrollo',
                 ha='center', va='center', fontsize=14,
@@ -180,14 +231,14 @@ def create_fallback_visualization(file_path: Path, output_dir: Path, file_type:
         plt.close()
         
         return {
-            'graphs': [f"/graphs/{graph_path.relative_to(OUTPUT_DIR)}"],
+            'graphs': [versioned_url('/graphs', OUTPUT_DIR, graph_path)],
             'stats': {
                 'file_type': file_type,
-                'lines_count': len(lines),
+                'lines_count': lines_count,
                 'file_size_kb': file_path.stat().st_size / 1024
             },
             'data_summary': {
-                'total_rows': len(lines),
+                'total_rows': lines_count,
                 'file_type': file_type,
                 'status': 'visualizer_in_development'
             },
@@ -203,22 +254,32 @@ def create_fallback_visualization(file_path: Path, output_dir: Path, file_type:
             'error': str(e)
         }
 
-def clean_old_files():
-    """Limpiar archivos temporales antiguos (más de 4 horas para mejor caching)"""
-    import time
-    current_time = time.time()
-    
-    for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR]:
-        if directory.exists():
-            for file_path in directory.iterdir():
-                if file_path.is_file():
-                    file_age = current_time - file_path.stat().st_mtime
-                    if file_age > 14400:  # 4 horas (mejorado de 2 horas)
-                        try:
-                            file_path.unlink()
-                            logger.info(f"Archivo eliminado: {file_path}")
-                        except Exception as e:
-                            logger.error(f"Error eliminando {file_path}: {e}")
+def is_admin_request() -> bool:
+    """Autorización de administrador: cabecera 'Authorization: Bearer <token>'."""
+    if not ADMIN_TOKEN:
+        return False
+    auth_header = request.headers.get('Authorization', '')
+    return hmac.compare_digest(auth_header.encode(), f'Bearer {ADMIN_TOKEN}'.encode())
+
+def profiling_requested() -> bool:
+    """Perfilado opt-in (cabecera X-Profile: 1 o ?profile=1), sólo para administradores."""
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    if not flag or flag.lower() not in ('1', 'true', 'yes'):
+        return False
+    if not is_admin_request():
+        logger.warning("Perfilado solicitado sin autorización de administrador; se ignora")
+        return False
+    return True
+
+def graph_urls(result: Dict[str, Any]) -> list:
+    """Convertir las rutas absolutas de gráficos a URLs /graphs/...?v=<hash>"""
+    graphs_urls = []
+    for graph_path in result.get('graphs', []):
+        if isinstance(graph_path, str):
+            graph_file = Path(graph_path)
+            if graph_file.exists():
+                graphs_urls.append(versioned_url('/graphs', OUTPUT_DIR, graph_file))
+    return graphs_urls
 
 # ========== RUTAS PRINCIPALES ==========
 
@@ -240,9 +301,18 @@ def index():
         'endpoints': [
             'GET / - Estado del servidor',
             'POST /process-file - Procesar cualquier archivo genómico (auto-detección)',
+            'POST /detect - Detectar el tipo de un archivo sin procesarlo',
             'POST /process-bindash - Procesar archivos BinDash específicamente',
+            'POST /process/<file_type> - Procesar con un visualizador registrado',
+            'POST /process-annotations - Anotaciones eggNOG (compatibilidad BioGraphmaker)',
+            'POST /process-hmmer - Dominios HMMER (compatibilidad BioGraphmaker)',
+            'POST /process-seed-orthologs - Ortólogos semilla (compatibilidad BioGraphmaker)',
+            'POST /process-enrichment - Enriquecimiento funcional sobre varias anotaciones eggNOG',
             'GET /graphs/<path> - Servir gráficos generados',
+            'GET /jobs/<id>/bundle?format=zip|tar - Descargar todos los resultados de un trabajo',
+            'GET /jobs/<id>/profile/<archivo> - Perfil de un procesamiento (admin, ver X-Profile)',
             'POST /cleanup - Limpiar archivos temporales',
+            'GET /metrics - Métricas Prometheus (tiempos y memoria por etapa)',
             'GET /supported-types - Ver tipos de archivos soportados'
         ]
     })
@@ -260,6 +330,15 @@ def health_check():
         ]
     })
 
+@app.route('/metrics')
+def metrics():
+    """Métricas Prometheus de tiempo, CPU y memoria por visualizador y etapa"""
+    rendered = render_metrics()
+    if rendered is None:
+        return jsonify({'error': 'prometheus_client no está instalado'}), 503
+    body, content_type = rendered
+    return Response(body, content_type=content_type)
+
 @app.route('/supported-types')
 def supported_types():
     """Listar tipos de archivos soportados"""
@@ -271,12 +350,50 @@ def supported_types():
 
 # ========== PROCESAMIENTO UNIVERSAL DE ARCHIVOS ==========
 
+@app.route('/detect', methods=['POST'])
+def detect_type():
+    """
+    Detectar el tipo de un archivo sin procesarlo. Sólo se analiza la
+    cabecera, por lo que basta con enviar los primeros KB del archivo.
+    """
+    upload_path = None
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No se proporcionó archivo'}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No se seleccionó archivo'}), 400
+
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        upload_path = UPLOAD_DIR / f"detect_{timestamp}_{filename}"
+        upload = save_upload(file, upload_path)
+
+        detection = detect_file(upload_path, upload_head(upload))
+        config = FILE_TYPE_CONFIGS.get(detection.file_type, {})
+        return jsonify({
+            **detection.summary(),
+            'description': config.get('description'),
+            'has_visualizer': bool(config.get('visualizer_class')),
+            'compression': detect_compression(upload.head),
+            'upload': upload.summary()
+        })
+
+    except Exception as e:
+        logger.error(f"Error detectando tipo de archivo: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if upload_path is not None:
+            upload_path.unlink(missing_ok=True)
+
 @app.route('/process-file', methods=['POST'])
 def process_file():
     """
     Endpoint universal para procesar cualquier tipo de archivo genómico.
     Detecta automáticamente el tipo y usa el visualizador apropiado.
     """
+    output_dir = None
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No se proporcionó archivo'}), 400
@@ -287,12 +404,12 @@ def process_file():
         
         # Guardar archivo
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
         upload_path = UPLOAD_DIR / f"{timestamp}_{filename}"
-        file.save(upload_path)
+        upload = save_upload(file, upload_path)
         
-        # Detectar tipo de archivo
-        file_type = detect_file_type(upload_path)
+        # Detectar tipo de archivo (con la cabecera capturada al recibirlo)
+        file_type = detect_file_type(upload_path, upload_head(upload))
         if not file_type:
             upload_path.unlink()
             return jsonify({'error': 'Tipo de archivo no reconocido'}), 400
@@ -303,25 +420,28 @@ def process_file():
         output_dir = OUTPUT_DIR / f"{file_type}_{timestamp}"
         output_dir.mkdir(exist_ok=True)
         
-        # Obtener visualizador apropiado
-        visualizer = get_visualizer(file_type, output_dir)
+        # Perfilado bajo demanda (sin coste si no se pide)
+        profiler = None
+        if profiling_requested():
+            from visualizers.profiling import RequestProfiler
+            profiler = RequestProfiler(output_dir)
         
-        if visualizer:
-            # Usar visualizador especializado
-            result = visualizer.process_file(upload_path)
-            # Convertir rutas absolutas a URLs relativas
-            if 'graphs' in result:
-                graphs_urls = []
-                for graph_path in result['graphs']:
-                    if isinstance(graph_path, str):
-                        graph_file = Path(graph_path)
-                        if graph_file.exists():
-                            relative_path = graph_file.relative_to(OUTPUT_DIR)
-                            graphs_urls.append(f"/graphs/{relative_path}")
-                result['graphs'] = graphs_urls
-        else:
-            # Usar visualización fallback
-            result = create_fallback_visualization(upload_path, output_dir, file_type)
+        with profiler or nullcontext():
+            # Obtener visualizador apropiado
+            visualizer = get_visualizer(file_type, output_dir)
+            
+            if visualizer:
+                # Usar visualizador especializado
+                result = visualizer.process_file(upload_path)
+                # Convertir rutas absolutas a URLs relativas
+                if 'graphs' in result:
+                    result['graphs'] = graph_urls(result)
+            else:
+                # Usar visualización fallback
+                result = create_fallback_visualization(upload_path, output_dir, file_type, upload)
+        
+        if profiler:
+            result['profile'] = profiler.summary(f"/jobs/{output_dir.name}/profile")
         
         # Limpiar archivo temporal
         upload_path.unlink()
@@ -330,16 +450,23 @@ def process_file():
             'message': f'Archivo {file_type} procesado exitosamente',
             'file_type': file_type,
             'visualizer': result.get('visualizer', f'{file_type}_fallback'),
+            'upload': upload.summary(),
+            'bundle': f"/jobs/{output_dir.name}/bundle",
             **result
         })
         
     except Exception as e:
         logger.error(f"Error procesando archivo: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        # Indexar el trabajo (también si falló) para que el barrido lo elimine
+        if output_dir is not None:
+            artifact_store.add(output_dir)
 
 @app.route('/process-bindash', methods=['POST'])
 def process_bindash():
     """Endpoint específico para archivos BinDash (compatibilidad)"""
+    output_dir = None
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No se proporcionó archivo'}), 400
@@ -350,28 +477,21 @@ def process_bindash():
         
         # Guardar archivo
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
         upload_path = UPLOAD_DIR / f"bindash_{timestamp}_{filename}"
-        file.save(upload_path)
+        upload = save_upload(file, upload_path)
         
         # Crear directorio de salida
         output_dir = OUTPUT_DIR / f"bindash_{timestamp}"
         output_dir.mkdir(exist_ok=True)
         
         # Usar visualizador BinDash
-        visualizer = BinDashVisualizer(output_dir)
+        visualizer = get_visualizer('bindash', output_dir)
         result = visualizer.process_file(upload_path)
         
         # Convertir rutas a URLs relativas
         if 'graphs' in result:
-            graphs_urls = []
-            for graph_path in result['graphs']:
-                if isinstance(graph_path, str):
-                    graph_file = Path(graph_path)
-                    if graph_file.exists():
-                        relative_path = graph_file.relative_to(OUTPUT_DIR)
-                        graphs_urls.append(f"/graphs/{relative_path}")
-            result['graphs'] = graphs_urls
+            result['graphs'] = graph_urls(result)
         
         # Limpiar archivo temporal
         upload_path.unlink()
@@ -379,30 +499,226 @@ def process_bindash():
         return jsonify({
             'message': 'Archivo BinDash procesado exitosamente',
             'file_type': 'bindash',
+            'upload': upload.summary(),
+            'bundle': f"/jobs/{output_dir.name}/bundle",
             **result
         })
         
     except Exception as e:
         logger.error(f"Error procesando BinDash: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        if output_dir is not None:
+            artifact_store.add(output_dir)
+
+@app.route('/process/<file_type>', methods=['POST'])
+def process_registered(file_type: str):
+    """
+    Procesar un archivo con el visualizador registrado para file_type
+    (sin auto-detección). Los visualizadores se ejecutan en este proceso,
+    con pandas/matplotlib ya importados.
+    """
+    config = FILE_TYPE_CONFIGS.get(file_type)
+    if not config or not config['visualizer_class']:
+        return jsonify({'error': f'No hay visualizador registrado para: {file_type}'}), 404
+
+    upload_path = output_dir = None
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No se proporcionó archivo'}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No se seleccionó archivo'}), 400
+
+        # Guardar archivo
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        upload_path = UPLOAD_DIR / f"{file_type}_{timestamp}_{filename}"
+        upload = save_upload(file, upload_path)
+
+        output_dir = OUTPUT_DIR / f"{file_type}_{timestamp}"
+        output_dir.mkdir(exist_ok=True)
+
+        visualizer = get_visualizer(file_type, output_dir)
+        result = visualizer.process_file(upload_path)
+        result['graphs'] = graph_urls(result)
+
+        if 'error' in result:
+            return jsonify({
+                **result,
+                'error': 'Error al procesar el archivo',
+                'details': result['error'],
+                'file_type': file_type
+            }), 422
+
+        return jsonify({
+            'message': 'Procesamiento completado',
+            'file_type': file_type,
+            'upload': upload.summary(),
+            'bundle': f"/jobs/{output_dir.name}/bundle",
+            **result
+        })
+
+    except Exception as e:
+        logger.error(f"Error procesando {file_type}: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if upload_path is not None:
+            upload_path.unlink(missing_ok=True)
+        if output_dir is not None:
+            artifact_store.add(output_dir)
+
+# Rutas equivalentes a las de BioGraphmaker (server.js reenvía aquí los archivos)
+@app.route('/process-annotations', methods=['POST'])
+def process_annotations():
+    return process_registered('annotations')
+
+@app.route('/process-hmmer', methods=['POST'])
+def process_hmmer():
+    return process_registered('hmmer')
+
+@app.route('/process-seed-orthologs', methods=['POST'])
+def process_seed_orthologs():
+    return process_registered('seed_orthologs')
+
+@app.route('/process-enrichment', methods=['POST'])
+def process_enrichment():
+    """
+    Enriquecimiento funcional (hipergeométrico + BH) de varios archivos
+    de anotaciones eggNOG frente a la colección.
+
+    Form data:
+        files: Archivos .emapper.annotations (uno por genoma)
+        column: Columna a evaluar (default: PFAMs)
+        alpha: Umbral de q-value (default: 0.05)
+        groups: JSON opcional {archivo: cluster} para probar clusters
+    """
+    from visualizers.annotations_visualizer import read_emapper_annotations
+    from visualizers.enrichment import enrichment_from_annotations, significant_terms, plot_enrichment_heatmap
+
+    upload_paths = []
+    output_dir = None
+    try:
+        files = [f for f in request.files.getlist('files') if f.filename]
+        if len(files) < 2:
+            return jsonify({'error': 'Se requieren al menos dos archivos de anotaciones'}), 400
+
+        column = request.form.get('column', 'PFAMs')
+        alpha = float(request.form.get('alpha', 0.05))
+        groups = json.loads(request.form['groups']) if request.form.get('groups') else None
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        annotations = {}
+        for file in files:
+            filename = secure_filename(file.filename)
+            upload_path = UPLOAD_DIR / f"enrichment_{timestamp}_{filename}"
+            save_upload(file, upload_path)
+            upload_paths.append(upload_path)
+            annotations[file.filename] = read_emapper_annotations(upload_path)
+
+        results = enrichment_from_annotations(annotations, column, groups=groups)
+        significant = significant_terms(results, alpha=alpha)
+
+        output_dir = OUTPUT_DIR / f"enrichment_{timestamp}"
+        output_dir.mkdir(exist_ok=True)
+        results.to_csv(output_dir / f'enrichment_{column}.tsv', sep='\t', index=False)
+
+        graphs = []
+        heatmap = plot_enrichment_heatmap(
+            significant if not significant.empty else results, output_dir / f'enrichment_{column}.png',
+            title=f'Enriquecimiento de {column}')
+        if heatmap:
+            graphs.append(versioned_url('/graphs', OUTPUT_DIR, Path(heatmap)))
+
+        return jsonify({
+            'message': 'Enriquecimiento calculado exitosamente',
+            'column': column,
+            'samples': list(annotations.keys()),
+            'total_tests': len(results),
+            'significant': significant.head(200).to_dict(orient='records'),
+            'bundle': f"/jobs/{output_dir.name}/bundle",
+            'table': versioned_url('/graphs', OUTPUT_DIR, output_dir / f'enrichment_{column}.tsv'),
+            'graphs': graphs
+        })
+
+    except Exception as e:
+        logger.error(f"Error calculando enriquecimiento: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        for upload_path in upload_paths:
+            upload_path.unlink(missing_ok=True)
+        if output_dir is not None:
+            artifact_store.add(output_dir)
 
 # ========== RUTAS DE SERVICIO ==========
 
 @app.route('/graphs/<path:filename>')
 def serve_graph(filename):
-    """Servir archivos de gráficos"""
+    """Servir archivos de gráficos (ETag por contenido, 304, rangos y sendfile opcional)"""
     try:
-        return send_from_directory(OUTPUT_DIR, filename)
+        response = send_static(OUTPUT_DIR, filename)
+        # El acceso renueva la caducidad del trabajo (primer componente de la ruta)
+        artifact_store.touch(Path(filename).parts[0])
+        return response
     except Exception as e:
         logger.error(f"Error sirviendo gráfico {filename}: {e}")
         return jsonify({'error': 'Archivo no encontrado'}), 404
 
+@app.route('/jobs/<job_id>/bundle')
+def job_bundle(job_id: str):
+    """
+    Descargar todos los artefactos de un trabajo en un único zip o tar.
+
+    El archivo se genera en streaming (memoria constante) y el trabajo se
+    protege del barrido mientras dura la descarga.
+    """
+    bundle_format = request.args.get('format', 'zip').lower()
+    if bundle_format not in BUNDLE_FORMATS:
+        return jsonify({'error': f'Formato no soportado: {bundle_format}',
+                        'supported_formats': list(BUNDLE_FORMATS)}), 400
+
+    job_dir = OUTPUT_DIR / job_id
+    if job_id != secure_filename(job_id) or not job_dir.is_dir():
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+
+    files = job_files(job_dir)
+    headers = {'Content-Disposition': f'attachment; filename="{job_id}.{bundle_format}"'}
+    if bundle_format == 'tar':
+        headers['Content-Length'] = str(tar_size(files, job_id))
+        stream = stream_tar
+    else:
+        stream = stream_zip
+
+    def generate():
+        with artifact_store.in_use(job_id):
+            yield from stream(files, job_id)
+
+    return Response(generate(), mimetype=BUNDLE_FORMATS[bundle_format], headers=headers)
+
+@app.route('/jobs/<job_id>/profile/<name>')
+def job_profile(job_id: str, name: str):
+    """Servir los archivos de perfilado de un trabajo (sólo administradores)"""
+    from visualizers.profiling import PROFILE_DIRNAME, PROFILE_FILES
+
+    if not is_admin_request():
+        return jsonify({'error': 'No autorizado'}), 401
+    if name not in PROFILE_FILES or job_id != secure_filename(job_id):
+        return jsonify({'error': 'Archivo no encontrado', 'available': list(PROFILE_FILES)}), 404
+
+    profile_path = OUTPUT_DIR / job_id / PROFILE_DIRNAME / name
+    if not profile_path.is_file():
+        return jsonify({'error': 'El trabajo no tiene perfil'}), 404
+    artifact_store.touch(job_id)
+    return send_file(profile_path, as_attachment=True, download_name=f"{job_id}_{name}",
+                     mimetype='application/octet-stream' if name.endswith('.pstats') else 'text/plain')
+
 @app.route('/cleanup', methods=['POST'])
 def cleanup():
-    """Limpiar archivos temporales"""
+    """Forzar un barrido del almacén (normalmente lo hace el hilo de fondo)"""
     try:
-        clean_old_files()
-        return jsonify({'message': 'Limpieza completada'})
+        result = artifact_store.sweep()
+        return jsonify({'message': 'Limpieza completada', **result, 'storage': artifact_store.stats()})
     except Exception as e:
         logger.error(f"Error en limpieza: {e}")
         return jsonify({'error': str(e)}), 500
@@ -412,8 +728,7 @@ def clear_uploads():
     """Limpiar directorio uploads completamente"""
     try:
         # Verificar autorización básica
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or auth_header != 'Bearer tu_token_secreto':
+        if not is_admin_request():
             return jsonify({'error': 'No autorizado'}), 401
         
         # Limpiar directorio uploads
@@ -430,6 +745,7 @@ def clear_uploads():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 # ========== INICIALIZACIÓN ==========
+# Producción: gunicorn -c gunicorn.conf.py app:app (workers pre-forkeados y precalentados)
 
 if __name__ == '__main__':
     logger.info("🧬 Iniciando Servidor Multi-Genómico de Visualización FungiGT...")
@@ -444,7 +760,12 @@ if __name__ == '__main__':
     logger.info(f"🚧 En desarrollo: {', '.join(in_development)}")
     logger.info("🚀 Servidor disponible en http://localhost:4003")
     
-    # Limpiar archivos al iniciar
-    clean_old_files()
+    # Sincronizar el índice de resultados y barrer en segundo plano (con el
+    # recargador de debug, sólo en el proceso que sirve las peticiones)
+    artifact_store.reconcile()
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        artifact_store.start_sweeper()
+    from visualizers.warmup import warm_up
+    warm_up()
     
     app.run(host='0.0.0.0', port=4003, debug=True) 
\ No newline at end of file
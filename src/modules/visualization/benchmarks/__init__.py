@@ -0,0 +1,9 @@
+"""
+Benchmarks de los Visualizadores de FungiGT
+===========================================
+
+Generadores deterministas de datos sintéticos (BinDash, eggNOG-mapper,
+hmmscan) y un ejecutor que mide las etapas parse, matrix, clustering, stats
+y render a distintos números de genomas, guarda los resultados en JSON y
+señala regresiones frente a una referencia. Ver runner.py para el uso.
+"""
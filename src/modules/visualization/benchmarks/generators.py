@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Generadores de Datos Genómicos Sintéticos
+=========================================
+
+Archivos deterministas (misma semilla -> mismos bytes) con el formato real
+de cada herramienta, escalados por número de genomas:
+
+- bindash_pairs: pares todos-contra-todos de BinDash (o los k vecinos más
+  cercanos por genoma si se limita), con estructura de clusters
+- bindash_matrix: matriz cuadrada de distancias con nombres de genoma
+- emapper_annotations: tabla .emapper.annotations con términos COG, GO,
+  KEGG y Pfam de frecuencia tipo Zipf (pocos términos muy comunes y una
+  cola larga, como en proteomas reales)
+- domtblout: tabla --domtblout de hmmscan con 1-4 dominios por proteína
+- seed_orthologs: .emapper.seed_orthologs con su encabezado '#qseqid'
+
+Todas las funciones escriben en `path` y devuelven el número de filas de
+datos escritas.
+"""
+
+import math
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 20240501
+# Filas escritas por bloque (acota la memoria de los generadores)
+BLOCK_ROWS = 250_000
+
+# k-mer de BinDash/Mash para convertir distancia en Jaccard
+KMER_SIZE = 21
+SKETCH_SIZE = 1000
+MAX_DISTANCE = 0.35
+
+# Frecuencias aproximadas de categorías COG en proteomas fúngicos
+COG_FREQUENCIES = {
+    'S': 0.22, '-': 0.18, 'K': 0.06, 'O': 0.06, 'U': 0.05, 'T': 0.05, 'J': 0.05,
+    'A': 0.04, 'E': 0.04, 'G': 0.04, 'L': 0.04, 'Z': 0.03, 'Q': 0.03, 'C': 0.03,
+    'I': 0.02, 'P': 0.02, 'D': 0.01, 'B': 0.01, 'H': 0.01, 'M': 0.01,
+}
+COMMON_PFAMS = [
+    'Pkinase', 'WD40', 'MFS_1', 'p450', 'Zn_clus', 'Fungal_trans', 'ABC_tran', 'RRM_1',
+    'Helicase_C', 'DEAD', 'adh_short', 'Sugar_tr', 'AAA', 'Ank_2', 'zf-C2H2',
+    'Methyltransf_11', 'Abhydrolase_1', 'Aminotran_1_2', 'TPR_1', 'HET',
+]
+FUNGAL_TAXIDS = [4751, 5061, 5062, 5141, 4932, 5270, 5476, 148305]
+
+EMAPPER_COLUMNS = [
+    'query', 'seed_ortholog', 'evalue', 'score', 'eggNOG_OGs', 'max_annot_lvl', 'COG_category',
+    'Description', 'Preferred_name', 'GOs', 'EC', 'KEGG_ko', 'KEGG_Pathway', 'KEGG_Module',
+    'KEGG_Reaction', 'KEGG_rclass', 'BRITE', 'KEGG_TC', 'CAZy', 'BiGG_Reaction', 'PFAMs',
+]
+SEED_COLUMNS = ['qseqid', 'sseqid', 'evalue', 'bitscore', 'qstart', 'qend',
+                'sstart', 'send', 'pident', 'qcov', 'scov']
+
+
+def genome_name(index: int) -> str:
+    return f"genome_{index:05d}"
+
+
+def _zipf_ids(rng: np.random.Generator, vocabulary: int, size: int, exponent: float = 1.3) -> np.ndarray:
+    """Identificadores 0..vocabulary-1 con frecuencia decreciente tipo Zipf."""
+    ranks = np.arange(1, vocabulary + 1)
+    weights = ranks ** -exponent
+    return rng.choice(vocabulary, size=size, p=weights / weights.sum())
+
+
+def _term_lists(rng: np.random.Generator, size: int, vocabulary: int, fmt: str,
+                missing: float, mean_terms: float) -> np.ndarray:
+    """Listas de términos separadas por comas ('-' si la proteína no tiene ninguno)."""
+    counts = np.where(rng.random(size) < missing, 0, 1 + rng.poisson(max(mean_terms - 1, 0), size))
+    ids = _zipf_ids(rng, vocabulary, int(counts.sum()))
+    out = np.empty(size, dtype=object)
+    start = 0
+    for i, count in enumerate(counts):
+        if count == 0:
+            out[i] = '-'
+        else:
+            out[i] = ','.join(fmt % term for term in sorted(set(ids[start:start + count])))
+            start += count
+    return out
+
+
+def _genome_coordinates(n_genomes: int, rng: np.random.Generator) -> np.ndarray:
+    """Coordenadas latentes agrupadas: genomas del mismo cluster quedan cerca."""
+    n_clusters = max(1, int(math.sqrt(n_genomes)))
+    centers = rng.normal(size=(n_clusters, 8))
+    membership = rng.integers(0, n_clusters, n_genomes)
+    return centers[membership] + rng.normal(scale=0.15, size=(n_genomes, 8))
+
+
+def _pair_columns(distance: np.ndarray):
+    """p-value y Jaccard 'a/SKETCH_SIZE' coherentes con la distancia de Mash."""
+    p_value = np.power(10.0, -np.clip(300 * (MAX_DISTANCE - distance), 0, 300))
+    shared = np.exp(-KMER_SIZE * distance)
+    jaccard = np.rint(shared / (2 - shared) * SKETCH_SIZE).astype(int)
+    return p_value, jaccard
+
+
+def bindash_pairs(path: Path, n_genomes: int, seed: int = DEFAULT_SEED,
+                  max_neighbors: Optional[int] = None) -> int:
+    """
+    Salida de `bindash dist` todos-contra-todos (ambas direcciones, sin
+    autocomparaciones).
+
+    Args:
+        path: Archivo de salida
+        n_genomes: Número de genomas
+        seed: Semilla
+        max_neighbors: Si se indica, sólo los k vecinos más cercanos de cada
+            genoma (como con un umbral de distancia en BinDash)
+
+    Returns:
+        Filas escritas
+    """
+    rng = np.random.default_rng(seed)
+    coords = _genome_coordinates(n_genomes, rng)
+    paths = np.array([f"/data/genomes/{genome_name(i)}.fna" for i in range(n_genomes)], dtype=object)
+    k = n_genomes - 1 if not max_neighbors else min(max_neighbors, n_genomes - 1)
+
+    rows = 0
+    queries_per_block = max(1, BLOCK_ROWS // max(k, 1))
+    with open(path, 'w') as f:
+        for start in range(0, n_genomes, queries_per_block):
+            queries = np.arange(start, min(start + queries_per_block, n_genomes))
+            diff = coords[queries, None, :] - coords[None, :, :]
+            distance = np.sqrt((diff ** 2).sum(axis=2)) * 0.03
+            distance[np.arange(len(queries)), queries] = np.inf
+            if k < n_genomes - 1:
+                targets = np.argpartition(distance, k, axis=1)[:, :k]
+            else:
+                targets = np.argsort(distance, axis=1)[:, :k]
+            distance = np.clip(np.take_along_axis(distance, targets, axis=1), 0, MAX_DISTANCE).ravel()
+            distance = np.round(distance + rng.random(distance.size) * 1e-4, 5)
+            p_value, jaccard = _pair_columns(distance)
+            block = pd.DataFrame({
+                'query': np.repeat(paths[queries], k),
+                'target': paths[targets.ravel()],
+                'distance': distance,
+                'p_value': p_value,
+                'jaccard': [f"{j}/{SKETCH_SIZE}" for j in jaccard],
+            })
+            block.to_csv(f, sep='\t', header=False, index=False, float_format='%.5g')
+            rows += len(block)
+    return rows
+
+
+def bindash_matrix(path: Path, n_genomes: int, seed: int = DEFAULT_SEED) -> int:
+    """
+    Matriz cuadrada de distancias (primera columna y encabezado = genomas).
+
+    Returns:
+        Filas escritas (una por genoma)
+    """
+    rng = np.random.default_rng(seed)
+    coords = _genome_coordinates(n_genomes, rng)
+    names = [f"{genome_name(i)}.fna" for i in range(n_genomes)]
+    with open(path, 'w') as f:
+        f.write('\t' + '\t'.join(names) + '\n')
+        block_rows = max(1, BLOCK_ROWS // n_genomes)
+        for start in range(0, n_genomes, block_rows):
+            stop = min(start + block_rows, n_genomes)
+            diff = coords[start:stop, None, :] - coords[None, :, :]
+            distance = np.clip(np.sqrt((diff ** 2).sum(axis=2)) * 0.03, 0, MAX_DISTANCE)
+            distance[np.arange(stop - start), np.arange(start, stop)] = 0.0
+            pd.DataFrame(distance, index=names[start:stop]).to_csv(
+                f, sep='\t', header=False, float_format='%.5f')
+    return n_genomes
+
+
+def _protein_ids(n_genomes: int, rows_per_genome: int, start: int, stop: int) -> np.ndarray:
+    index = np.arange(start, stop)
+    genomes, proteins = np.divmod(index, rows_per_genome)
+    return np.array([f"{genome_name(g)}|prot_{p:06d}" for g, p in zip(genomes, proteins)], dtype=object)
+
+
+def emapper_annotations(path: Path, n_genomes: int, rows_per_genome: int = 50,
+                        seed: int = DEFAULT_SEED) -> int:
+    """
+    Tabla .emapper.annotations (eggNOG-mapper 2.1).
+
+    Returns:
+        Filas escritas (n_genomes * rows_per_genome)
+    """
+    rng = np.random.default_rng(seed)
+    total = n_genomes * rows_per_genome
+    cog_letters = np.array(list(COG_FREQUENCIES))
+    cog_weights = np.array(list(COG_FREQUENCIES.values()))
+    cog_weights = cog_weights / cog_weights.sum()
+    pfam_names = np.array(COMMON_PFAMS + [f"DUF{i:04d}" for i in range(1, 2981)], dtype=object)
+
+    with open(path, 'w') as f:
+        f.write('## emapper-2.1.12\n## time: synthetic benchmark\n')
+        f.write('#' + '\t'.join(EMAPPER_COLUMNS) + '\n')
+        for start in range(0, total, BLOCK_ROWS):
+            size = min(BLOCK_ROWS, total - start)
+            cog = rng.choice(cog_letters, size=size, p=cog_weights).astype(object)
+            # ~5% de proteínas con dos categorías (p. ej. 'KL')
+            double = (rng.random(size) < 0.05) & (cog != '-')
+            cog[double] = cog[double] + rng.choice(cog_letters[cog_letters != '-'], size=int(double.sum()))
+            pfams = _zipf_ids(rng, len(pfam_names), size)
+            block = pd.DataFrame({
+                'query': _protein_ids(n_genomes, rows_per_genome, start, start + size),
+                'seed_ortholog': [f"{t}.P{i:07d}" for t, i in zip(rng.choice(FUNGAL_TAXIDS, size),
+                                                                  rng.integers(0, 10 ** 7, size))],
+                'evalue': np.power(10.0, -rng.uniform(5, 200, size)),
+                'score': np.round(rng.gamma(2.0, 150.0, size) + 30, 1),
+                'eggNOG_OGs': [f"KOG{i:04d}@2759|Fungi" for i in _zipf_ids(rng, 5000, size)],
+                'max_annot_lvl': '4751|Fungi',
+                'COG_category': cog,
+                'Description': '-',
+                'Preferred_name': '-',
+                'GOs': _term_lists(rng, size, 8000, 'GO:%07d', missing=0.55, mean_terms=12),
+                'EC': np.where(rng.random(size) < 0.25,
+                               [f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 30, (size, 4))], '-'),
+                'KEGG_ko': _term_lists(rng, size, 4000, 'ko:K%05d', missing=0.5, mean_terms=1.1),
+                'KEGG_Pathway': _term_lists(rng, size, 400, 'map%05d', missing=0.65, mean_terms=2.5),
+                'KEGG_Module': _term_lists(rng, size, 300, 'M%05d', missing=0.85, mean_terms=1.2),
+                'KEGG_Reaction': '-',
+                'KEGG_rclass': '-',
+                'BRITE': _term_lists(rng, size, 60, 'ko%05d', missing=0.5, mean_terms=2),
+                'KEGG_TC': '-',
+                'CAZy': np.where(rng.random(size) < 0.04,
+                                 [f"GH{i}" for i in _zipf_ids(rng, 150, size)], '-'),
+                'BiGG_Reaction': '-',
+                'PFAMs': np.where(rng.random(size) < 0.15, '-', pfam_names[pfams]),
+            })
+            block.to_csv(f, sep='\t', header=False, index=False, float_format='%.3g')
+    return total
+
+
+def domtblout(path: Path, n_genomes: int, rows_per_genome: int = 50,
+              seed: int = DEFAULT_SEED) -> int:
+    """
+    Tabla --domtblout de hmmscan (1-4 dominios por proteína).
+
+    Args:
+        rows_per_genome: Proteínas por genoma
+
+    Returns:
+        Filas de dominio escritas
+    """
+    rng = np.random.default_rng(seed)
+    total_proteins = n_genomes * rows_per_genome
+    domain_names = np.array(COMMON_PFAMS + [f"DUF{i:04d}" for i in range(1, 2981)], dtype=object)
+    rows = 0
+    with open(path, 'w') as f:
+        f.write('# target name        accession   tlen query name           accession   qlen   '
+                'E-value  score  bias   #  of  c-Evalue  i-Evalue  score  bias  from    to  from    '
+                'to  from    to  acc description of target\n')
+        f.write('#' + '-' * 150 + '\n')
+        for start in range(0, total_proteins, BLOCK_ROWS // 2):
+            size = min(BLOCK_ROWS // 2, total_proteins - start)
+            proteins = _protein_ids(n_genomes, rows_per_genome, start, start + size)
+            n_domains = rng.choice([1, 2, 3, 4], size=size, p=[0.55, 0.3, 0.1, 0.05])
+            target = np.repeat(proteins, n_domains)
+            tlen = np.repeat(rng.integers(150, 2000, size), n_domains)
+            count = len(target)
+            domain_ids = _zipf_ids(rng, len(domain_names), count)
+            qlen = 50 + domain_ids % 300
+            evalue = np.power(10.0, -rng.uniform(3, 120, count))
+            score = np.round(-np.log10(evalue) * 3.2 + rng.uniform(0, 20, count), 1)
+            hmm_from = rng.integers(1, 10, count)
+            hmm_to = np.maximum(hmm_from + 10, qlen - rng.integers(0, 10, count))
+            env_from = (rng.random(count) * np.maximum(tlen - qlen, 1)).astype(int) + 1
+            env_to = np.minimum(env_from + (hmm_to - hmm_from), tlen)
+            ordinal = np.concatenate([np.arange(1, n + 1) for n in n_domains])
+            of = np.repeat(n_domains, n_domains)
+            lines = [
+                f"{t:<20} - {tl:5d} {domain_names[d]:<20} PF{d:05d}.{d % 9 + 1} {ql:5d} "
+                f"{e:9.2g} {s:6.1f} {0.1:5.1f} {o:3d} {n:3d} {e:9.2g} {e * 2:9.2g} {s:6.1f} {0.1:5.1f} "
+                f"{hf:5d} {ht:5d} {ef:5d} {et:5d} {ef:5d} {et:5d} {0.9:4.2f} {domain_names[d]} domain\n"
+                for t, tl, d, ql, e, s, o, n, hf, ht, ef, et in zip(
+                    target, tlen, domain_ids, qlen, evalue, score, ordinal, of,
+                    hmm_from, hmm_to, env_from, env_to)
+            ]
+            f.writelines(lines)
+            rows += count
+    return rows
+
+
+def seed_orthologs(path: Path, n_genomes: int, rows_per_genome: int = 50,
+                   seed: int = DEFAULT_SEED) -> int:
+    """
+    Tabla .emapper.seed_orthologs (búsqueda diamond/mmseqs de eggNOG-mapper).
+
+    Returns:
+        Filas escritas (n_genomes * rows_per_genome)
+    """
+    rng = np.random.default_rng(seed)
+    total = n_genomes * rows_per_genome
+    with open(path, 'w') as f:
+        f.write('## emapper-2.1.12\n')
+        f.write('#' + '\t'.join(SEED_COLUMNS) + '\n')
+        for start in range(0, total, BLOCK_ROWS):
+            size = min(BLOCK_ROWS, total - start)
+            qlen = rng.integers(80, 1500, size)
+            slen = np.clip(qlen + rng.integers(-200, 200, size), 50, None)
+            qstart = rng.integers(1, 20, size)
+            qend = np.maximum(qstart + 30, qlen - rng.integers(0, 40, size))
+            sstart = rng.integers(1, 20, size)
+            send = np.maximum(sstart + 30, slen - rng.integers(0, 40, size))
+            pident = np.round(np.clip(rng.beta(5, 2, size) * 100, 20, 100), 1)
+            evalue = np.power(10.0, -rng.uniform(5, 250, size))
+            block = pd.DataFrame({
+                'qseqid': _protein_ids(n_genomes, rows_per_genome, start, start + size),
+                'sseqid': [f"{t}.P{i:07d}" for t, i in zip(rng.choice(FUNGAL_TAXIDS, size),
+                                                           rng.integers(0, 10 ** 7, size))],
+                'evalue': evalue,
+                'bitscore': np.round(-np.log10(evalue) * 3.5 + rng.uniform(0, 30, size), 1),
+                'qstart': qstart, 'qend': qend, 'sstart': sstart, 'send': send,
+                'pident': pident,
+                'qcov': np.round((qend - qstart + 1) / qlen * 100, 1),
+                'scov': np.round((send - sstart + 1) / slen * 100, 1),
+            })
+            block.to_csv(f, sep='\t', header=False, index=False, float_format='%.3g')
+    return total
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Ejecución y Comparación de Benchmarks
+=====================================
+
+Cada caso (tipo de archivo x número de genomas) se ejecuta en un proceso
+nuevo (spawn), de modo que el pico de RSS es el del caso y un caso que
+excede el tiempo límite se puede terminar sin perder los demás. Las etapas
+se miden con el StageRecorder de los visualizadores, así que los nombres
+coinciden con los de 'timings' y /metrics (más las etapas propias del
+benchmark: matrix, clustering, render).
+
+Uso (desde src/modules/visualization):
+
+    python -m benchmarks run --sizes 10,100,1000,10000 --output results.json
+    python -m benchmarks run --cases bindash_pairs --baseline benchmarks/baseline.json
+    python -m benchmarks compare results.json benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks imports --budget 0.5
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from . import generators
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_PATH = BENCHMARK_DIR / 'baseline.json'
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_TIMEOUT = 900
+# Por encima de este número de genomas no se dibujan los gráficos de BinDash
+# (los heatmaps anotados de N x N celdas no son viables)
+DEFAULT_RENDER_MAX_GENOMES = 1000
+# BinDash todos-contra-todos hasta este tamaño; por encima, k vecinos
+DEFAULT_MAX_NEIGHBORS = 100
+ALL_PAIRS_MAX_GENOMES = 1000
+DEFAULT_ROWS_PER_GENOME = 50
+# Una etapa es regresión si empeora más del umbral relativo y del absoluto
+DEFAULT_THRESHOLD = 0.2
+MIN_DELTA_SECONDS = 0.05
+# Importar app.py debe ser rápido y no cargar la pila científica (se carga al
+# primer archivo o en el precalentamiento en segundo plano)
+DEFAULT_IMPORT_BUDGET = 0.5
+DEFAULT_IMPORT_REPEAT = 3
+HEAVY_MODULES = ('pandas', 'matplotlib', 'scipy', 'sklearn')
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps({{'seconds': time.perf_counter() - start,\n"
+    "                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))\n"
+)
+
+
+class Case(NamedTuple):
+    """Caso de benchmark: generador, visualizador y etapas a medir."""
+    generate: Callable
+    visualizer: str
+    suffix: str
+    stages: str
+
+
+CASES: Dict[str, Case] = {
+    'bindash_pairs': Case(generators.bindash_pairs,
+                          'visualizers.bindash_visualizer.BinDashVisualizer', '.tsv', 'bindash'),
+    'bindash_matrix': Case(generators.bindash_matrix,
+                           'visualizers.bindash_visualizer.BinDashVisualizer', '.distances', 'bindash'),
+    'annotations': Case(generators.emapper_annotations,
+                        'visualizers.annotations_visualizer.AnnotationsVisualizer',
+                        '.emapper.annotations', 'table'),
+    'hmmer': Case(generators.domtblout,
+                  'visualizers.hmmer_visualizer.HMMERVisualizer', '.domtblout', 'table'),
+    'seed_orthologs': Case(generators.seed_orthologs,
+                           'visualizers.seed_orthologs_visualizer.SeedOrthologsVisualizer',
+                           '.emapper.seed_orthologs', 'table'),
+}
+
+
+# ========== GENERACIÓN DE DATOS ==========
+
+def _generator_kwargs(case_name: str, genomes: int, options: argparse.Namespace) -> Dict:
+    kwargs = {'seed': options.seed}
+    if case_name == 'bindash_pairs':
+        if genomes > ALL_PAIRS_MAX_GENOMES:
+            kwargs['max_neighbors'] = options.max_neighbors
+    elif case_name != 'bindash_matrix':
+        kwargs['rows_per_genome'] = options.rows_per_genome
+    return kwargs
+
+
+def prepare_input(case_name: str, genomes: int, options: argparse.Namespace) -> Dict:
+    """
+    Generar (o reutilizar) el archivo de entrada de un caso.
+
+    El nombre del archivo incluye los parámetros, así que un archivo
+    existente es idéntico al que se generaría.
+    """
+    case = CASES[case_name]
+    kwargs = _generator_kwargs(case_name, genomes, options)
+    params = '_'.join(f"{key}{value}" for key, value in sorted(kwargs.items()))
+    path = Path(options.data_dir) / f"{case_name}_{genomes}_{params}{case.suffix}"
+    meta_path = path.with_name(path.name + '.json')
+
+    if path.exists() and meta_path.exists():
+        return json.loads(meta_path.read_text())
+
+    start = time.perf_counter()
+    rows = case.generate(path, genomes, **kwargs)
+    meta = {'path': str(path), 'rows': rows, 'file_bytes': path.stat().st_size,
+            'generator_params': kwargs, 'generate_seconds': round(time.perf_counter() - start, 3)}
+    meta_path.write_text(json.dumps(meta))
+    return meta
+
+
+# ========== EJECUCIÓN DE UN CASO (proceso hijo) ==========
+
+def _load_class(dotted: str):
+    module_name, class_name = dotted.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _run_stages(case: Case, visualizer, path: Path, genomes: int, render_max: int, emit: Callable) -> None:
+    recorder = visualizer.recorder
+
+    with recorder.stage('validate'):
+        if not visualizer.validate_file(path):
+            raise ValueError(f"{path.name} no es válido para {type(visualizer).__name__}")
+    emit()
+
+    with recorder.stage('parse'):
+        data = visualizer.parse_file(path)
+    emit()
+
+    if case.stages == 'bindash':
+        from scipy.cluster.hierarchy import linkage
+        from scipy.spatial.distance import squareform
+        import numpy as np
+
+        with recorder.stage('matrix'):
+            matrix = visualizer.get_distance_matrix(data)
+        emit()
+        with recorder.stage('clustering'):
+            values = matrix.to_numpy(dtype=float)
+            values = (values + values.T) / 2
+            np.fill_diagonal(values, 0)
+            linkage(squareform(values, checks=False), method='average')
+        emit()
+
+    with recorder.stage('stats'):
+        visualizer.generate_statistics(data)
+    emit()
+
+    if case.stages != 'bindash' or genomes <= render_max:
+        recorder.mark()
+        with recorder.stage('render'):
+            visualizer.generate_visualizations(data)
+        emit()
+
+
+def _case_worker(case_name: str, path: str, genomes: int, render_max: int, results) -> None:
+    """Ejecutar las etapas de un caso y enviar cada etapa terminada por la cola."""
+    from visualizers.instrumentation import StageRecorder, peak_rss
+
+    # Sólo el informe del benchmark en la salida
+    logging.disable(logging.INFO)
+    warnings.simplefilter('ignore')
+
+    case = CASES[case_name]
+    sent = 0
+
+    def emit():
+        nonlocal sent
+        timings = recorder.timings[sent:]
+        sent += len(timings)
+        results.put(('stages', [timing.summary() for timing in timings]))
+
+    with tempfile.TemporaryDirectory(prefix='fungigt-bench-') as output_dir:
+        visualizer = _load_class(case.visualizer)(Path(output_dir))
+        recorder = visualizer.recorder = StageRecorder()
+        try:
+            # Los visualizadores informan con print(); no se mezcla con el informe
+            with contextlib.redirect_stdout(io.StringIO()):
+                _run_stages(case, visualizer, Path(path), genomes, render_max, emit)
+            results.put(('done', {'peak_rss_bytes': peak_rss(),
+                                  'total_wall_seconds': round(recorder.elapsed(), 4)}))
+        except Exception as e:
+            emit()
+            results.put(('error', f"{type(e).__name__}: {e}"))
+        finally:
+            recorder.finish()
+
+
+def run_case(case_name: str, genomes: int, options: argparse.Namespace) -> Dict:
+    """Generar la entrada y ejecutar un caso en un proceso aislado con tiempo límite."""
+    data = prepare_input(case_name, genomes, options)
+    result = {'case': case_name, 'genomes': genomes, 'rows': data['rows'],
+              'file_bytes': data['file_bytes'], 'status': 'ok', 'stages': []}
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_case_worker, daemon=True,
+                              args=(case_name, data['path'], genomes, options.render_max_genomes, results))
+    process.start()
+    deadline = time.monotonic() + options.timeout
+    try:
+        while True:
+            try:
+                kind, payload = results.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    result['status'] = 'timeout'
+                    break
+                if not process.is_alive():
+                    result['status'] = 'error'
+                    result['error'] = f"El proceso terminó con código {process.exitcode}"
+                    break
+                continue
+            if kind == 'stages':
+                result['stages'].extend(payload)
+            elif kind == 'done':
+                result.update(payload)
+                break
+            else:
+                result['status'] = 'error'
+                result['error'] = payload
+                break
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    return result
+
+
+# ========== RESULTADOS Y COMPARACIÓN ==========
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict:
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def stage_totals(result: Dict) -> Dict[str, float]:
+    """Tiempo real por nombre de etapa (las etapas repetidas se suman)."""
+    totals = defaultdict(float)
+    for stage in result.get('stages', []):
+        totals[stage['stage']] += stage['wall_seconds']
+    return dict(totals)
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD,
+            min_delta: float = MIN_DELTA_SECONDS) -> List[Dict]:
+    """
+    Comparar dos ejecuciones caso a caso y etapa a etapa.
+
+    Args:
+        current: Resultados actuales (formato de `run`)
+        baseline: Resultados de referencia
+        threshold: Empeoramiento relativo tolerado (0.2 = 20%)
+        min_delta: Empeoramiento absoluto mínimo en segundos para señalar
+
+    Returns:
+        Lista de diferencias con 'regression' = True en las que superan ambos umbrales
+    """
+    reference = {(r['case'], r['genomes']): r for r in baseline.get('results', [])}
+    rows = []
+    for result in current.get('results', []):
+        base = reference.get((result['case'], result['genomes']))
+        if base is None or base.get('status') != 'ok':
+            continue
+        key = {'case': result['case'], 'genomes': result['genomes']}
+
+        if result.get('status') != 'ok':
+            rows.append({**key, 'stage': 'status', 'baseline': base['status'],
+                         'current': result['status'], 'ratio': None, 'regression': True})
+
+        base_totals = stage_totals(base)
+        for stage, seconds in stage_totals(result).items():
+            before = base_totals.get(stage)
+            if before is None:
+                continue
+            ratio = seconds / before if before > 0 else None
+            regression = seconds - before > min_delta and (ratio is None or ratio > 1 + threshold)
+            rows.append({**key, 'stage': stage, 'baseline': before, 'current': seconds,
+                         'ratio': ratio, 'regression': regression})
+
+        before, after = base.get('peak_rss_bytes'), result.get('peak_rss_bytes')
+        if before and after:
+            rows.append({**key, 'stage': 'peak_rss_bytes', 'baseline': before, 'current': after,
+                         'ratio': after / before, 'regression': after > before * (1 + threshold)})
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> int:
+    """Mostrar la comparación y devolver el número de regresiones."""
+    regressions = [row for row in rows if row['regression']]
+    for row in rows:
+        if not (row['regression'] or row['stage'] in ('parse', 'matrix', 'clustering', 'stats', 'render')):
+            continue
+        ratio = f"x{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        flag = '❌ REGRESIÓN' if row['regression'] else '✅'
+        print(f"{flag:<13} {row['case']:<15} {row['genomes']:>6} {row['stage']:<30} "
+              f"{row['baseline']!s:>14} -> {row['current']!s:<14} {ratio}")
+    print(f"\n{len(regressions)} regresiones en {len(rows)} comparaciones")
+    return len(regressions)
+
+
+# ========== TIEMPO DE IMPORTACIÓN ==========
+
+def measure_import(module: str = 'app') -> Dict:
+    """
+    Importar un módulo en un intérprete nuevo (sin caché de sys.modules).
+
+    Returns:
+        Diccionario con 'seconds' (sólo el import, sin el arranque de Python)
+        y 'heavy' (módulos de HEAVY_MODULES cargados como efecto del import)
+    """
+    code = IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, '-c', code], cwd=BENCHMARK_DIR.parent,
+                               capture_output=True, text=True, check=True)
+    # La última línea es la medición; las anteriores son prints del propio módulo
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# ========== LÍNEA DE COMANDOS ==========
+
+def cmd_run(options: argparse.Namespace) -> int:
+    Path(options.data_dir).mkdir(parents=True, exist_ok=True)
+    cases = options.cases.split(',') if options.cases else list(CASES)
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        print(f"❌ Casos desconocidos: {', '.join(unknown)} (disponibles: {', '.join(CASES)})")
+        return 2
+    sizes = [int(size) for size in options.sizes.split(',')]
+
+    report = {'environment': environment(),
+              'options': {'seed': options.seed, 'rows_per_genome': options.rows_per_genome,
+                          'max_neighbors': options.max_neighbors,
+                          'render_max_genomes': options.render_max_genomes,
+                          'timeout': options.timeout},
+              'results': []}
+    for case_name in cases:
+        for genomes in sizes:
+            print(f"⏱️ {case_name} con {genomes} genomas...", flush=True)
+            result = run_case(case_name, genomes, options)
+            report['results'].append(result)
+            totals = stage_totals(result)
+            summary = ', '.join(f"{stage}={totals[stage]:.2f}s" for stage in
+                                ('parse', 'matrix', 'clustering', 'stats', 'render') if stage in totals)
+            print(f"   {result['status']}: {result['rows']} filas, {summary}", flush=True)
+
+    output = Path(options.output)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"📄 Resultados guardados en {output}")
+
+    if options.update_baseline:
+        BASELINE_PATH.write_text(json.dumps(report, indent=2))
+        print(f"📌 Referencia actualizada: {BASELINE_PATH}")
+    if options.baseline:
+        baseline = json.loads(Path(options.baseline).read_text())
+        return 1 if print_comparison(compare(report, baseline, options.threshold)) else 0
+    return 0
+
+
+def cmd_compare(options: argparse.Namespace) -> int:
+    current = json.loads(Path(options.results).read_text())
+    baseline = json.loads(Path(options.baseline).read_text())
+    return 1 if print_comparison(compare(current, baseline, options.threshold, options.min_delta)) else 0
+
+
+def cmd_imports(options: argparse.Namespace) -> int:
+    try:
+        runs = [measure_import(options.module) for _ in range(options.repeat)]
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error importando {options.module}:\n{e.stderr}")
+        return 1
+
+    # El mínimo descarta el ruido de disco y planificador entre repeticiones
+    seconds = min(run['seconds'] for run in runs)
+    heavy = sorted({name for run in runs for name in run['heavy']})
+    failures = 0
+    if seconds > options.budget:
+        print(f"❌ import {options.module}: {seconds:.3f}s (presupuesto {options.budget:.3f}s)")
+        failures += 1
+    else:
+        print(f"✅ import {options.module}: {seconds:.3f}s (presupuesto {options.budget:.3f}s)")
+    if heavy:
+        print(f"❌ Módulos pesados cargados al importar: {', '.join(heavy)}")
+        failures += 1
+    else:
+        print(f"✅ Sin módulos pesados ({', '.join(HEAVY_MODULES)})")
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmarks de los visualizadores de FungiGT')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='Generar datos y medir las etapas de cada visualizador')
+    run.add_argument('--cases', help=f"Casos separados por comas (por defecto: {','.join(CASES)})")
+    run.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                     help='Números de genomas separados por comas')
+    run.add_argument('--seed', type=int, default=generators.DEFAULT_SEED)
+    run.add_argument('--rows-per-genome', type=int, default=DEFAULT_ROWS_PER_GENOME,
+                     help='Proteínas por genoma en anotaciones, domtblout y seed_orthologs')
+    run.add_argument('--max-neighbors', type=int, default=DEFAULT_MAX_NEIGHBORS,
+                     help=f'Vecinos por genoma en BinDash por encima de {ALL_PAIRS_MAX_GENOMES} genomas')
+    run.add_argument('--render-max-genomes', type=int, default=DEFAULT_RENDER_MAX_GENOMES,
+                     help='Máximo de genomas para la etapa render de BinDash')
+    run.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Segundos máximos por caso')
+    run.add_argument('--data-dir', default=str(Path(tempfile.gettempdir()) / 'fungigt-benchmark-data'),
+                     help='Directorio de datos sintéticos (se reutilizan entre ejecuciones)')
+    run.add_argument('--output', default='benchmark_results.json')
+    run.add_argument('--baseline', help='Comparar con esta referencia al terminar')
+    run.add_argument('--update-baseline', action='store_true',
+                     help=f'Guardar los resultados como referencia en {BASELINE_PATH.name}')
+    run.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    run.set_defaults(func=cmd_run)
+
+    comparison = subparsers.add_parser('compare', help='Comparar resultados con una referencia')
+    comparison.add_argument('results')
+    comparison.add_argument('baseline', nargs='?', default=str(BASELINE_PATH))
+    comparison.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    comparison.add_argument('--min-delta', type=float, default=MIN_DELTA_SECONDS)
+    comparison.set_defaults(func=cmd_compare)
+
+    imports = subparsers.add_parser('imports', help='Comprobar el tiempo de importación del servidor')
+    imports.add_argument('--module', default='app')
+    imports.add_argument('--budget', type=float, default=DEFAULT_IMPORT_BUDGET, help='Segundos máximos')
+    imports.add_argument('--repeat', type=int, default=DEFAULT_IMPORT_REPEAT)
+    imports.set_defaults(func=cmd_imports)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # Los procesos hijos importan 'visualizers' desde el directorio del servidor
+    sys.path.insert(0, str(BENCHMARK_DIR.parent))
+    options = build_parser().parse_args(argv)
+    return options.func(options)
@@ -25,18 +25,17 @@ import matplotlib
 matplotlib.use('Agg')  # Backend no interactivo
 import matplotlib.pyplot as plt
 import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from scipy.cluster.hierarchy import dendrogram, linkage
-from scipy.spatial.distance import squareform
-from sklearn.manifold import MDS
-from sklearn.decomposition import PCA
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
+# Almacén de resultados compartido con el servidor de visualización principal
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from visualizers.artifact_store import ArtifactStore
+from visualizers.static_files import send_static, versioned_url
+from visualizers.streaming_stats import describe_columns
+
 app = Flask(__name__)
 
 # Configuración CORS
@@ -56,6 +55,9 @@ TEMP_DIR = BASE_DIR / 'temp'
 for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Índice de trabajos con caducidad de 1 hora sin acceso y barrido en segundo plano
+artifact_store = ArtifactStore(OUTPUT_DIR, max_age=3600, loose_dirs=[UPLOAD_DIR, TEMP_DIR])
+
 # Configuración de archivos permitidos
 ALLOWED_EXTENSIONS = {'.txt', '.tsv', '.csv', '.out', '.distances'}
 
@@ -63,22 +65,6 @@ def allowed_file(filename):
     """Verificar si el archivo tiene una extensión permitida"""
     return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
 
-def clean_old_files():
-    """Limpiar archivos temporales antiguos (más de 1 hora)"""
-    import time
-    current_time = time.time()
-    
-    for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR]:
-        if directory.exists():
-            for file_path in directory.iterdir():
-                if file_path.is_file():
-                    file_age = current_time - file_path.stat().st_mtime
-                    if file_age > 3600:  # 1 hora
-                        try:
-                            file_path.unlink()
-                        except Exception as e:
-                            print(f"Error eliminando {file_path}: {e}")
-
 class BinDashVisualizer:
     """Clase principal para visualización de resultados BinDash"""
     
@@ -294,6 +280,10 @@ class BinDashVisualizer:
     
     def plot_dendrogram(self, df):
         """Crear dendrograma filogenético mejorado"""
+        # scipy se importa sólo cuando se dibuja el dendrograma
+        from scipy.cluster.hierarchy import dendrogram, linkage
+        from scipy.spatial.distance import squareform
+
         distance_matrix = self.create_distance_matrix(df)
         
         # Verificar que la matriz sea válida
@@ -544,6 +534,9 @@ class BinDashVisualizer:
     
     def plot_mds_analysis(self, df):
         """Crear análisis MDS (Multidimensional Scaling)"""
+        # sklearn se importa sólo cuando se calcula el MDS
+        from sklearn.manifold import MDS
+
         distance_matrix = self.create_distance_matrix(df)
         
         # Aplicar MDS
@@ -574,17 +567,19 @@ class BinDashVisualizer:
     
     def generate_summary_stats(self, df):
         """Generar estadísticas resumen"""
+        columns = describe_columns(df, ['ANI', 'Mutation_distance', 'Jaccard_index'], quantiles=())
+        genomes = np.unique(np.concatenate([df['Query'].to_numpy(), df['Target'].to_numpy()]))
         stats = {
             'total_comparisons': len(df),
-            'unique_genomes': len(set(df['Query'].tolist() + df['Target'].tolist())),
-            'mean_ani': float(df['ANI'].mean()),
-            'std_ani': float(df['ANI'].std()),
-            'min_ani': float(df['ANI'].min()),
-            'max_ani': float(df['ANI'].max()),
-            'mean_mutation_distance': float(df['Mutation_distance'].mean()),
-            'std_mutation_distance': float(df['Mutation_distance'].std()),
-            'mean_jaccard': float(df['Jaccard_index'].mean()),
-            'std_jaccard': float(df['Jaccard_index'].std())
+            'unique_genomes': len(genomes),
+            'mean_ani': columns['ANI']['mean'],
+            'std_ani': columns['ANI']['std'],
+            'min_ani': columns['ANI']['min'],
+            'max_ani': columns['ANI']['max'],
+            'mean_mutation_distance': columns['Mutation_distance']['mean'],
+            'std_mutation_distance': columns['Mutation_distance']['std'],
+            'mean_jaccard': columns['Jaccard_index']['mean'],
+            'std_jaccard': columns['Jaccard_index']['std']
         }
         
         # Guardar estadísticas
@@ -691,6 +686,7 @@ def index():
 @app.route('/process-bindash', methods=['POST'])
 def process_bindash():
     """Procesar archivo de resultados BinDash"""
+    output_dir = None
     try:
         # Verificar archivo
         if 'file' not in request.files:
@@ -719,8 +715,7 @@ def process_bindash():
         # Convertir rutas a URLs relativas
         graphs_urls = []
         for graph_path in result['graphs']:
-            relative_path = Path(graph_path).relative_to(OUTPUT_DIR)
-            graphs_urls.append(f"/graphs/{relative_path}")
+            graphs_urls.append(versioned_url('/graphs', OUTPUT_DIR, Path(graph_path)))
         
         # Limpiar archivo temporal
         upload_path.unlink()
@@ -734,12 +729,17 @@ def process_bindash():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        if output_dir is not None and output_dir.exists():
+            artifact_store.add(output_dir)
 
 @app.route('/graphs/<path:filename>')
 def serve_graph(filename):
     """Servir archivos de gráficos"""
     try:
-        return send_from_directory(OUTPUT_DIR, filename)
+        response = send_static(OUTPUT_DIR, filename)
+        artifact_store.touch(Path(filename).parts[0])
+        return response
     except Exception as e:
         return jsonify({'error': 'Archivo no encontrado'}), 404
 
@@ -747,8 +747,8 @@ def serve_graph(filename):
 def cleanup():
     """Limpiar archivos temporales"""
     try:
-        clean_old_files()
-        return jsonify({'message': 'Limpieza completada'})
+        result = artifact_store.sweep()
+        return jsonify({'message': 'Limpieza completada', **result, 'storage': artifact_store.stats()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -757,5 +757,9 @@ if __name__ == '__main__':
     print(f"📁 Directorio de uploads: {UPLOAD_DIR}")
     print(f"📊 Directorio de output: {OUTPUT_DIR}")
     print("🚀 Servidor disponible en http://localhost:4008")
+
+    artifact_store.reconcile()
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        artifact_store.start_sweeper()
     
     app.run(host='0.0.0.0', port=4008, debug=True) 
\ No newline at end of file
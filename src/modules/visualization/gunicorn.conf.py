@@ -0,0 +1,83 @@
+"""
+Configuración de producción del Servidor de Visualización FungiGT
+=================================================================
+
+Uso:
+    gunicorn -c gunicorn.conf.py app:app
+
+El proceso maestro importa la aplicación y precalienta el stack científico
+(pandas, matplotlib, seaborn, scipy, sklearn, caché de fuentes y una figura
+mínima) antes de crear los workers. Los workers heredan esas páginas por
+copy-on-write, de modo que la primera petición real no paga las
+importaciones ni la construcción de la caché de fuentes.
+"""
+
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '4003')}"
+
+# pyplot no es thread-safe: un hilo por worker, paralelismo por procesos
+workers = int(os.environ.get('VISUALIZATION_WORKERS', min(4, multiprocessing.cpu_count())))
+threads = 1
+worker_class = 'sync'
+
+# Importar app.py en el maestro antes del fork (on_starting carga los visualizadores)
+preload_app = True
+
+# Archivos grandes pueden tardar varios minutos en procesarse
+timeout = int(os.environ.get('VISUALIZATION_TIMEOUT', 600))
+graceful_timeout = 30
+
+# Reciclar workers periódicamente para acotar la memoria retenida por matplotlib
+max_requests = int(os.environ.get('VISUALIZATION_MAX_REQUESTS', 200))
+max_requests_jitter = 20
+
+# Métricas Prometheus agregadas entre workers (prometheus_client en modo
+# multiproceso); debe definirse antes de importar la aplicación
+metrics_dir = None
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='fungigt-metrics-')
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """Precalentar el stack científico en el maestro."""
+    from visualizers.warmup import warm_up
+    warm_up()
+
+    # Sincronizar el índice de resultados una sola vez, antes de crear workers
+    from app import artifact_store
+    artifact_store.reconcile()
+
+
+def when_ready(server):
+    """Congelar los objetos del maestro e iniciar el barrido de resultados."""
+    gc.collect()
+    gc.freeze()
+
+    # Un único hilo de barrido, en el maestro (los workers se reciclan)
+    from app import artifact_store
+    artifact_store.start_sweeper()
+    server.log.info(f"Servidor de visualización listo con {server.num_workers} workers")
+
+
+def child_exit(server, worker):
+    """Descartar los valores 'live' del worker terminado en las métricas."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    """Eliminar el directorio de métricas si lo creó esta configuración."""
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
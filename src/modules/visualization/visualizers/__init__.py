@@ -7,33 +7,61 @@ tipos de archivos genómicos y bioinformáticos.
 
 Visualizadores disponibles:
 - BinDashVisualizer: Análisis genómico comparativo y filogenético
-
-Visualizadores en desarrollo:
 - AnnotationsVisualizer: Visualización de anotaciones funcionales
 - HMMERVisualizer: Análisis de dominios proteicos
-- SeedOrthologsVisualizer: Análisis de ortólogos y filogenética
+- SeedOrthologsVisualizer: Análisis de ortólogos semilla
+
+Motores de análisis:
+- GODag: Agregación de términos GO sobre el DAG (resúmenes slim)
+- StreamingStats: Estadísticas de una pasada (momentos, histogramas, t-digest)
+
+Visualizadores en desarrollo:
 - QualityControlVisualizer: Métricas de calidad genómica
 - PhylogenyVisualizer: Construcción de árboles filogenéticos
 - GeneralGenomicsVisualizer: Visualizaciones genómicas generales
 """
 
-from .base_visualizer import BaseVisualizer
-from .bindash_visualizer import BinDashVisualizer
+import importlib
+
+# Las clases se importan al primer acceso (PEP 562): importar el paquete no
+# carga pandas, matplotlib ni scipy
+_EXPORTS = {
+    'BaseVisualizer': '.base_visualizer',
+    'BinDashVisualizer': '.bindash_visualizer',
+    'AnnotationsVisualizer': '.annotations_visualizer',
+    'HMMERVisualizer': '.hmmer_visualizer',
+    'SeedOrthologsVisualizer': '.seed_orthologs_visualizer',
+    'GODag': '.go_dag',
+    'StreamingStats': '.streaming_stats',
+    'TDigest': '.streaming_stats',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
 
 # TODO: Implementar estos visualizadores
-# from .annotations_visualizer import AnnotationsVisualizer
-# from .hmmer_visualizer import HMMERVisualizer
-# from .seed_orthologs_visualizer import SeedOrthologsVisualizer
 # from .quality_control_visualizer import QualityControlVisualizer
 # from .phylogeny_visualizer import PhylogenyVisualizer
 # from .general_genomics_visualizer import GeneralGenomicsVisualizer
 
 __all__ = [
     'BaseVisualizer',
-    'BinDashVisualizer'
-    # 'AnnotationsVisualizer', 
-    # 'HMMERVisualizer',
-    # 'SeedOrthologsVisualizer',
+    'BinDashVisualizer',
+    'AnnotationsVisualizer',
+    'HMMERVisualizer',
+    'SeedOrthologsVisualizer',
+    'GODag',
+    'StreamingStats',
+    'TDigest'
     # 'QualityControlVisualizer',
     # 'PhylogenyVisualizer',
     # 'GeneralGenomicsVisualizer'
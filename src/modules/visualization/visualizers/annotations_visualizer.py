@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Visualizador Especializado para Anotaciones Funcionales (eggNOG-mapper)
+=======================================================================
+
+Visualizador para archivos .emapper.annotations:
+- Distribución de categorías COG
+- Términos GO, vías KEGG, familias PFAM y números EC más frecuentes
+- Resumen GO slim con conteos propagados por el DAG de Gene Ontology
+  (requiere un archivo OBO local, ver config 'go_obo_path' o FUNGIGT_GO_OBO)
+"""
+
+import os
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from .base_visualizer import BaseVisualizer
+from .compressed_io import open_input
+from .go_dag import GODag
+from .parallel_tsv import parse_tsv_block, read_blocks
+from .top_n import top_n_indices
+
+COG_DESCRIPTIONS = {
+    'A': 'RNA processing & modification',
+    'B': 'Chromatin structure & dynamics',
+    'C': 'Energy production & conversion',
+    'D': 'Cell cycle control, mitosis & meiosis',
+    'E': 'Amino acid transport & metabolism',
+    'F': 'Nucleotide transport & metabolism',
+    'G': 'Carbohydrate transport & metabolism',
+    'H': 'Coenzyme transport & metabolism',
+    'I': 'Lipid transport & metabolism',
+    'J': 'Translation, ribosomal structure & biogenesis',
+    'K': 'Transcription',
+    'L': 'Replication, recombination & repair',
+    'M': 'Cell wall/membrane/envelope biogenesis',
+    'N': 'Cell motility',
+    'O': 'Posttranslational modification, protein turnover, chaperones',
+    'P': 'Inorganic ion transport & metabolism',
+    'Q': 'Secondary metabolites biosynthesis, transport & catabolism',
+    'R': 'General function prediction only',
+    'S': 'Function unknown',
+    'T': 'Signal transduction mechanisms',
+    'U': 'Intracellular trafficking, secretion, and vesicular transport',
+    'V': 'Defense mechanisms',
+    'W': 'Extracellular structures',
+    'Y': 'Nuclear structure',
+    'Z': 'Cytoskeleton',
+}
+
+# Columnas multivaluadas de eggNOG: (columna, título, top N, paleta, archivo)
+TERM_COLUMNS = [
+    ('GOs', 'Términos GO', 20, 'magma', 'top_go_terms'),
+    ('KEGG_Pathway', 'Vías KEGG', 10, 'cividis', 'top_kegg_pathways'),
+    ('PFAMs', 'Familias PFAM', 15, 'plasma', 'top_pfam_families'),
+    ('EC', 'Números EC', 10, 'inferno', 'top_ec_numbers'),
+]
+
+
+class TermArrays(NamedTuple):
+    """Columna multivaluada explotada en arreglos enteros."""
+    rows: np.ndarray      # índice de proteína (fila) por anotación
+    codes: np.ndarray     # código de término por anotación
+    terms: np.ndarray     # término correspondiente a cada código
+
+    def counts(self) -> np.ndarray:
+        """Número de anotaciones por término (alineado con terms)."""
+        return np.bincount(self.codes, minlength=len(self.terms))
+
+
+def explode_terms(series: pd.Series, sep: str = ',') -> TermArrays:
+    """
+    Explotar una columna separada por comas en arreglos (fila, código).
+
+    Los valores vacíos y el marcador '-' de eggNOG se descartan.
+
+    Args:
+        series: Columna de anotaciones (ej: df['GOs'])
+        sep: Separador entre términos
+
+    Returns:
+        TermArrays con filas, códigos y términos únicos
+    """
+    values = series.reset_index(drop=True)
+    values = values[values.notna() & (values != '-') & (values != '')]
+    exploded = values.astype(str).str.split(sep).explode()
+    exploded = exploded.str.strip()
+    exploded = exploded[(exploded != '') & (exploded != '-')]
+
+    codes, terms = pd.factorize(exploded, sort=False)
+    return TermArrays(
+        rows=exploded.index.to_numpy(dtype=np.int64),
+        codes=codes.astype(np.int32),
+        terms=np.asarray(terms, dtype=object)
+    )
+
+
+def read_emapper_annotations(file_path: Path) -> pd.DataFrame:
+    """
+    Leer un archivo .emapper.annotations respetando su encabezado '#query'.
+
+    Las líneas '#' (cabecera y resumen final de eggNOG) se descartan y los
+    archivos grandes se parsean en paralelo.
+
+    Args:
+        file_path: Ruta al archivo de anotaciones
+
+    Returns:
+        DataFrame con las columnas del encabezado
+    """
+    header_line = None
+    with open_input(file_path, 'r') as f:
+        for line in f:
+            if line.startswith('##'):
+                continue
+            if line.startswith('#'):
+                header_line = line[1:].strip().split('\t')
+                break
+
+    if header_line is None:
+        raise ValueError("No se encontró la línea de encabezado en el archivo")
+
+    return read_blocks(file_path, partial(parse_tsv_block, names=header_line, dtype=str))
+
+
+class AnnotationsVisualizer(BaseVisualizer):
+    """Visualizador especializado para anotaciones funcionales de eggNOG-mapper."""
+
+    def __init__(self, output_dir: Path, config: Dict = None):
+        super().__init__(output_dir, config)
+        self.name = "eggNOG Functional Annotations"
+        self.go_obo_path = self.config.get('go_obo_path') or os.environ.get('FUNGIGT_GO_OBO')
+        self.go_slim_level = int(self.config.get('go_slim_level', 2))
+        self.go_slim_top_n = int(self.config.get('go_slim_top_n', 25))
+        self._go_counts: Optional[tuple] = None
+
+    def get_supported_extensions(self) -> List[str]:
+        """Extensiones soportadas para anotaciones."""
+        return ['.annotations', '.emapper.annotations', '.eggnog']
+
+    def validate_file(self, file_path: Path) -> bool:
+        """Validar que el archivo tenga el encabezado de eggNOG-mapper."""
+        try:
+            with open_input(file_path, 'r') as f:
+                for line in f:
+                    if line.startswith('##'):
+                        continue
+                    if line.startswith('#'):
+                        columns = line[1:].strip().split('\t')
+                        if len(columns) >= 5:
+                            print(f"✅ Archivo de anotaciones válido - {len(columns)} columnas")
+                            return True
+                    break
+
+            print("❌ No se encontró el encabezado '#query' de eggNOG-mapper")
+            return False
+
+        except Exception as e:
+            print(f"❌ Error validando archivo: {e}")
+            return False
+
+    def parse_file(self, file_path: Path) -> pd.DataFrame:
+        """Parsear archivo de anotaciones eggNOG."""
+        try:
+            df = read_emapper_annotations(file_path)
+            print(f"✅ Parseadas {len(df)} proteínas anotadas")
+            return df
+        except Exception as e:
+            raise ValueError(f"Error parseando anotaciones: {str(e)}")
+
+    def generate_visualizations(self, data: pd.DataFrame) -> List[str]:
+        """Generar todas las visualizaciones de anotaciones."""
+        graphs = []
+
+        try:
+            if 'COG_category' in data.columns:
+                graphs.append(self._plot_cog_categories(data))
+        except Exception as e:
+            print(f"Error creando gráfico de categorías COG: {e}")
+
+        for column, label, top_n, palette, filename in TERM_COLUMNS:
+            if column not in data.columns:
+                continue
+            try:
+                graphs.append(self._plot_top_terms(data[column], label, top_n, palette, filename))
+            except Exception as e:
+                print(f"Error creando gráfico de {label}: {e}")
+
+        try:
+            if 'GOs' in data.columns and self.go_obo_path:
+                graphs.append(self._plot_go_slim(data))
+        except Exception as e:
+            print(f"Error creando resumen GO slim: {e}")
+
+        return [g for g in graphs if g]
+
+    def generate_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Generar estadísticas de anotaciones."""
+        stats = {'total_proteins': len(data)}
+
+        for column, _, _, _, _ in TERM_COLUMNS:
+            if column not in data.columns:
+                continue
+            arrays = explode_terms(data[column])
+            key = column.lower()
+            stats[f'{key}_annotated_proteins'] = int(len(np.unique(arrays.rows)))
+            stats[f'{key}_unique_terms'] = int(len(arrays.terms))
+            stats[f'{key}_total_annotations'] = int(len(arrays.codes))
+
+        if 'GOs' in data.columns and self.go_obo_path:
+            try:
+                dag, counts = self._go_propagated_counts(data)
+                summary = dag.slim_summary(counts, level=self.go_slim_level)
+                stats['go_slim_level'] = self.go_slim_level
+                stats['go_slim'] = summary.head(self.go_slim_top_n).to_dict(orient='records')
+            except Exception as e:
+                print(f"⚠️ No se pudo calcular el resumen GO slim: {e}")
+
+        return stats
+
+    def _go_propagated_counts(self, data: pd.DataFrame):
+        """Conteos GO propagados, calculados una vez por DataFrame."""
+        if self._go_counts is None or self._go_counts[0] is not data:
+            dag = GODag.load(Path(self.go_obo_path))
+            arrays = explode_terms(data['GOs'])
+            counts = dag.propagated_counts(arrays.rows, arrays.codes, arrays.terms)
+            self._go_counts = (data, dag, counts)
+        return self._go_counts[1], self._go_counts[2]
+
+    # ========== GRÁFICOS ==========
+
+    def _plot_cog_categories(self, data: pd.DataFrame) -> str:
+        """Distribución de categorías COG (cada letra cuenta por separado)."""
+        cog = data['COG_category'].dropna()
+        cog = cog[cog != '-']
+        letters = np.frombuffer(''.join(cog.tolist()).encode('ascii', 'ignore'), dtype='S1')
+        letters, counts = np.unique(letters, return_counts=True)
+
+        cog_df = pd.DataFrame({
+            'COG_category': [c.decode() for c in letters],
+            'Count': counts
+        })
+        cog_df['Description'] = cog_df['COG_category'].map(COG_DESCRIPTIONS)
+        cog_df = cog_df.sort_values('Count', ascending=False)
+
+        plt.figure(figsize=(12, 6))
+        sns.barplot(data=cog_df, x='COG_category', y='Count', palette='viridis')
+        plt.title('Distribución de Categorías COG', fontsize=16, fontweight='bold')
+        plt.xlabel('Categoría COG')
+        plt.ylabel('Número de Proteínas')
+        plt.tight_layout()
+
+        return self.save_figure('cog_categories')
+
+    def _plot_top_terms(self, series: pd.Series, label: str, top_n: int,
+                        palette: str, filename: str) -> str:
+        """Barras horizontales con los términos más frecuentes de una columna."""
+        arrays = explode_terms(series)
+        if len(arrays.codes) == 0:
+            return self.create_basic_plot(f"{label}", f"Sin anotaciones de {label}", "lightyellow")
+
+        counts = arrays.counts()
+        order = top_n_indices(counts, top_n)
+        top = pd.DataFrame({'Term': arrays.terms[order], 'Count': counts[order]})
+
+        plt.figure(figsize=(10, max(6, top_n * 0.4)))
+        sns.barplot(data=top, y='Term', x='Count', palette=palette)
+        plt.title(f'Top {top_n} {label} Más Comunes', fontsize=16, fontweight='bold')
+        plt.xlabel('Número de Proteínas')
+        plt.ylabel(label)
+        plt.tight_layout()
+
+        return self.save_figure(filename)
+
+    def _plot_go_slim(self, data: pd.DataFrame) -> str:
+        """Resumen GO slim con conteos propagados hacia los ancestros."""
+        dag, counts = self._go_propagated_counts(data)
+
+        fig, axes = plt.subplots(1, 3, figsize=(24, max(8, self.go_slim_top_n * 0.35)))
+        for ax, namespace in zip(axes, ['biological_process', 'molecular_function', 'cellular_component']):
+            summary = dag.slim_summary(counts, level=self.go_slim_level, namespace=namespace)
+            summary = summary.head(self.go_slim_top_n)
+            if summary.empty:
+                ax.axis('off')
+                ax.set_title(namespace.replace('_', ' ').title())
+                continue
+            labels = summary['Name'].str.slice(0, 45)
+            ax.barh(range(len(summary)), summary['Count'].values,
+                    color=sns.color_palette('viridis', len(summary)))
+            ax.set_yticks(range(len(summary)))
+            ax.set_yticklabels(labels)
+            ax.invert_yaxis()
+            ax.set_xlabel('Número de Proteínas')
+            ax.set_title(namespace.replace('_', ' ').title())
+
+        plt.suptitle(f'🧬 Resumen GO Slim (nivel {self.go_slim_level})', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+
+        return self.save_figure('go_slim_summary')
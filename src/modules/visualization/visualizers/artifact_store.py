@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Almacén Indexado de Resultados
+==============================
+
+Índice SQLite de los directorios de trabajo generados en el directorio de
+salida (p. ej. `bindash_<timestamp>/`): tamaño, creación, último acceso y
+referencias activas. Sustituye a los recorridos completos de directorios
+de clean_old_files:
+
+- Caducidad: los trabajos sin acceso reciente se obtienen por rango sobre el
+  índice de last_access (O(log n)), no con un stat por archivo.
+- Cuota: si el total supera la cuota se eliminan los trabajos menos usados
+  (LRU). El total se mantiene en la propia base de datos.
+- Referencias: un trabajo en uso (acquire/in_use) no se elimina.
+- Barrido en segundo plano: un hilo ejecuta sweep() periódicamente.
+
+La base de datos (modo WAL) se comparte entre los workers de gunicorn; cada
+operación abre su propia conexión, por lo que el almacén es seguro tras fork.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = '.artifacts.sqlite3'
+DEFAULT_MAX_AGE = 4 * 3600
+DEFAULT_SWEEP_INTERVAL = 300
+# Los accesos más frecuentes que esto no se escriben en el índice
+TOUCH_RESOLUTION = 60
+# Trabajos eliminados por transacción
+DELETE_BATCH = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_last_access ON jobs(last_access);
+CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals VALUES ('size', 0);
+"""
+
+
+def directory_size(path: Path) -> int:
+    """Tamaño total en bytes de los archivos bajo path."""
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+class ArtifactStore:
+    """Índice de trabajos de un directorio de salida con caducidad y cuota LRU."""
+
+    def __init__(self, root: Path, max_age: float = DEFAULT_MAX_AGE,
+                 quota_bytes: Optional[int] = None,
+                 loose_dirs: Iterable[Path] = (),
+                 sweep_interval: float = DEFAULT_SWEEP_INTERVAL):
+        """
+        Args:
+            root: Directorio que contiene un subdirectorio por trabajo
+            max_age: Segundos sin acceso tras los que un trabajo caduca
+            quota_bytes: Tamaño máximo total (None o 0 = sin cuota)
+            loose_dirs: Directorios de archivos sueltos (uploads, temp) cuyos
+                archivos antiguos también elimina el barrido
+            sweep_interval: Segundos entre barridos del hilo de fondo
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / INDEX_FILENAME
+        self.max_age = max_age
+        self.quota_bytes = quota_bytes or None
+        self.loose_dirs = [Path(directory) for directory in loose_dirs]
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+        self._stop = threading.Event()
+
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    # ----- Conexiones -----
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _add_total(conn: sqlite3.Connection, delta: int) -> None:
+        if delta:
+            conn.execute("UPDATE totals SET value = value + ? WHERE name = 'size'", (delta,))
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    # ----- Registro y acceso -----
+
+    def add(self, job_dir: Path, now: Optional[float] = None) -> str:
+        """
+        Registrar (o actualizar) un trabajo terminado con su tamaño actual.
+
+        Args:
+            job_dir: Directorio del trabajo (hijo directo de root)
+            now: Marca de tiempo (por defecto time.time())
+
+        Returns:
+            Identificador del trabajo (nombre del directorio)
+        """
+        job_id = Path(job_dir).name
+        size = directory_size(self.job_dir(job_id))
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute('SELECT size FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                conn.execute('INSERT INTO jobs (job_id, size, created, last_access) VALUES (?, ?, ?, ?)',
+                             (job_id, size, now, now))
+                self._add_total(conn, size)
+            else:
+                conn.execute('UPDATE jobs SET size = ?, last_access = ? WHERE job_id = ?',
+                             (size, now, job_id))
+                self._add_total(conn, size - row[0])
+        return job_id
+
+    def touch(self, job_id: str) -> None:
+        """Marcar un acceso (con resolución TOUCH_RESOLUTION para no escribir en cada petición)."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute('UPDATE jobs SET last_access = ? WHERE job_id = ? AND last_access < ?',
+                         (now, job_id, now - TOUCH_RESOLUTION))
+
+    def acquire(self, job_id: str) -> bool:
+        """Incrementar las referencias de un trabajo; False si no está indexado."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute('UPDATE jobs SET refs = refs + 1, last_access = ? WHERE job_id = ?',
+                                  (time.time(), job_id))
+            return cursor.rowcount > 0
+
+    def release(self, job_id: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute('UPDATE jobs SET refs = MAX(refs - 1, 0), last_access = ? WHERE job_id = ?',
+                         (time.time(), job_id))
+
+    @contextmanager
+    def in_use(self, job_id: str):
+        """Proteger un trabajo de la caducidad y la cuota mientras se usa."""
+        acquired = self.acquire(job_id)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT job_id, size, created, last_access, refs FROM jobs WHERE job_id = ?',
+                               (job_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('job_id', 'size', 'created', 'last_access', 'refs'), row))
+
+    # ----- Eliminación -----
+
+    def _delete(self, conn: sqlite3.Connection, rows: List[Tuple[str, int]]) -> None:
+        conn.executemany('DELETE FROM jobs WHERE job_id = ?', [(job_id,) for job_id, _ in rows])
+        self._add_total(conn, -sum(size for _, size in rows))
+
+    def _remove_dirs(self, rows: List[Tuple[str, int]]) -> None:
+        for job_id, _ in rows:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            logger.info(f"🗑️ Trabajo eliminado: {job_id}")
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Eliminar los trabajos sin acceso en max_age segundos.
+
+        Los trabajos en uso se conservan salvo que lleven más de 2*max_age sin
+        actividad (referencias huérfanas de un worker caído).
+
+        Returns:
+            Número de trabajos eliminados
+        """
+        now = time.time() if now is None else now
+        cutoff, stale_cutoff = now - self.max_age, now - 2 * self.max_age
+        removed = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    'SELECT job_id, size FROM jobs WHERE last_access < ? AND (refs = 0 OR last_access < ?) '
+                    'ORDER BY last_access LIMIT ?', (cutoff, stale_cutoff, DELETE_BATCH)).fetchall()
+                self._delete(conn, rows)
+            self._remove_dirs(rows)
+            removed += len(rows)
+            if len(rows) < DELETE_BATCH:
+                return removed
+
+    def enforce_quota(self) -> int:
+        """
+        Eliminar los trabajos menos usados hasta quedar dentro de la cuota.
+
+        Returns:
+            Número de trabajos eliminados
+        """
+        if not self.quota_bytes:
+            return 0
+        removed = 0
+        while True:
+            with self._transaction() as conn:
+                total = self.total_size(conn)
+                rows, excess = [], total - self.quota_bytes
+                if excess > 0:
+                    candidates = conn.execute(
+                        'SELECT job_id, size FROM jobs WHERE refs = 0 ORDER BY last_access LIMIT ?',
+                        (DELETE_BATCH,))
+                    for job_id, size in candidates:
+                        if excess <= 0:
+                            break
+                        rows.append((job_id, size))
+                        excess -= size
+                self._delete(conn, rows)
+            self._remove_dirs(rows)
+            removed += len(rows)
+            if excess <= 0 or len(rows) < DELETE_BATCH:
+                return removed
+
+    def sweep_loose_files(self, now: Optional[float] = None) -> int:
+        """Eliminar archivos sueltos antiguos de loose_dirs (uploads interrumpidos, temporales)."""
+        now = time.time() if now is None else now
+        removed = 0
+        for directory in self.loose_dirs:
+            if not directory.exists():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and now - entry.stat().st_mtime > self.max_age:
+                            os.unlink(entry.path)
+                            removed += 1
+                    except OSError as e:
+                        logger.error(f"Error eliminando {entry.path}: {e}")
+        return removed
+
+    def sweep(self) -> Dict[str, int]:
+        """Caducidad, cuota y archivos sueltos en una sola llamada."""
+        return {
+            'expired_jobs': self.expire(),
+            'evicted_jobs': self.enforce_quota(),
+            'loose_files': self.sweep_loose_files()
+        }
+
+    # ----- Mantenimiento -----
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Sincronizar el índice con el disco (al arrancar): indexar directorios
+        desconocidos (p. ej. de un worker caído a mitad de proceso), olvidar
+        los que ya no existen y reiniciar las referencias.
+        """
+        on_disk = {entry.name: entry for entry in os.scandir(self.root)
+                   if entry.is_dir(follow_symlinks=False)}
+        with closing(self._connect()) as conn:
+            indexed = {job_id for (job_id,) in conn.execute('SELECT job_id FROM jobs')}
+
+        missing = indexed - set(on_disk)
+        with self._transaction() as conn:
+            rows = [(job_id, size) for job_id, size in conn.execute('SELECT job_id, size FROM jobs')
+                    if job_id in missing]
+            self._delete(conn, rows)
+            conn.execute('UPDATE jobs SET refs = 0')
+
+        adopted = set(on_disk) - indexed
+        for job_id in adopted:
+            self.add(self.job_dir(job_id), now=on_disk[job_id].stat().st_mtime)
+
+        return {'adopted': len(adopted), 'forgotten': len(missing)}
+
+    def total_size(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        if conn is None:
+            with closing(self._connect()) as conn:
+                return self.total_size(conn)
+        return conn.execute("SELECT value FROM totals WHERE name = 'size'").fetchone()[0]
+
+    def stats(self) -> Dict:
+        with closing(self._connect()) as conn:
+            jobs = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+            total = self.total_size(conn)
+        return {
+            'jobs': jobs,
+            'total_bytes': total,
+            'quota_bytes': self.quota_bytes,
+            'max_age_seconds': self.max_age
+        }
+
+    # ----- Barrido en segundo plano -----
+
+    def start_sweeper(self) -> None:
+        """Iniciar (una vez por proceso) el hilo que ejecuta sweep() periódicamente."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='artifact-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                result = self.sweep()
+                if any(result.values()):
+                    logger.info(f"🧹 Barrido de resultados: {result}")
+            except Exception as e:
+                logger.error(f"Error en el barrido de resultados: {e}")
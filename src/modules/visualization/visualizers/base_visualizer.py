@@ -13,6 +13,7 @@ import logging
 import tempfile
 import shutil
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
@@ -22,15 +23,15 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Backend no interactivo
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+from .instrumentation import StageRecorder, observe
+from .streaming_stats import describe_columns
+from .warmup import setup_plot_style
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configurar estilo de matplotlib
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
 
 class BaseVisualizer(ABC):
     """
@@ -50,6 +51,7 @@ class BaseVisualizer(ABC):
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        setup_plot_style()
         
         self.config = config or {}
         self.temp_dir = self.output_dir / 'temp'
@@ -60,6 +62,9 @@ class BaseVisualizer(ABC):
         self.default_dpi = 300
         self.default_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
         
+        # Registro de etapas del procesamiento en curso (ver process_file)
+        self.recorder: Optional[StageRecorder] = None
+        
         logger.info(f"✅ {self.__class__.__name__} inicializado con directorio: {output_dir}")
     
     @abstractmethod
@@ -134,46 +139,100 @@ class BaseVisualizer(ABC):
         Returns:
             Diccionario con resultados del procesamiento
         """
+        self.recorder = recorder = StageRecorder()
+        status = 'ok'
         try:
             logger.info(f"🔍 Procesando archivo: {file_path.name}")
             
             # Validar archivo
-            if not self.validate_file(file_path):
-                raise ValueError(f"Archivo no válido para {self.__class__.__name__}")
-            
-            # Parsear datos
-            data = self.parse_file(file_path)
-            logger.info(f"📊 Datos parseados: {len(data)} filas")
+            with recorder.stage('validate'):
+                if not self.validate_file(file_path):
+                    raise ValueError(f"Archivo no válido para {self.__class__.__name__}")
             
-            if data.empty:
-                raise ValueError("No se encontraron datos válidos en el archivo")
+            # Parsear, visualizar y resumir (ver _run_stages)
+            graphs, stats, data_summary = self._run_stages(file_path, recorder)
             
-            # Generar visualizaciones
-            graphs = self.generate_visualizations(data)
-            logger.info(f"📈 Generados {len(graphs)} gráficos")
-            
-            # Generar estadísticas
-            stats = self.generate_statistics(data)
-            
-            # Generar resumen de datos
-            data_summary = self.generate_data_summary(data)
+            # Estadísticas junto a los gráficos (se incluyen en el paquete del trabajo)
+            self.save_json('stats', {'stats': stats, 'data_summary': data_summary})
             
             return {
                 'graphs': graphs,
                 'stats': stats,
                 'data_summary': data_summary,
                 'visualizer': self.__class__.__name__,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat(),
+                'timings': recorder.summary()
             }
             
         except Exception as e:
+            status = 'error'
             logger.error(f"❌ Error procesando archivo: {e}")
-            return self.create_error_visualization(file_path, str(e))
+            result = self.create_error_visualization(file_path, str(e))
+            result['timings'] = recorder.summary()
+            return result
+        finally:
+            recorder.finish()
+            observe(self.__class__.__name__, recorder, status)
+            self.recorder = None
+            logger.info(f"⏱️ {self.__class__.__name__}: {recorder.elapsed():.2f}s en "
+                        f"{len(recorder.timings)} etapas")
+    
+    def _run_stages(self, file_path: Path,
+                    recorder: StageRecorder) -> Tuple[List[str], Dict[str, Any], Dict[str, Any]]:
+        """
+        Etapas de process_file tras la validación: parse, visualize, stats y summary.
+        
+        Los visualizadores que no cargan el archivo completo (p. ej. resumen en
+        streaming) sobrescriben este método y conservan la validación, las
+        métricas, el JSON de estadísticas y el manejo de errores de process_file.
+        
+        Args:
+            file_path: Ruta al archivo ya validado
+            recorder: Registro de etapas del procesamiento en curso
+            
+        Returns:
+            Tupla (gráficos, estadísticas, resumen de datos)
+        """
+        # Parsear datos
+        with recorder.stage('parse'):
+            data = self.parse_file(file_path)
+        logger.info(f"📊 Datos parseados: {len(data)} filas")
+        
+        if data.empty:
+            raise ValueError("No se encontraron datos válidos en el archivo")
+        
+        # Generar visualizaciones (save_figure registra cada gráfico como 'plot:<nombre>')
+        recorder.mark()
+        with recorder.stage('visualize'):
+            graphs = self.generate_visualizations(data)
+        logger.info(f"📈 Generados {len(graphs)} gráficos")
+        
+        # Generar estadísticas
+        with recorder.stage('stats'):
+            stats = self.generate_statistics(data)
+        
+        # Generar resumen de datos
+        with recorder.stage('summary'):
+            data_summary = self.generate_data_summary(data)
+        
+        return graphs, stats, data_summary
+    
+    def stage(self, name: str):
+        """
+        Medir un bloque como etapa del procesamiento en curso (p. ej. 'linkage').
+        
+        Fuera de process_file no mide nada.
+        """
+        return self.recorder.stage(name) if self.recorder else nullcontext()
     
     def generate_data_summary(self, data: pd.DataFrame) -> Dict[str, Any]:
         """
         Generar resumen básico de los datos.
         
+        Las columnas numéricas se resumen con describe_columns (una selección
+        parcial por columna). La memoria se estima sin deep=True, que
+        recorrería cada cadena de las columnas de texto sólo para medirla.
+        
         Args:
             data: DataFrame con los datos
             
@@ -186,7 +245,8 @@ class BaseVisualizer(ABC):
             'columns': list(data.columns),
             'data_types': {col: str(dtype) for col, dtype in data.dtypes.items()},
             'missing_values': data.isnull().sum().to_dict(),
-            'memory_usage': f"{data.memory_usage(deep=True).sum() / 1024:.2f} KB"
+            'numeric_summary': describe_columns(data),
+            'memory_usage': f"{data.memory_usage(deep=False).sum() / 1024:.2f} KB"
         }
     
     def create_error_visualization(self, file_path: Path, error_msg: str) -> Dict[str, Any]:
@@ -253,11 +313,32 @@ class BaseVisualizer(ABC):
             fig = plt.gcf()
         
         file_path = self.output_dir / f"{filename}.png"
-        fig.savefig(file_path, dpi=self.default_dpi, bbox_inches='tight', facecolor='white')
+        with self.stage(f'savefig:{filename}'):
+            fig.savefig(file_path, dpi=self.default_dpi, bbox_inches='tight', facecolor='white')
         plt.close(fig)
+        # Tiempo desde el gráfico anterior: cálculo, dibujo y guardado de éste
+        if self.recorder:
+            self.recorder.lap(f'plot:{filename}')
         
         return str(file_path)
     
+    def save_json(self, filename: str, payload: Dict[str, Any]) -> str:
+        """
+        Guardar un diccionario como JSON en el directorio de salida.
+        
+        Args:
+            filename: Nombre del archivo (sin extensión)
+            payload: Datos a guardar (los escalares de numpy se convierten)
+            
+        Returns:
+            Ruta al archivo guardado
+        """
+        file_path = self.output_dir / f"{filename}.json"
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False,
+                      default=lambda value: value.tolist() if hasattr(value, 'tolist') else str(value))
+        return str(file_path)
+    
     def create_basic_plot(self, title: str, message: str, color: str = "lightblue") -> str:
         """
         Crear gráfico básico con mensaje de información.
@@ -15,13 +15,79 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.cluster.hierarchy import dendrogram, linkage
-from scipy.spatial.distance import squareform
-from sklearn.manifold import MDS
 from pathlib import Path
+from functools import partial
+from itertools import islice
 from typing import Dict, List, Any
 
 from .base_visualizer import BaseVisualizer
+from .compressed_io import open_input, strip_compression_suffix
+from .parallel_tsv import parse_tsv_block, read_blocks
+from .streaming_stats import describe_columns
+from .top_n import nearest_neighbors
+
+BINDASH_FIELDS = ['Query', 'Target', 'Mutation_distance', 'P_value', 'Jaccard_index']
+# Columna con el nombre de fila en las matrices de distancias
+MATRIX_LABEL = '__genome__'
+
+
+def _genome_name(raw: str) -> str:
+    """Nombre del genoma: parte final de la ruta sin extensiones comunes."""
+    name = Path(raw.strip()).stem
+    for suffix in ('_genomic', '.fna', '.fa', '.fasta'):
+        name = name.replace(suffix, '')
+    return name
+
+
+def parse_bindash_block(block: bytes, separator: str = '\t') -> pd.DataFrame:
+    """
+    Convertir un bloque de líneas de pares BinDash en columnas tipadas.
+
+    Se ejecuta en los workers de parallel_tsv. Las distancias no numéricas
+    se reemplazan por 0.5, los p-values y Jaccard inválidos por sus valores
+    por defecto, y se descartan el encabezado 'Query Target ...' y las líneas
+    con menos de 3 columnas.
+    """
+    sep = r'\s+' if separator == ' ' else separator
+    raw = parse_tsv_block(block, BINDASH_FIELDS, dtype=str, sep=sep, usecols=list(range(5)))
+    header = (raw['Query'] == 'Query') & (raw['Target'] == 'Target')
+    raw = raw[raw['Mutation_distance'].notna() & ~header]
+
+    # Las distancias en BinDash suelen estar ya normalizadas
+    distance = pd.to_numeric(raw['Mutation_distance'], errors='coerce').fillna(0.5).clip(0.0, 1.0)
+    p_value = pd.to_numeric(raw['P_value'], errors='coerce').fillna(0.0).clip(0.0, 1.0)
+
+    # Jaccard puede ser fracción ("8533/16384") o decimal
+    parts = raw['Jaccard_index'].str.partition('/')
+    numerator = pd.to_numeric(parts[0], errors='coerce')
+    denominator = pd.to_numeric(parts[2].replace('', '1'), errors='coerce')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaccard = numerator / denominator
+    jaccard = jaccard.where(np.isfinite(jaccard), 1.0 - distance).clip(0.0, 1.0)
+
+    # Los nombres se limpian una vez por genoma, no por par
+    names = {}
+    for column in ('Query', 'Target'):
+        values = raw[column]
+        uniques = values.unique()
+        names[column] = values.map(dict(zip(uniques, map(_genome_name, uniques))))
+
+    return pd.DataFrame({
+        'Query': names['Query'].to_numpy(dtype=object),
+        'Target': names['Target'].to_numpy(dtype=object),
+        'Mutation_distance': distance.to_numpy(),
+        'P_value': p_value.to_numpy(),
+        'Jaccard_index': jaccard.to_numpy(),
+        # ANI (Average Nucleotide Identity) = 1 - distancia genómica
+        'ANI': (1.0 - distance).clip(0.0, 1.0).to_numpy()
+    })
+
+def _newick_label(name: str) -> str:
+    """Citar los nombres con caracteres reservados de Newick."""
+    if any(char in name for char in " ,;:()[]'\t"):
+        return "'" + name.replace("'", "''") + "'"
+    return name
+
 
 class BinDashVisualizer(BaseVisualizer):
     """Visualizador especializado para resultados de BinDash."""
@@ -29,6 +95,10 @@ class BinDashVisualizer(BaseVisualizer):
     def __init__(self, output_dir: Path, config: Dict = None):
         super().__init__(output_dir, config)
         self.name = "BinDash Genomic Comparative Analysis"
+        self.neighbors = int(self.config.get('neighbors', 5))
+        # Distancia de corte para los clusters exportados (~95% ANI)
+        self.cluster_distance = float(self.config.get('cluster_distance', 0.05))
+        self._matrix = None
         
     def get_supported_extensions(self) -> List[str]:
         """Extensiones soportadas para archivos BinDash."""
@@ -37,23 +107,25 @@ class BinDashVisualizer(BaseVisualizer):
     def validate_file(self, file_path: Path) -> bool:
         """Validar archivo BinDash con validación más robusta."""
         try:
-            # Verificar extensión
-            if file_path.suffix.lower() not in self.get_supported_extensions():
-                print(f"❌ Extensión {file_path.suffix} no soportada. Extensiones válidas: {self.get_supported_extensions()}")
+            # Verificar extensión (ignorando .gz/.bgz/.zst)
+            suffix = strip_compression_suffix(file_path).suffix.lower()
+            if suffix not in self.get_supported_extensions():
+                print(f"❌ Extensión {suffix} no soportada. Extensiones válidas: {self.get_supported_extensions()}")
                 return False
             
-            # Verificar contenido básico
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
+            # Debe tener al menos 1 línea de datos (sólo se lee hasta encontrarla)
+            first_line = None
+            with open_input(file_path, 'r') as f:
+                for line in f:
+                    if line.strip() and not line.startswith('#'):
+                        first_line = line.strip()
+                        break
                 
-            # Debe tener al menos 1 línea de datos
-            data_lines = [line.strip() for line in lines if line.strip() and not line.startswith('#')]
-            if len(data_lines) < 1:
+            if first_line is None:
                 print(f"❌ Archivo vacío o sin datos válidos")
                 return False
                 
             # Verificar formato básico de la primera línea de datos
-            first_line = data_lines[0]
             print(f"🔍 Validando primera línea: {first_line[:100]}...")
             
             # Detectar separador y verificar estructura
@@ -83,15 +155,15 @@ class BinDashVisualizer(BaseVisualizer):
     def parse_file(self, file_path: Path) -> pd.DataFrame:
         """Parsear archivo BinDash."""
         try:
-            # Leer archivo y detectar formato
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            lines = content.strip().split('\n')
+            # Detectar formato con las dos primeras líneas (sin leer todo el archivo)
+            with open_input(file_path, 'r') as f:
+                lines = [line.rstrip('\n') for line in islice((row for row in f if row.strip()), 2)]
             
             # Detectar si es una matriz de distancias directa
             if len(lines) > 1:
-                first_data_line = lines[1] if lines[0].startswith('#') else lines[0]
+                # Encabezado comentado o de matriz (celda de esquina vacía)
+                has_header = lines[0].startswith('#') or lines[0].startswith('\t')
+                first_data_line = lines[1] if has_header else lines[0]
                 cols = first_data_line.split('\t')
                 
                 # Si la primera columna parece ser un nombre y el resto números, es matriz directa
@@ -111,27 +183,40 @@ class BinDashVisualizer(BaseVisualizer):
     def _parse_distance_matrix(self, file_path: Path) -> pd.DataFrame:
         """Parsear matriz de distancias directa."""
         try:
-            matrix_df = pd.read_csv(file_path, sep='\t', index_col=0, comment='#')
-            
-            # Convertir matriz a formato de pares
-            pairs = []
-            genomes = matrix_df.index.tolist()
-            
-            for i, query in enumerate(genomes):
-                for j, target in enumerate(genomes):
-                    if i < j:  # Solo triángulo superior
-                        distance = matrix_df.loc[query, target]
-                        if pd.notna(distance) and distance >= 0:
-                            pairs.append({
-                                'Query': Path(str(query)).stem,
-                                'Target': Path(str(target)).stem,
-                                'Mutation_distance': float(distance),
-                                'P_value': 0.0,
-                                'Jaccard_index': max(0, 1 - float(distance)),
-                                'ANI': max(0, 1 - float(distance))
-                            })
-            
-            return pd.DataFrame(pairs)
+            # Encabezado: celda de esquina (vacía o comentada) y nombres de columna
+            with open_input(file_path, 'r') as f:
+                header = next(line for line in f if line.strip()).rstrip('\n').split('\t')
+            names = [MATRIX_LABEL] + [str(name) for name in header[1:]]
+            
+            # Parseo por bloques con el lector compartido; la línea de encabezado
+            # queda con la etiqueta vacía (o se descarta como comentario)
+            matrix_df = read_blocks(file_path, partial(parse_tsv_block, names=names,
+                                                       dtype={MATRIX_LABEL: str}))
+            matrix_df = matrix_df[matrix_df[MATRIX_LABEL].notna()]
+            genomes = matrix_df[MATRIX_LABEL].to_numpy(dtype=object)
+            
+            # Columnas en el orden de las filas; las que falten quedan como NaN
+            values = (matrix_df.drop(columns=MATRIX_LABEL)
+                      .apply(pd.to_numeric, errors='coerce')
+                      .reindex(columns=genomes)
+                      .to_numpy(dtype=np.float64))
+            
+            # Convertir matriz a formato de pares (solo triángulo superior)
+            rows, cols = np.triu_indices(len(genomes), 1)
+            distance = values[rows, cols]
+            valid = distance >= 0  # descarta también los NaN
+            rows, cols, distance = rows[valid], cols[valid], distance[valid]
+            
+            stems = np.array([Path(str(genome)).stem for genome in genomes], dtype=object)
+            similarity = np.maximum(0.0, 1.0 - distance)
+            return pd.DataFrame({
+                'Query': stems[rows],
+                'Target': stems[cols],
+                'Mutation_distance': distance,
+                'P_value': np.zeros(len(distance)),
+                'Jaccard_index': similarity,
+                'ANI': similarity
+            })
             
         except Exception as e:
             raise ValueError(f"Error parseando matriz de distancias: {str(e)}")
@@ -139,19 +224,19 @@ class BinDashVisualizer(BaseVisualizer):
     def _parse_comparison_pairs(self, file_path: Path) -> pd.DataFrame:
         """Parsear formato estándar de pares de comparaciones."""
         try:
-            # Leer archivo línea por línea para manejar mejor formatos complejos
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-            
-            # Filtrar comentarios y líneas vacías
-            data_lines = [line.strip() for line in lines if line.strip() and not line.startswith('#')]
-            
-            if not data_lines:
+            # Primera línea de datos (sólo se lee hasta encontrarla)
+            first_line = None
+            with open_input(file_path, 'r') as f:
+                for line in f:
+                    if line.strip() and not line.startswith('#'):
+                        first_line = line.strip()
+                        break
+            
+            if first_line is None:
                 raise ValueError("No se encontraron datos válidos en el archivo")
             
             # Detectar separador (tab es más común en BinDash)
             separator = '\t'
-            first_line = data_lines[0]
             if '\t' in first_line:
                 separator = '\t'
             elif ',' in first_line:
@@ -161,97 +246,13 @@ class BinDashVisualizer(BaseVisualizer):
             
             sep_name = 'TAB' if separator == '\t' else separator
             print(f"🔍 Detectado separador: {sep_name}")
-            print(f"📄 Procesando {len(data_lines)} líneas de datos...")
-            
-            # Parsear manualmente para manejar formatos complejos
-            parsed_data = []
-            errors_count = 0
-            
-            for i, line in enumerate(data_lines):
-                try:
-                    # Usar el separador detectado
-                    if separator == '\t':
-                        parts = line.split('\t')
-                    else:
-                        parts = line.split(separator)
-                    
-                    # Filtrar partes vacías
-                    parts = [p.strip() for p in parts if p.strip()]
-                    
-                    if len(parts) < 3:
-                        continue
-                    
-                    # Extraer nombres de genomas (primeras dos columnas)
-                    query_raw = str(parts[0])
-                    target_raw = str(parts[1])
-                    
-                    # Extraer nombre de archivo del genoma (parte final de la ruta)
-                    query = Path(query_raw).stem
-                    target = Path(target_raw).stem
-                    
-                    # Remover extensiones comunes de genomas
-                    query = query.replace('_genomic', '').replace('.fna', '').replace('.fa', '').replace('.fasta', '')
-                    target = target.replace('_genomic', '').replace('.fna', '').replace('.fa', '').replace('.fasta', '')
-                    
-                    # Parsear distancia (puede estar en notación científica)
-                    distance_raw = str(parts[2])
-                    try:
-                        distance = float(distance_raw)
-                        # Las distancias en BinDash suelen estar ya normalizadas
-                        distance = max(0.0, min(1.0, distance))
-                    except ValueError:
-                        print(f"⚠️ No se pudo parsear distancia '{distance_raw}' en línea {i+1}, usando 0.5")
-                        distance = 0.5
-                    
-                    # Parsear P-value (puede estar en notación científica)
-                    p_value = 0.0
-                    if len(parts) >= 4:
-                        try:
-                            p_value_raw = str(parts[3])
-                            p_value = max(0.0, min(1.0, float(p_value_raw)))
-                        except (ValueError, IndexError):
-                            p_value = 0.0
-                    
-                    # Parsear Jaccard index (puede ser fracción como "8533/16384")
-                    jaccard_index = max(0.0, 1.0 - distance)  # Valor por defecto
-                    if len(parts) >= 5:
-                        try:
-                            jaccard_raw = str(parts[4])
-                            if '/' in jaccard_raw:
-                                # Es una fracción
-                                numerator, denominator = jaccard_raw.split('/', 1)
-                                jaccard_index = float(numerator) / float(denominator)
-                            else:
-                                # Es un número decimal
-                                jaccard_index = float(jaccard_raw)
-                            jaccard_index = max(0.0, min(1.0, jaccard_index))
-                        except (ValueError, ZeroDivisionError, IndexError):
-                            jaccard_index = max(0.0, 1.0 - distance)
-                    
-                    # Calcular ANI (Average Nucleotide Identity)
-                    # ANI = 1 - distancia genómica
-                    ani = max(0.0, min(1.0, 1.0 - distance))
-                    
-                    # Agregar datos parseados
-                    parsed_data.append({
-                        'Query': query,
-                        'Target': target,
-                        'Mutation_distance': distance,
-                        'P_value': p_value,
-                        'Jaccard_index': jaccard_index,
-                        'ANI': ani
-                    })
-                    
-                except Exception as e:
-                    errors_count += 1
-                    if errors_count <= 5:  # Solo mostrar los primeros 5 errores
-                        print(f"⚠️ Error parseando línea {i+1}: {line[:100]}... Error: {e}")
-                    continue
-            
-            if not parsed_data:
-                raise ValueError("No se pudieron parsear datos válidos del archivo")
             
-            df = pd.DataFrame(parsed_data)
+            # Parseo vectorizado por bloques (en paralelo si el archivo es grande)
+            df = read_blocks(file_path, partial(parse_bindash_block, separator=separator))
+            print(f"📄 Procesadas {len(df)} líneas de datos")
+            
+            if df.empty:
+                raise ValueError("No se pudieron parsear datos válidos del archivo")
             
             # Filtrar duplicados y datos inválidos
             initial_count = len(df)
@@ -259,8 +260,6 @@ class BinDashVisualizer(BaseVisualizer):
             df = df[df['Query'] != df['Target']]  # Remover auto-comparaciones
             
             print(f"✅ Parseados {len(df)} pares de comparaciones válidos (de {initial_count} iniciales)")
-            if errors_count > 0:
-                print(f"⚠️ Se encontraron {errors_count} líneas con errores que fueron omitidas")
             
             # Mostrar estadísticas básicas
             print(f"📊 Estadísticas básicas:")
@@ -322,50 +321,80 @@ class BinDashVisualizer(BaseVisualizer):
     
     def generate_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Generar estadísticas de análisis BinDash."""
-        return {
+        # Un resumen por columna: una selección parcial para todos los cuantiles
+        columns = describe_columns(data, ['ANI', 'Mutation_distance', 'Jaccard_index'],
+                                   quantiles=(0.25, 0.5, 0.75))
+        ani, distance, jaccard = columns['ANI'], columns['Mutation_distance'], columns['Jaccard_index']
+        stats = {
             'total_comparisons': len(data),
-            'unique_genomes': len(set(data['Query'].tolist() + data['Target'].tolist())),
-            'mean_ani': float(data['ANI'].mean()),
-            'std_ani': float(data['ANI'].std()),
-            'min_ani': float(data['ANI'].min()),
-            'max_ani': float(data['ANI'].max()),
-            'mean_mutation_distance': float(data['Mutation_distance'].mean()),
-            'std_mutation_distance': float(data['Mutation_distance'].std()),
-            'mean_jaccard': float(data['Jaccard_index'].mean()),
-            'std_jaccard': float(data['Jaccard_index'].std()),
-            'median_ani': float(data['ANI'].median()),
-            'q25_ani': float(data['ANI'].quantile(0.25)),
-            'q75_ani': float(data['ANI'].quantile(0.75))
+            'unique_genomes': len(self.get_distance_matrix(data)),
+            'mean_ani': ani['mean'],
+            'std_ani': ani['std'],
+            'min_ani': ani['min'],
+            'max_ani': ani['max'],
+            'mean_mutation_distance': distance['mean'],
+            'std_mutation_distance': distance['std'],
+            'mean_jaccard': jaccard['mean'],
+            'std_jaccard': jaccard['std'],
+            'median_ani': ani['q50'],
+            'q25_ani': ani['q25'],
+            'q75_ani': ani['q75'],
+            'columns': columns
+        }
+
+        # Vecinos más cercanos de cada genoma (selección parcial por fila)
+        matrix = self.get_distance_matrix(data)
+        genomes = matrix.index.to_numpy()
+        indices, distances = nearest_neighbors(matrix.to_numpy(), self.neighbors)
+        stats['nearest_neighbors'] = {
+            genome: [{'genome': genomes[j], 'distance': float(d)}
+                     for j, d in zip(indices[i], distances[i])]
+            for i, genome in enumerate(genomes)
         }
+        return stats
     
+    def get_distance_matrix(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Matriz de distancias, calculada una vez por DataFrame.
+
+        La comparten los heatmaps, el dendrograma, el MDS, la exportación del
+        árbol y las estadísticas; no debe modificarse en el sitio.
+        """
+        if self._matrix is None or self._matrix[0] is not data:
+            self._matrix = (data, self._create_distance_matrix(data))
+        return self._matrix[1]
+
     def _create_distance_matrix(self, data: pd.DataFrame) -> pd.DataFrame:
         """Crear matriz de distancias simétrica."""
-        genomes = sorted(set(data['Query'].tolist() + data['Target'].tolist()))
-        matrix = pd.DataFrame(index=genomes, columns=genomes, dtype=float)
-        
-        # Llenar matriz
-        for _, row in data.iterrows():
-            query, target = row['Query'], row['Target']
-            distance = row['Mutation_distance']
-            
-            if query in genomes and target in genomes:
-                matrix.loc[query, target] = distance
-                matrix.loc[target, query] = distance
-        
-        # Diagonal = 0
-        for genome in genomes:
-            matrix.loc[genome, genome] = 0.0
-        
-        # Llenar valores faltantes
-        max_distance = data['Mutation_distance'].max()
-        fill_value = min(1.0, max_distance + 0.1)
-        matrix = matrix.fillna(fill_value)
-        
-        return matrix
+        with self.stage('distance_matrix'):
+            # Códigos de genoma para Query y Target en una sola pasada
+            genomes, codes = np.unique(
+                np.concatenate([data['Query'].to_numpy(), data['Target'].to_numpy()]),
+                return_inverse=True)
+            query, target = np.split(codes.ravel(), 2)
+            distance = data['Mutation_distance'].to_numpy(dtype=np.float64)
+
+            # Cada par se escribe en (q, t) y (t, q) intercalados, de modo que si
+            # un par aparece repetido gana la última fila en ambas celdas
+            n = len(genomes)
+            matrix = np.full((n, n), np.nan)
+            rows = np.column_stack([query, target]).ravel()
+            cols = np.column_stack([target, query]).ravel()
+            matrix[rows, cols] = np.repeat(distance, 2)
+
+            # Diagonal = 0
+            np.fill_diagonal(matrix, 0.0)
+
+            # Llenar valores faltantes
+            max_distance = np.nanmax(distance) if np.isfinite(distance).any() else np.nan
+            fill_value = min(1.0, max_distance + 0.1)
+            matrix[np.isnan(matrix)] = fill_value
+
+            return pd.DataFrame(matrix, index=genomes.tolist(), columns=genomes.tolist())
     
     def _plot_distance_heatmap(self, data: pd.DataFrame) -> str:
         """Crear heatmap de distancias genómicas."""
-        distance_matrix = self._create_distance_matrix(data)
+        distance_matrix = self.get_distance_matrix(data)
         
         plt.figure(figsize=self.default_figsize)
         mask = np.triu(np.ones_like(distance_matrix, dtype=bool))
@@ -389,7 +418,7 @@ class BinDashVisualizer(BaseVisualizer):
     
     def _plot_ani_heatmap(self, data: pd.DataFrame) -> str:
         """Crear heatmap de ANI."""
-        distance_matrix = self._create_distance_matrix(data)
+        distance_matrix = self.get_distance_matrix(data)
         ani_matrix = 1 - distance_matrix
         
         plt.figure(figsize=self.default_figsize)
@@ -416,7 +445,11 @@ class BinDashVisualizer(BaseVisualizer):
     
     def _plot_dendrogram(self, data: pd.DataFrame) -> List[str]:
         """Crear dendrograma filogenético."""
-        distance_matrix = self._create_distance_matrix(data)
+        # scipy se importa sólo cuando se dibuja el dendrograma
+        from scipy.cluster.hierarchy import dendrogram, linkage
+        from scipy.spatial.distance import squareform
+
+        distance_matrix = self.get_distance_matrix(data)
         
         if distance_matrix.empty or distance_matrix.shape[0] < 2:
             return [self.create_basic_plot("Dendrograma", "Datos insuficientes para dendrograma", "lightcoral")]
@@ -429,7 +462,10 @@ class BinDashVisualizer(BaseVisualizer):
             condensed_distances = squareform(matrix_values)
             condensed_distances = np.nan_to_num(condensed_distances, nan=1.0, neginf=0.0, posinf=1.0)
             
-            linkage_matrix = linkage(condensed_distances, method='average')
+            with self.stage('linkage'):
+                linkage_matrix = linkage(condensed_distances, method='average')
+            with self.stage('tree_export'):
+                self._save_tree_files(linkage_matrix, list(distance_matrix.index))
             
             # Dendrograma principal
             plt.figure(figsize=(15, 8))
@@ -452,6 +488,29 @@ class BinDashVisualizer(BaseVisualizer):
         except Exception as e:
             return [self.create_basic_plot("Error Dendrograma", f"Error: {str(e)}", "lightcoral")]
     
+    def _save_tree_files(self, linkage_matrix: np.ndarray, labels: List[str]) -> None:
+        """Exportar el árbol en Newick y los clusters a distancia cluster_distance en TSV."""
+        from scipy.cluster.hierarchy import fcluster
+
+        # Newick iterativo: la recursión no escala a miles de genomas
+        n = len(labels)
+        newick = {}
+        heights = np.zeros(n + len(linkage_matrix))
+        for i, (left, right, height, _) in enumerate(linkage_matrix):
+            node, left, right = n + i, int(left), int(right)
+            heights[node] = height
+            children = []
+            for child in (left, right):
+                text = _newick_label(labels[child]) if child < n else newick.pop(child)
+                children.append(f"{text}:{(height - heights[child]) / 2:.6f}")
+            newick[node] = f"({','.join(children)})"
+        with open(self.output_dir / 'dendrogram.nwk', 'w') as f:
+            f.write(newick[n + len(linkage_matrix) - 1] + ';\n')
+
+        clusters = fcluster(linkage_matrix, t=self.cluster_distance, criterion='distance')
+        pd.DataFrame({'Genome': labels, 'Cluster': clusters}).sort_values(['Cluster', 'Genome']).to_csv(
+            self.output_dir / 'clusters.tsv', sep='\t', index=False)
+
     def _plot_distance_distribution(self, data: pd.DataFrame) -> str:
         """Crear histogramas de distribuciones."""
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
@@ -520,7 +579,10 @@ class BinDashVisualizer(BaseVisualizer):
     
     def _plot_mds_analysis(self, data: pd.DataFrame) -> str:
         """Crear análisis MDS."""
-        distance_matrix = self._create_distance_matrix(data)
+        # sklearn se importa sólo cuando se calcula el MDS
+        from sklearn.manifold import MDS
+
+        distance_matrix = self.get_distance_matrix(data)
         
         try:
             mds = MDS(n_components=2, dissimilarity='precomputed', random_state=42)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Descarga de Trabajos Empaquetados
+=================================
+
+Genera un zip o un tar con todos los artefactos de un directorio de trabajo
+(gráficos PNG, JSON de estadísticas, Newick, TSV de clusters...) como un
+generador de fragmentos de bytes, listo para una respuesta en streaming:
+
+- Nada se construye en memoria: cada archivo se lee en bloques de
+  CHUNK_BYTES y los bytes del archivo se entregan en cuanto se escriben.
+- zip: los formatos ya comprimidos (PNG, gz...) se guardan con ZIP_STORED;
+  el resto (texto, JSON, TSV) con ZIP_DEFLATED. zipfile escribe en un
+  stream no posicionable usando descriptores de datos tras cada entrada.
+- tar: cabeceras PAX y datos sin compresión; el tamaño final se conoce de
+  antemano (tar_size) y puede enviarse como Content-Length.
+"""
+
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+CHUNK_BYTES = 1 << 20
+
+# Formatos ya comprimidos: recomprimirlos sólo gasta CPU
+STORED_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.gz', '.bgz', '.zst', '.zip', '.pdf'}
+
+BUNDLE_FORMATS = {
+    'zip': 'application/zip',
+    'tar': 'application/x-tar',
+}
+
+TAR_BLOCK = tarfile.BLOCKSIZE
+TAR_END = b'\0' * (2 * TAR_BLOCK)
+
+
+def job_files(job_dir: Path) -> List[Tuple[Path, str]]:
+    """
+    Archivos de un trabajo con su nombre dentro del paquete.
+
+    Se omiten los archivos y directorios ocultos y el directorio temp/ de
+    los visualizadores.
+
+    Returns:
+        Lista ordenada de (ruta, nombre relativo)
+    """
+    job_dir = Path(job_dir)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(job_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != 'temp')
+        for filename in sorted(filenames):
+            if filename.startswith('.'):
+                continue
+            path = Path(dirpath) / filename
+            files.append((path, path.relative_to(job_dir).as_posix()))
+    return files
+
+
+def _read_chunks(path: Path, limit: int = -1) -> Iterator[bytes]:
+    """Leer el archivo en bloques (como mucho `limit` bytes si limit >= 0)."""
+    with open(path, 'rb') as f:
+        while limit != 0:
+            chunk = f.read(CHUNK_BYTES if limit < 0 else min(CHUNK_BYTES, limit))
+            if not chunk:
+                break
+            if limit > 0:
+                limit -= len(chunk)
+            yield chunk
+
+
+class _ChunkSink:
+    """Destino de escritura no posicionable que acumula lo escrito hasta drain()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+def stream_zip(files: List[Tuple[Path, str]], root: str) -> Iterator[bytes]:
+    """
+    Generar un zip con los archivos dados.
+
+    Args:
+        files: Lista de (ruta, nombre relativo), ver job_files()
+        root: Directorio raíz dentro del zip (p. ej. el identificador del trabajo)
+
+    Yields:
+        Fragmentos consecutivos del archivo zip
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for path, name in files:
+            info = zipfile.ZipInfo.from_file(path, f"{root}/{name}")
+            info.compress_type = (zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES
+                                  else zipfile.ZIP_DEFLATED)
+            with archive.open(info, 'w') as entry:
+                for chunk in _read_chunks(path):
+                    entry.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def _tar_header(path: Path, name: str) -> Tuple[bytes, int]:
+    stat = path.stat()
+    info = tarfile.TarInfo(name)
+    info.size = stat.st_size
+    info.mtime = stat.st_mtime
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT), stat.st_size
+
+
+def _tar_padding(size: int) -> int:
+    return -size % TAR_BLOCK
+
+
+def tar_size(files: List[Tuple[Path, str]], root: str) -> int:
+    """Tamaño exacto en bytes del tar que generará stream_tar()."""
+    total = len(TAR_END)
+    for path, name in files:
+        header, size = _tar_header(path, f"{root}/{name}")
+        total += len(header) + size + _tar_padding(size)
+    return total
+
+
+def stream_tar(files: List[Tuple[Path, str]], root: str) -> Iterator[bytes]:
+    """
+    Generar un tar (sin compresión) con los archivos dados.
+
+    Args:
+        files: Lista de (ruta, nombre relativo), ver job_files()
+        root: Directorio raíz dentro del tar
+
+    Yields:
+        Fragmentos consecutivos del archivo tar
+    """
+    for path, name in files:
+        header, size = _tar_header(path, f"{root}/{name}")
+        yield header
+        # Se envían exactamente los bytes declarados en la cabecera
+        written = 0
+        for chunk in _read_chunks(path, size):
+            written += len(chunk)
+            yield chunk
+        yield b'\0' * (size - written + _tar_padding(size))
+    yield TAR_END
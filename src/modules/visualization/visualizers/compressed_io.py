@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Lectura Transparente de Archivos Comprimidos
+============================================
+
+Los resultados de BinDash, eggNOG-mapper y hmmscan se guardan comprimidos
+en el gestor de archivos. Este módulo detecta la compresión por los bytes
+mágicos (no por la extensión) y entrega siempre el contenido descomprimido:
+
+- gzip: gzip del estándar de Python
+- bgzip (BGZF): bloques independientes de ≤64 KiB que se descomprimen en
+  paralelo con un pool de hilos (zlib libera el GIL)
+- zstd: paquete opcional `zstandard`
+
+Los parsers de los visualizadores abren sus entradas con open_input() y la
+detección de tipo en app.py usa read_head() sobre el contenido descomprimido.
+"""
+
+import gzip
+import io
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Extensiones de compresión que se ignoran al buscar la extensión real
+COMPRESSED_SUFFIXES = ['.gz', '.bgz', '.zst', '.zstd']
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+READ_BUFFER_BYTES = 1 << 20
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """
+    Identificar la compresión a partir de los primeros bytes.
+
+    Args:
+        head: Al menos los 18 primeros bytes del archivo
+
+    Returns:
+        'gzip', 'bgzip', 'zstd' o None si el archivo no está comprimido
+    """
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    if head.startswith(GZIP_MAGIC):
+        # BGZF: gzip con FLG.FEXTRA y subcampo 'BC' que guarda el tamaño del bloque
+        if len(head) >= 16 and head[3] & 0x04 and head[12:14] == b'BC':
+            return 'bgzip'
+        return 'gzip'
+    return None
+
+
+def file_compression(file_path: Path) -> Optional[str]:
+    """Compresión de un archivo en disco (ver detect_compression)."""
+    with open(file_path, 'rb') as f:
+        return detect_compression(f.read(18))
+
+
+def strip_compression_suffix(file_path: Path) -> Path:
+    """'genes.emapper.annotations.gz' -> 'genes.emapper.annotations'."""
+    file_path = Path(file_path)
+    if file_path.suffix.lower() in COMPRESSED_SUFFIXES:
+        return file_path.with_suffix('')
+    return file_path
+
+
+def default_threads() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _inflate_block(cdata: bytes, crc: int, isize: int) -> bytes:
+    data = zlib.decompress(cdata, -15)
+    if len(data) != isize or zlib.crc32(data) != crc:
+        raise ValueError("Bloque BGZF corrupto (CRC o tamaño no coinciden)")
+    return data
+
+
+class BgzfReader(io.RawIOBase):
+    """
+    Lector de archivos BGZF que descomprime varios bloques a la vez.
+
+    Mantiene una ventana de bloques en vuelo en un ThreadPoolExecutor y los
+    entrega en orden, de modo que la lectura secuencial escala con los
+    núcleos disponibles.
+    """
+
+    def __init__(self, file_path: Path, threads: Optional[int] = None):
+        super().__init__()
+        self._file = open(file_path, 'rb')
+        self._threads = threads or default_threads()
+        self._pool = ThreadPoolExecutor(self._threads)
+        self._pending = deque()
+        self._buffer = memoryview(b'')
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_block(self):
+        """Leer el siguiente bloque comprimido: (datos deflate, crc32, tamaño)."""
+        header = self._file.read(12)
+        if not header:
+            return None
+        if len(header) < 12 or header[:2] != GZIP_MAGIC or not header[3] & 0x04:
+            raise ValueError("Encabezado BGZF inválido")
+
+        xlen = struct.unpack('<H', header[10:12])[0]
+        extra = self._file.read(xlen)
+        block_size = None
+        pos = 0
+        while pos + 4 <= len(extra):
+            subfield, length = extra[pos:pos + 2], struct.unpack('<H', extra[pos + 2:pos + 4])[0]
+            if subfield == b'BC' and length == 2:
+                block_size = struct.unpack('<H', extra[pos + 4:pos + 6])[0] + 1
+            pos += 4 + length
+        if block_size is None:
+            raise ValueError("Bloque BGZF sin subcampo BC")
+
+        rest = self._file.read(block_size - 12 - xlen)
+        if len(rest) < 8:
+            raise ValueError("Archivo BGZF truncado")
+        crc, isize = struct.unpack('<II', rest[-8:])
+        return rest[:-8], crc, isize
+
+    def _fill_window(self) -> None:
+        while not self._eof and len(self._pending) < self._threads * 4:
+            block = self._next_block()
+            if block is None:
+                self._eof = True
+                break
+            self._pending.append(self._pool.submit(_inflate_block, *block))
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            self._fill_window()
+            if not self._pending:
+                return 0
+            # Los bloques vacíos (p. ej. el marcador EOF) se saltan
+            self._buffer = memoryview(self._pending.popleft().result())
+
+        n = min(len(buffer), len(self._buffer))
+        buffer[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+            self._file.close()
+        super().close()
+
+
+def _open_zstd(file_path: Path):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("El archivo está comprimido con zstd; instale el paquete 'zstandard'")
+    raw = open(file_path, 'rb')
+    reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    return io.BufferedReader(reader, READ_BUFFER_BYTES)
+
+
+def open_input(file_path: Path, mode: str = 'rb', threads: Optional[int] = None,
+               encoding: str = 'utf-8', errors: str = 'replace'):
+    """
+    Abrir un archivo de entrada descomprimiéndolo si es necesario.
+
+    Args:
+        file_path: Ruta al archivo (plano, gzip, bgzip o zstd)
+        mode: 'rb' para bytes o 'r'/'rt' para texto
+        threads: Hilos para descomprimir BGZF (por defecto según CPUs)
+        encoding: Codificación en modo texto
+        errors: Manejo de errores de decodificación en modo texto
+
+    Returns:
+        Objeto archivo con el contenido descomprimido
+    """
+    compression = file_compression(file_path)
+    if compression is None:
+        if 'b' in mode:
+            return open(file_path, 'rb')
+        return open(file_path, 'r', encoding=encoding, errors=errors)
+
+    if compression == 'bgzip':
+        stream = io.BufferedReader(BgzfReader(file_path, threads), READ_BUFFER_BYTES)
+    elif compression == 'zstd':
+        stream = _open_zstd(file_path)
+    else:
+        stream = gzip.open(file_path, 'rb')
+
+    if 'b' in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
+
+
+def read_head(file_path: Path, size: int = 8192) -> bytes:
+    """Primeros `size` bytes del contenido descomprimido."""
+    with open_input(file_path, 'rb') as f:
+        return f.read(size)
+
+
+def iter_line_blocks(file_path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Recorrer un archivo en bloques de bytes alineados a salto de línea.
+
+    Los archivos planos se leen con mmap; los comprimidos, del stream
+    descomprimido arrastrando la línea incompleta al bloque siguiente.
+
+    Args:
+        file_path: Ruta al archivo
+        chunk_bytes: Tamaño aproximado de cada bloque
+
+    Yields:
+        Bloques que terminan en salto de línea (salvo quizá el último)
+    """
+    file_path = Path(file_path)
+    if file_path.stat().st_size == 0:
+        return
+
+    if file_compression(file_path) is None:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = min(start + chunk_bytes, size)
+                if end < size:
+                    newline = mm.find(b'\n', end)
+                    end = size if newline == -1 else newline + 1
+                yield mm[start:end]
+                start = end
+        return
+
+    with open_input(file_path, 'rb') as f:
+        carry = b''
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                break
+            data = carry + data
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                carry = data
+                continue
+            carry = data[cut:]
+            yield data[:cut]
+        if carry:
+            yield carry
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Detección de Tipo de Archivo por Contenido
+==========================================
+
+Lee una cabecera acotada (ya descomprimida), separa las líneas de
+comentario de las de datos y puntúa cada tipo registrado según su firma:
+
+- annotations: cabecera '## emapper' / '#query' de eggNOG-mapper
+- seed_orthologs: cabecera '#qseqid' con sseqid/evalue/bitscore
+- hmmer: tabla --domtblout (22+ campos, nombres de target/query no numéricos,
+  dominio '#'/'of' enteros, coordenadas y E-values numéricos)
+- bindash: pares Query/Target con distancia, p-value y Jaccard 'a/b', o
+  matriz de distancias cuadrada
+
+La extensión sólo suma un pequeño bono, de modo que un '.txt' de HMMER se
+enruta a hmmer aunque '.txt' también sea extensión de bindash; sólo decide
+por sí sola cuando ninguna firma coincide. Todo se resuelve en una pasada
+sobre la cabecera, sin parsear el archivo.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Bytes de cabecera que se analizan
+HEAD_BYTES = 8192
+# Líneas de datos que se puntúan como máximo
+MAX_DATA_LINES = 20
+# Puntuación mínima para aceptar un tipo por contenido
+MIN_SCORE = 0.5
+# Bono por coincidencia de extensión
+EXTENSION_BONUS = 0.1
+
+DOMTBLOUT_FIXED_FIELDS = 22
+SEED_HEADER_COLUMNS = ('sseqid', 'evalue', 'bitscore')
+EGGNOG_HEADER_COLUMNS = ('seed_ortholog', 'evalue', 'score')
+
+
+class HeadSample(NamedTuple):
+    """Cabecera tokenizada: líneas de comentario y de datos."""
+    comments: List[str]
+    data: List[str]
+
+
+class Detection(NamedTuple):
+    """Resultado de la detección."""
+    file_type: Optional[str]
+    score: float
+    scores: Dict[str, float]
+
+    def summary(self) -> Dict:
+        return {
+            'file_type': self.file_type,
+            'score': round(self.score, 3),
+            'scores': {name: round(score, 3) for name, score in self.scores.items()}
+        }
+
+
+def tokenize_head(head: bytes, max_data_lines: int = MAX_DATA_LINES) -> HeadSample:
+    """
+    Separar la cabecera en líneas de comentario y de datos.
+
+    Si la cabecera está truncada, la última línea (incompleta) se descarta.
+    """
+    text = head.decode('utf-8', errors='replace')
+    lines = text.split('\n')
+    if len(head) >= HEAD_BYTES and len(lines) > 1:
+        lines = lines[:-1]
+
+    comments, data = [], []
+    for line in lines:
+        line = line.rstrip('\r')
+        if not line.strip():
+            continue
+        if line.startswith('#'):
+            comments.append(line)
+        elif len(data) < max_data_lines:
+            data.append(line)
+    return HeadSample(comments, data)
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_int(token: str) -> bool:
+    return token.isdigit()
+
+
+def _fraction(lines: Iterable[str], predicate: Callable[[str], bool]) -> float:
+    lines = list(lines)
+    if not lines:
+        return 0.0
+    return sum(1 for line in lines if predicate(line)) / len(lines)
+
+
+def _header_columns(sample: HeadSample) -> List[str]:
+    """Columnas de la última línea '#' con tabuladores (p. ej. '#query\\t...')."""
+    for line in reversed(sample.comments):
+        if not line.startswith('##') and '\t' in line:
+            return [column.strip() for column in line[1:].split('\t')]
+    return []
+
+
+def score_annotations(sample: HeadSample) -> float:
+    columns = _header_columns(sample)
+    if columns:
+        # Un encabezado distinto (p. ej. '#qseqid' de seed_orthologs) descarta el tipo
+        is_eggnog = columns[0] == 'query' and all(col in columns for col in EGGNOG_HEADER_COLUMNS)
+        return 1.0 if is_eggnog else 0.0
+    if any(line.startswith('## emapper') for line in sample.comments):
+        return 0.6
+
+    # Sin cabecera: muchas columnas, ortólogo semilla 'taxid.proteína' y e-value
+    def matches(line):
+        fields = line.split('\t')
+        return (len(fields) >= 15 and '.' in fields[1] and fields[1].split('.', 1)[0].isdigit()
+                and _is_number(fields[2]))
+    return 0.7 * _fraction(sample.data, matches)
+
+
+def score_seed_orthologs(sample: HeadSample) -> float:
+    columns = _header_columns(sample)
+    if columns and columns[0] == 'qseqid' and all(col in columns for col in SEED_HEADER_COLUMNS):
+        return 1.0
+
+    # Sin cabecera: 11 columnas, todas numéricas salvo qseqid y sseqid
+    def matches(line):
+        fields = line.split('\t')
+        return len(fields) == 11 and all(_is_number(field) for field in fields[2:])
+    return 0.7 * _fraction(sample.data, matches)
+
+
+def score_hmmer(sample: HeadSample) -> float:
+    def matches(line):
+        fields = line.split(None, DOMTBLOUT_FIXED_FIELDS)
+        if len(fields) < DOMTBLOUT_FIXED_FIELDS:
+            return False
+        # Nombres de target y query: una fila de matriz de distancias sólo tiene números
+        if _is_number(fields[0]) or _is_number(fields[3]):
+            return False
+        # Dominio '#' de 'of' (enteros, # <= of)
+        if not (_is_int(fields[9]) and _is_int(fields[10]) and int(fields[9]) <= int(fields[10])):
+            return False
+        # tlen, qlen, E-value, score y coordenadas de envoltura
+        return all(_is_number(fields[idx]) for idx in (2, 5, 6, 7, 19, 20))
+
+    score = 0.9 * _fraction(sample.data, matches)
+    if any(line.startswith('# target name') for line in sample.comments):
+        score = max(score, 0.8) + 0.1
+    return min(score, 1.0)
+
+
+def score_bindash(sample: HeadSample) -> float:
+    data = sample.data
+    # Encabezado como primera línea de datos o como comentario '# Query\tTarget...'
+    headers = [data[0].split('\t') if data else [], _header_columns(sample)]
+    if any(header[:2] == ['Query', 'Target'] for header in headers):
+        return 1.0
+
+    def is_jaccard(token):
+        numerator, _, denominator = token.partition('/')
+        return _is_number(numerator) and (not denominator or _is_number(denominator))
+
+    # Pares: query, target, distancia, p-value, jaccard
+    def is_pair(line):
+        fields = line.split('\t')
+        return (len(fields) == 5 and all(_is_number(field) for field in fields[2:4])
+                and is_jaccard(fields[4]))
+
+    # Matriz: nombre + distancias numéricas, tantas columnas como genomas
+    def is_matrix_row(line):
+        fields = line.split('\t')
+        return len(fields) > 2 and all(_is_number(field) for field in fields[1:])
+
+    pairs = _fraction(data, is_pair)
+    matrix = _fraction(data[1:], is_matrix_row) if len(data) > 1 else 0.0
+
+    # Matriz cuadrada: encabezado de nombres (celda de esquina vacía o '#')
+    # y filas con tantos campos como el encabezado
+    if data and data[0].startswith('\t'):
+        header, rows = data[0].split('\t'), data[1:]
+    else:
+        header, rows = _header_columns(sample), data
+    square = 0.0
+    if rows and len(header) > 2 and not any(_is_number(name) for name in header[1:]):
+        width = len(header)
+        square = _fraction(rows, lambda line: is_matrix_row(line) and line.count('\t') + 1 == width)
+
+    return max(0.9 * pairs, 0.8 * matrix, square)
+
+
+SIGNATURES: Dict[str, Callable[[HeadSample], float]] = {
+    'annotations': score_annotations,
+    'seed_orthologs': score_seed_orthologs,
+    'hmmer': score_hmmer,
+    'bindash': score_bindash,
+}
+
+
+def detect(head: bytes, file_name: Path, extensions: Dict[str, List[str]]) -> Detection:
+    """
+    Puntuar cada tipo registrado y elegir el mejor.
+
+    Args:
+        head: Primeros bytes (descomprimidos) del archivo
+        file_name: Nombre del archivo, sin extensión de compresión
+        extensions: {tipo: extensiones} de los tipos registrados
+
+    Returns:
+        Detection con el tipo ganador (o None) y las puntuaciones por tipo
+    """
+    sample = tokenize_head(head)
+    name = Path(file_name).name.lower()
+
+    scores = {}
+    for file_type, type_extensions in extensions.items():
+        signature = SIGNATURES.get(file_type)
+        score = signature(sample) if signature else 0.0
+        if any(name.endswith(ext) for ext in type_extensions):
+            score += EXTENSION_BONUS
+        scores[file_type] = score
+
+    if scores:
+        best = max(scores, key=scores.get)
+        if scores[best] >= MIN_SCORE:
+            return Detection(best, scores[best], scores)
+
+    # Sin coincidencia por contenido (o tipos sin firma): sólo por extensión
+    for file_type, type_extensions in extensions.items():
+        if any(name.endswith(ext) for ext in type_extensions):
+            return Detection(file_type, scores[file_type], scores)
+
+    return Detection(None, 0.0, scores)
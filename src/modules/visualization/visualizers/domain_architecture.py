@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Arquitecturas de Dominios a partir de Hits de HMMER
+===================================================
+
+Agrupa los hits de un domtblout por secuencia (Target Name), los ordena por
+coordenadas de envoltura (Env From / Env To) y resuelve solapamientos
+conservando el dominio con mejor i-Evalue:
+
+- Resolución por rondas vectorizadas sobre intervalos ordenados: en cada
+  ronda se conservan los hits mejores que todos sus solapados y se descartan
+  los que solapan con ellos (mismo resultado que el recorrido voraz por
+  i-Evalue, sin bucles por proteína)
+- Las arquitecturas (ej: 'Pkinase-SH2-SH3') se identifican con un hash de la
+  secuencia de códigos de dominio y sólo se construye el texto de las
+  arquitecturas únicas
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Architectures(NamedTuple):
+    """Resultado de la extracción de arquitecturas."""
+    hits: pd.DataFrame           # hits conservados, ordenados por secuencia y posición
+    per_target: pd.DataFrame     # Target Name, Architecture, Domains
+    frequencies: pd.DataFrame    # Architecture, Domains, Count
+
+
+def _overlap_min(values: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    Mínimo de values entre todos los intervalos que solapan a cada uno.
+
+    Con los intervalos ordenados por inicio, los que empiezan después de i y
+    lo solapan forman el rango contiguo (i, upper[i]]. Ese rango se consulta
+    con una sparse table (RMQ) y, en sentido inverso, cada j propaga su valor
+    a su rango con actualizaciones min por bloques de potencias de dos.
+    """
+    n = len(values)
+    positions = np.arange(n)
+    span = upper - positions
+    result = np.full(n, np.inf)
+    has_later = span > 0
+    if not has_later.any():
+        return result
+
+    levels = int(span.max()).bit_length()
+    table = np.full((levels, n), np.inf)
+    table[0] = values
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        table[k, :n - half] = np.minimum(table[k - 1, :n - half], table[k - 1, half:])
+
+    left = positions[has_later] + 1
+    right = upper[has_later]
+    level = np.log2(right - left + 1).astype(np.int64)
+    right_block = right - (1 << level) + 1
+
+    # Intervalos posteriores que solapan a i
+    result[has_later] = np.minimum(table[level, left], table[level, right_block])
+
+    # Intervalos anteriores: j propaga values[j] a (j, upper[j]]
+    updates = np.full((levels, n), np.inf)
+    np.minimum.at(updates, (level, left), values[has_later])
+    np.minimum.at(updates, (level, right_block), values[has_later])
+    for k in range(levels - 1, 0, -1):
+        half = 1 << (k - 1)
+        np.minimum(updates[k - 1], updates[k], out=updates[k - 1])
+        np.minimum(updates[k - 1, half:], updates[k, :n - half], out=updates[k - 1, half:])
+
+    return np.minimum(result, updates[0])
+
+
+def resolve_overlaps(targets: np.ndarray, env_from: np.ndarray, env_to: np.ndarray,
+                     ievalue: np.ndarray, score: np.ndarray) -> np.ndarray:
+    """
+    Resolver dominios solapados dentro de cada secuencia.
+
+    Equivale a recorrer los hits de mejor a peor i-Evalue conservando los
+    que no solapan con uno ya conservado, pero en rondas vectorizadas: un hit
+    mejor que todos los que lo solapan se conserva y sus solapados se
+    descartan. Los arreglos deben estar ordenados por (target, env_from).
+
+    Args:
+        targets: Código entero de secuencia por hit
+        env_from: Inicio de la envoltura
+        env_to: Fin de la envoltura
+        ievalue: i-Evalue (menor es mejor)
+        score: Puntuación del dominio (desempate, mayor es mejor)
+
+    Returns:
+        Máscara booleana de hits conservados
+    """
+    n = len(targets)
+    keep = np.zeros(n, dtype=bool)
+    # Rango de calidad: 0 = mejor hit (i-Evalue, luego score, luego posición)
+    quality = np.empty(n, dtype=np.float64)
+    quality[np.lexsort((np.arange(n), -score, ievalue))] = np.arange(n)
+
+    coord_span = int(max(env_from.max(initial=0), env_to.max(initial=0))) + 1
+    alive = np.arange(n)
+    while len(alive):
+        t = targets[alive].astype(np.int64)
+        key = t * coord_span + env_from[alive]
+        # Último hit de la misma secuencia que empieza antes del fin de cada hit
+        upper = np.searchsorted(key, t * coord_span + env_to[alive], side='right') - 1
+
+        q = quality[alive]
+        winners = q < _overlap_min(q, upper)
+        keep[alive[winners]] = True
+
+        touched = _overlap_min(np.where(winners, 0.0, np.inf), upper) == 0
+        alive = alive[~(winners | touched)]
+
+    return keep
+
+
+def _architecture_hash(group_starts: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Hash polinomial (uint64) de la secuencia de códigos de cada grupo."""
+    position = np.arange(len(codes)) - np.repeat(group_starts, np.diff(np.append(group_starts, len(codes))))
+    with np.errstate(over='ignore'):
+        powers = np.power(np.uint64(1000003), position.astype(np.uint64))
+        terms = (codes.astype(np.uint64) + np.uint64(1)) * powers
+        return np.add.reduceat(terms, group_starts)
+
+
+def extract_architectures(data: pd.DataFrame, max_ievalue: float = 1e-3,
+                          domain_col: str = 'Query Name',
+                          target_col: str = 'Target Name') -> Architectures:
+    """
+    Extraer arquitecturas de dominios por secuencia.
+
+    Args:
+        data: DataFrame de domtblout (ver read_domtblout)
+        max_ievalue: Umbral de i-Evalue para considerar un hit
+        domain_col: Columna con el nombre del dominio
+        target_col: Columna con la secuencia que contiene el dominio
+
+    Returns:
+        Architectures con hits resueltos, arquitectura por secuencia y
+        frecuencias de arquitecturas
+    """
+    hits = data[data['i-Evalue'] <= max_ievalue]
+    targets = hits[target_col].astype('category')
+    domains = hits[domain_col].astype('category')
+
+    target_codes = targets.cat.codes.to_numpy()
+    domain_codes = domains.cat.codes.to_numpy()
+    env_from = hits['Env From'].to_numpy()
+    env_to = hits['Env To'].to_numpy()
+    ievalue = hits['i-Evalue'].to_numpy()
+    score = hits['Domain Score'].to_numpy()
+
+    order = np.lexsort((env_to, env_from, target_codes))
+    keep = resolve_overlaps(target_codes[order], env_from[order], env_to[order],
+                            ievalue[order], score[order])
+    order = order[keep]
+    resolved = hits.iloc[order].reset_index(drop=True)
+
+    sorted_targets = target_codes[order]
+    sorted_domains = domain_codes[order]
+    if len(order) == 0:
+        empty_targets = pd.DataFrame(columns=[target_col, 'Architecture', 'Domains'])
+        empty_freq = pd.DataFrame(columns=['Architecture', 'Domains', 'Count'])
+        return Architectures(resolved, empty_targets, empty_freq)
+
+    group_starts = np.flatnonzero(np.r_[True, sorted_targets[1:] != sorted_targets[:-1]])
+    n_domains = np.diff(np.append(group_starts, len(order)))
+    arch_hash = _architecture_hash(group_starts, sorted_domains)
+
+    # Texto sólo para las arquitecturas únicas (el hash incluye el número de dominios)
+    with np.errstate(over='ignore'):
+        arch_key = arch_hash ^ (n_domains.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+    arch_codes, uniques = pd.factorize(arch_key)
+    representative = np.zeros(len(uniques), dtype=np.int64)
+    representative[arch_codes[::-1]] = np.arange(len(arch_codes))[::-1]
+    domain_names = np.asarray(domains.cat.categories, dtype=object)
+    labels = np.array([
+        '-'.join(domain_names[sorted_domains[group_starts[g]:group_starts[g] + n_domains[g]]])
+        for g in representative
+    ], dtype=object)
+
+    per_target = pd.DataFrame({
+        target_col: np.asarray(targets.cat.categories, dtype=object)[sorted_targets[group_starts]],
+        'Architecture': labels[arch_codes],
+        'Domains': n_domains
+    })
+    counts = np.bincount(arch_codes, minlength=len(uniques))
+    frequencies = pd.DataFrame({
+        'Architecture': labels,
+        'Domains': n_domains[representative],
+        'Count': counts
+    }).sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
+
+    return Architectures(resolved, per_target, frequencies)
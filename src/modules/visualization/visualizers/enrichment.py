@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Motor de Enriquecimiento Funcional (Hipergeométrico / Fisher)
+=============================================================
+
+Pruebas de sobre-representación de términos (PFAM, KEGG, GO, EC, COG...)
+en un genoma o cluster frente a la colección completa:
+
+- Matriz de conteos término x muestra construida desde los mismos arreglos
+  explotados (TermArrays) que usa AnnotationsVisualizer
+- Todas las pruebas (términos x muestras) se evalúan en una sola llamada
+  vectorizada a scipy.stats.hypergeom
+- Corrección de Benjamini-Hochberg vectorizada
+"""
+
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from scipy import sparse
+from scipy.stats import hypergeom
+
+from .annotations_visualizer import TermArrays, explode_terms
+
+
+class CountMatrix(NamedTuple):
+    """Conteos de proteínas por término y muestra."""
+    counts: np.ndarray    # (n_terms, n_samples) proteínas con el término
+    sizes: np.ndarray     # (n_samples,) proteínas totales por muestra
+    terms: np.ndarray     # identificador de cada fila
+    samples: np.ndarray   # nombre de cada columna
+
+
+def build_count_matrix(term_arrays: Dict[str, TermArrays],
+                       sizes: Optional[Dict[str, int]] = None) -> CountMatrix:
+    """
+    Construir la matriz término x muestra desde arreglos explotados.
+
+    Cada proteína cuenta una sola vez por término aunque el término aparezca
+    repetido en su anotación.
+
+    Args:
+        term_arrays: Arreglos explotados por muestra (genoma)
+        sizes: Proteínas totales por muestra; si no se indica se usa el
+            número de proteínas con al menos una anotación
+
+    Returns:
+        CountMatrix con conteos densos (int64)
+    """
+    samples = np.array(list(term_arrays.keys()), dtype=object)
+    all_terms = pd.Index(pd.unique(np.concatenate(
+        [arrays.terms for arrays in term_arrays.values()] or [np.empty(0, dtype=object)])))
+
+    term_idx, sample_idx = [], []
+    sample_sizes = np.zeros(len(samples), dtype=np.int64)
+    for j, (name, arrays) in enumerate(term_arrays.items()):
+        mapped = all_terms.get_indexer(arrays.terms)[arrays.codes]
+        # Pares (proteína, término) únicos dentro de la muestra
+        pairs = np.unique(arrays.rows.astype(np.int64) * len(all_terms) + mapped)
+        term_idx.append(pairs % len(all_terms))
+        sample_idx.append(np.full(len(pairs), j, dtype=np.int64))
+        if sizes is not None and name in sizes:
+            sample_sizes[j] = sizes[name]
+        else:
+            sample_sizes[j] = len(np.unique(arrays.rows))
+
+    term_idx = np.concatenate(term_idx) if term_idx else np.empty(0, dtype=np.int64)
+    sample_idx = np.concatenate(sample_idx) if sample_idx else np.empty(0, dtype=np.int64)
+    counts = sparse.coo_matrix(
+        (np.ones(len(term_idx), dtype=np.int64), (term_idx, sample_idx)),
+        shape=(len(all_terms), len(samples))).toarray()
+
+    return CountMatrix(counts=counts, sizes=sample_sizes,
+                       terms=np.asarray(all_terms, dtype=object), samples=samples)
+
+
+def aggregate_groups(matrix: CountMatrix, groups: Dict[str, str]) -> CountMatrix:
+    """
+    Sumar columnas de muestras en grupos (ej: clusters de genomas).
+
+    Args:
+        matrix: Matriz por muestra
+        groups: Mapeo muestra -> grupo (las muestras sin grupo se descartan)
+
+    Returns:
+        CountMatrix con una columna por grupo
+    """
+    labels = pd.Series(matrix.samples).map(groups)
+    keep = labels.notna().to_numpy()
+    codes, group_names = pd.factorize(labels[keep])
+    membership = sparse.coo_matrix(
+        (np.ones(len(codes)), (np.flatnonzero(keep), codes)),
+        shape=(len(matrix.samples), len(group_names))).tocsr()
+
+    return CountMatrix(
+        counts=np.asarray(membership.T.dot(matrix.counts.T).T, dtype=np.int64),
+        sizes=np.asarray(membership.T.dot(matrix.sizes), dtype=np.int64),
+        terms=matrix.terms,
+        samples=np.asarray(group_names, dtype=object)
+    )
+
+
+def benjamini_hochberg(pvalues: np.ndarray, axis: Optional[int] = None) -> np.ndarray:
+    """
+    Corrección FDR de Benjamini-Hochberg vectorizada.
+
+    Args:
+        pvalues: Arreglo de p-values
+        axis: Eje sobre el que se corrige (None = todas las pruebas juntas)
+
+    Returns:
+        Arreglo de q-values con la misma forma
+    """
+    p = np.asarray(pvalues, dtype=float)
+    if axis is None:
+        return benjamini_hochberg(p.ravel(), axis=0).reshape(p.shape)
+
+    p = np.moveaxis(p, axis, -1)
+    n = p.shape[-1]
+    order = np.argsort(p, axis=-1)
+    ranked = np.take_along_axis(p, order, axis=-1) * n / np.arange(1, n + 1)
+    # Mínimo acumulado desde el final para garantizar monotonía
+    ranked = np.minimum.accumulate(ranked[..., ::-1], axis=-1)[..., ::-1]
+    qvalues = np.empty_like(ranked)
+    np.put_along_axis(qvalues, order, np.clip(ranked, 0, 1), axis=-1)
+    return np.moveaxis(qvalues, -1, axis)
+
+
+def hypergeometric_enrichment(matrix: CountMatrix, alternative: str = 'greater',
+                              fdr_axis: Optional[int] = None) -> pd.DataFrame:
+    """
+    Probar todos los términos en todas las muestras en una sola pasada.
+
+    Para el término t y la muestra g se evalúa la probabilidad de observar
+    al menos k proteínas con t entre las n de g, dadas K proteínas con t en
+    la colección de N proteínas. Es equivalente a la prueba exacta de Fisher
+    de una cola (muestra frente al resto de la colección).
+
+    Args:
+        matrix: Matriz término x muestra
+        alternative: 'greater' (sobre-representación) o 'less'
+        fdr_axis: None corrige sobre todas las pruebas; 0 corrige por muestra
+
+    Returns:
+        DataFrame largo con term, sample, count, expected, fold_enrichment,
+        p_value y q_value
+    """
+    k = matrix.counts.astype(np.int64)
+    n = matrix.sizes[np.newaxis, :].astype(np.int64)
+    K = k.sum(axis=1, keepdims=True)
+    M = int(matrix.sizes.sum())
+
+    if alternative == 'greater':
+        pvalues = hypergeom.sf(k - 1, M, K, n)
+    elif alternative == 'less':
+        pvalues = hypergeom.cdf(k, M, K, n)
+    else:
+        raise ValueError(f"Alternativa no soportada: {alternative}")
+
+    pvalues = np.nan_to_num(np.clip(pvalues, 0.0, 1.0), nan=1.0)
+    qvalues = benjamini_hochberg(pvalues, axis=fdr_axis)
+    expected = n * K / np.maximum(M, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fold = np.where(expected > 0, k / expected, np.nan)
+
+    n_terms, n_samples = k.shape
+    return pd.DataFrame({
+        'term': np.repeat(matrix.terms, n_samples),
+        'sample': np.tile(matrix.samples, n_terms),
+        'count': k.ravel(),
+        'sample_size': np.tile(matrix.sizes, n_terms),
+        'term_total': np.repeat(K.ravel(), n_samples),
+        'expected': expected.ravel(),
+        'fold_enrichment': fold.ravel(),
+        'p_value': pvalues.ravel(),
+        'q_value': qvalues.ravel()
+    })
+
+
+def significant_terms(results: pd.DataFrame, alpha: float = 0.05,
+                      min_count: int = 2) -> pd.DataFrame:
+    """Filtrar y ordenar resultados significativos."""
+    mask = (results['q_value'] <= alpha) & (results['count'] >= min_count)
+    return results[mask].sort_values(['q_value', 'fold_enrichment'],
+                                     ascending=[True, False]).reset_index(drop=True)
+
+
+def plot_enrichment_heatmap(results: pd.DataFrame, output_path: Path,
+                            top_n: int = 30, title: str = 'Enriquecimiento Funcional') -> Optional[str]:
+    """
+    Heatmap de -log10(q) para los términos más significativos.
+
+    Args:
+        results: Salida de hypergeometric_enrichment
+        output_path: Ruta del PNG a generar
+        top_n: Número de términos a mostrar
+        title: Título del gráfico
+
+    Returns:
+        Ruta al archivo generado o None si no hay resultados
+    """
+    if results.empty:
+        return None
+
+    best = results.groupby('term', sort=False)['q_value'].min().nsmallest(top_n).index
+    subset = results[results['term'].isin(best)]
+    heatmap = subset.pivot(index='term', columns='sample', values='q_value')
+    heatmap = -np.log10(heatmap.clip(lower=1e-300)).reindex(best)
+
+    plt.figure(figsize=(max(8, 0.5 * heatmap.shape[1] + 4), max(6, 0.35 * len(best) + 2)))
+    sns.heatmap(heatmap, cmap='YlOrRd', cbar_kws={'label': '-log10(q-value)'})
+    plt.title(title, fontsize=16, fontweight='bold')
+    plt.xlabel('Muestra')
+    plt.ylabel('Término')
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    plt.close()
+
+    return str(output_path)
+
+
+def enrichment_from_annotations(annotations: Dict[str, pd.DataFrame], column: str,
+                                groups: Optional[Dict[str, str]] = None,
+                                **kwargs) -> pd.DataFrame:
+    """
+    Atajo: enriquecimiento de una columna eggNOG sobre varios genomas.
+
+    Args:
+        annotations: DataFrames de anotaciones por genoma
+        column: Columna a evaluar (ej: 'PFAMs', 'KEGG_Pathway')
+        groups: Mapeo opcional genoma -> cluster
+        **kwargs: Parámetros para hypergeometric_enrichment
+
+    Returns:
+        DataFrame de resultados
+    """
+    arrays = {name: explode_terms(df[column]) for name, df in annotations.items()
+              if column in df.columns}
+    if not arrays:
+        raise ValueError(f"La columna '{column}' no está presente en las anotaciones")
+    sizes = {name: len(df) for name, df in annotations.items()}
+
+    matrix = build_count_matrix(arrays, sizes)
+    if groups:
+        matrix = aggregate_groups(matrix, groups)
+    return hypergeometric_enrichment(matrix, **kwargs)
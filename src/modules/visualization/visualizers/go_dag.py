@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Motor de Agregación sobre el DAG de Gene Ontology
+=================================================
+
+Carga el grafo de GO desde un archivo OBO local en arreglos enteros compactos
+(adyacencia de padres en formato CSR) y propaga conteos de anotaciones hacia
+los ancestros para resumir un proteoma en niveles "slim":
+
+- Cada término se identifica por un índice entero (int32)
+- La matriz de ancestros (término x ancestro, incluye el propio término) se
+  construye con una pasada vectorizada por niveles topológicos y se cachea
+  en memoria y en disco (.npz junto al OBO)
+- Los conteos propagados cuentan proteínas, no anotaciones: una proteína con
+  varios términos bajo el mismo ancestro suma una sola vez
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ['biological_process', 'molecular_function', 'cellular_component']
+DEFAULT_RELATIONSHIPS = ('is_a', 'part_of')
+
+# Cache en memoria de DAGs ya cargados, indexado por (ruta, tamaño, mtime, relaciones)
+_DAG_CACHE: Dict[Tuple, 'GODag'] = {}
+
+
+class GODag:
+    """
+    Representación compacta del DAG de Gene Ontology.
+
+    Atributos principales:
+        term_ids: arreglo con los identificadores GO (posición = índice entero)
+        names: nombres de los términos
+        namespace: código de namespace por término (índice en NAMESPACES)
+        parent_indptr / parent_indices: adyacencia de padres en formato CSR
+        depth: distancia mínima a la raíz (nivel slim)
+        topo_level: camino más largo desde la raíz (orden topológico)
+    """
+
+    def __init__(self, obo_path: Path,
+                 relationships: Sequence[str] = DEFAULT_RELATIONSHIPS,
+                 cache_dir: Optional[Path] = None):
+        """
+        Cargar DAG desde un archivo OBO.
+
+        Args:
+            obo_path: Ruta al archivo go-basic.obo / go.obo
+            relationships: Relaciones que se siguen al propagar hacia arriba
+            cache_dir: Directorio para cachear la matriz de ancestros
+                (por defecto, el directorio del OBO)
+        """
+        self.obo_path = Path(obo_path)
+        self.relationships = tuple(relationships)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.obo_path.parent
+        self._ancestors: Optional[sparse.csr_matrix] = None
+
+        self._load_obo()
+        self._compute_levels()
+
+    @classmethod
+    def load(cls, obo_path: Path,
+             relationships: Sequence[str] = DEFAULT_RELATIONSHIPS,
+             cache_dir: Optional[Path] = None) -> 'GODag':
+        """
+        Obtener un DAG cacheado en memoria (se recarga si cambia el archivo).
+
+        Args:
+            obo_path: Ruta al archivo OBO
+            relationships: Relaciones a seguir
+            cache_dir: Directorio de caché en disco
+
+        Returns:
+            Instancia de GODag
+        """
+        obo_path = Path(obo_path).resolve()
+        stat = obo_path.stat()
+        key = (str(obo_path), stat.st_size, stat.st_mtime_ns, tuple(relationships))
+        dag = _DAG_CACHE.get(key)
+        if dag is None:
+            dag = cls(obo_path, relationships, cache_dir)
+            _DAG_CACHE.clear()
+            _DAG_CACHE[key] = dag
+        return dag
+
+    # ========== CARGA DEL OBO ==========
+
+    def _load_obo(self):
+        """Parsear estrofas [Term] del OBO en arreglos enteros."""
+        term_ids: List[str] = []
+        names: List[str] = []
+        namespaces: List[int] = []
+        alt_ids: Dict[str, str] = {}
+        edges: List[Tuple[str, str]] = []
+
+        follow_part_of = 'part_of' in self.relationships
+        follow_is_a = 'is_a' in self.relationships
+        extra_relationships = {r for r in self.relationships if r not in ('is_a', 'part_of')}
+
+        def flush(term: Dict):
+            if not term or term.get('obsolete') or 'id' not in term:
+                return
+            term_ids.append(term['id'])
+            names.append(term.get('name', ''))
+            ns = term.get('namespace', '')
+            namespaces.append(NAMESPACES.index(ns) if ns in NAMESPACES else -1)
+            for parent in term.get('parents', []):
+                edges.append((term['id'], parent))
+            for alt in term.get('alt_ids', []):
+                alt_ids[alt] = term['id']
+
+        current: Optional[Dict] = None
+        with open(self.obo_path, 'r', encoding='utf-8') as f:
+            for raw in f:
+                line = raw.strip()
+                if not line or line.startswith('!'):
+                    continue
+                if line.startswith('['):
+                    if current is not None:
+                        flush(current)
+                    current = {} if line == '[Term]' else None
+                    continue
+                if current is None:
+                    continue
+
+                tag, _, value = line.partition(': ')
+                value = value.split(' ! ', 1)[0].strip()
+                if tag == 'id':
+                    current['id'] = value
+                elif tag == 'name':
+                    current['name'] = value
+                elif tag == 'namespace':
+                    current['namespace'] = value
+                elif tag == 'alt_id':
+                    current.setdefault('alt_ids', []).append(value)
+                elif tag == 'is_obsolete' and value == 'true':
+                    current['obsolete'] = True
+                elif tag == 'is_a' and follow_is_a:
+                    current.setdefault('parents', []).append(value.split()[0])
+                elif tag == 'relationship':
+                    parts = value.split()
+                    if len(parts) >= 2 and (
+                            (parts[0] == 'part_of' and follow_part_of) or parts[0] in extra_relationships):
+                        current.setdefault('parents', []).append(parts[1])
+            if current is not None:
+                flush(current)
+
+        if not term_ids:
+            raise ValueError(f"No se encontraron términos GO en {self.obo_path}")
+
+        self.term_ids = np.array(term_ids, dtype=object)
+        self.names = np.array(names, dtype=object)
+        self.namespace = np.array(namespaces, dtype=np.int8)
+        self.index = pd.Index(term_ids)
+        self.alt_ids = alt_ids
+        n_terms = len(term_ids)
+
+        # Aristas hijo -> padre como arreglos enteros (se descartan padres obsoletos)
+        if edges:
+            child_ids, parent_ids = zip(*edges)
+            child = self.index.get_indexer(child_ids)
+            parent = self.index.get_indexer(parent_ids)
+            valid = (child >= 0) & (parent >= 0) & (child != parent)
+            child, parent = child[valid], parent[valid]
+        else:
+            child = parent = np.empty(0, dtype=np.int64)
+
+        parents = sparse.csr_matrix(
+            (np.ones(len(child), dtype=np.int8), (child, parent)), shape=(n_terms, n_terms))
+        parents.sum_duplicates()
+        parents.data[:] = 1
+        self.parent_matrix = parents
+        self.parent_indptr = parents.indptr.astype(np.int32)
+        self.parent_indices = parents.indices.astype(np.int32)
+
+        logger.info(f"🧬 DAG GO cargado: {n_terms} términos, {parents.nnz} relaciones")
+
+    def _compute_levels(self):
+        """
+        Calcular orden topológico (camino más largo desde la raíz) y
+        profundidad mínima, procesando frentes completos de forma vectorizada.
+        """
+        n_terms = len(self.term_ids)
+        parents = self.parent_matrix
+        children = parents.T.tocsr()
+
+        pending = np.diff(parents.indptr).astype(np.int32)
+        topo_level = np.full(n_terms, -1, dtype=np.int32)
+        depth = np.zeros(n_terms, dtype=np.int32)
+
+        frontier = np.flatnonzero(pending == 0)
+        level = 0
+        while frontier.size:
+            topo_level[frontier] = level
+            if level > 0:
+                # Profundidad mínima = 1 + mínimo de la profundidad de los padres
+                sub = parents[frontier]
+                parent_depth = depth[sub.indices]
+                starts = sub.indptr[:-1]
+                depth[frontier] = np.minimum.reduceat(parent_depth, starts) + 1
+
+            sub_children = children[frontier]
+            np.subtract.at(pending, sub_children.indices, 1)
+            candidates = np.unique(sub_children.indices)
+            frontier = candidates[pending[candidates] == 0]
+            level += 1
+
+        if (topo_level < 0).any():
+            raise ValueError("El archivo OBO contiene ciclos en las relaciones seleccionadas")
+
+        self.topo_level = topo_level
+        self.depth = depth
+        self.topo_order = np.argsort(topo_level, kind='stable').astype(np.int32)
+
+    # ========== MATRIZ DE ANCESTROS ==========
+
+    def _cache_path(self) -> Path:
+        """Ruta del .npz cacheado para este OBO y conjunto de relaciones."""
+        stat = self.obo_path.stat()
+        key = f"{stat.st_size}:{stat.st_mtime_ns}:{','.join(self.relationships)}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        return self.cache_dir / f"{self.obo_path.stem}.ancestors.{digest}.npz"
+
+    @property
+    def ancestors(self) -> sparse.csr_matrix:
+        """
+        Matriz 0/1 término x ancestro (incluye el propio término).
+
+        Se calcula una sola vez por niveles topológicos: las filas de un nivel
+        son I + P[nivel] @ A[niveles previos], y se cachea en disco.
+        """
+        if self._ancestors is not None:
+            return self._ancestors
+
+        cache_path = self._cache_path()
+        if cache_path.exists():
+            try:
+                matrix = sparse.load_npz(cache_path).tocsr()
+                if matrix.shape == (len(self.term_ids),) * 2:
+                    self._ancestors = matrix
+                    return matrix
+            except Exception as e:
+                logger.warning(f"Caché de ancestros inválida ({cache_path.name}): {e}")
+
+        self._ancestors = self._build_ancestors()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            sparse.save_npz(cache_path, self._ancestors, compressed=False)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar la caché de ancestros: {e}")
+        return self._ancestors
+
+    def _build_ancestors(self) -> sparse.csr_matrix:
+        """Propagación vectorizada por niveles topológicos."""
+        n_terms = len(self.term_ids)
+        order = self.topo_order
+        rank = np.empty(n_terms, dtype=np.int64)
+        rank[order] = np.arange(n_terms)
+
+        # Matriz de padres en coordenadas permutadas (orden topológico)
+        permuted = self.parent_matrix[order][:, order].tocsr()
+        bounds = np.searchsorted(self.topo_level[order], np.arange(self.topo_level.max() + 2))
+
+        blocks: List[sparse.csr_matrix] = []
+        computed = sparse.csr_matrix((0, n_terms), dtype=np.int32)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end <= start:
+                continue
+            identity = sparse.csr_matrix(
+                (np.ones(end - start, dtype=np.int32), (np.arange(end - start), np.arange(start, end))),
+                shape=(end - start, n_terms))
+            block = identity
+            if start > 0:
+                block = block + permuted[start:end, :start] @ computed
+            block.data[:] = 1
+            blocks.append(block.tocsr())
+            computed = sparse.vstack(blocks, format='csr')
+
+        # Volver a coordenadas originales
+        ancestors = computed[rank][:, rank].tocsr()
+        ancestors.sort_indices()
+        logger.info(f"🌳 Matriz de ancestros construida: {ancestors.nnz} entradas")
+        return ancestors
+
+    # ========== CONTEOS PROPAGADOS ==========
+
+    def term_indices(self, term_ids: Iterable[str]) -> np.ndarray:
+        """
+        Convertir identificadores GO a índices enteros (-1 si no existen).
+        Los alt_id se resuelven al término principal.
+        """
+        ids = pd.Index(term_ids).astype(str).str.strip()
+        indices = self.index.get_indexer(ids)
+        missing = indices < 0
+        if missing.any() and self.alt_ids:
+            resolved = pd.Index(ids[missing]).map(lambda t: self.alt_ids.get(t, t))
+            indices[missing] = self.index.get_indexer(resolved)
+        return indices
+
+    def propagated_counts(self, rows: np.ndarray, term_codes: np.ndarray,
+                          term_ids: Sequence[str]) -> np.ndarray:
+        """
+        Contar proteínas por término incluyendo descendientes.
+
+        Args:
+            rows: Índice de proteína por anotación (arreglo explotado)
+            term_codes: Código de término por anotación (índice en term_ids)
+            term_ids: Identificadores GO de cada código
+
+        Returns:
+            Arreglo (n_terms,) con el número de proteínas bajo cada término
+        """
+        lookup = self.term_indices(term_ids)
+        dag_idx = lookup[term_codes]
+        valid = dag_idx >= 0
+        if not valid.any():
+            return np.zeros(len(self.term_ids), dtype=np.int64)
+
+        row_codes = pd.factorize(rows[valid])[0]
+        n_rows = int(row_codes.max()) + 1
+        # int32 para que la suma de caminos no desborde (y descarte) entradas
+        incidence = sparse.csr_matrix(
+            (np.ones(valid.sum(), dtype=np.int32), (row_codes, dag_idx[valid])),
+            shape=(n_rows, len(self.term_ids)))
+        incidence.sum_duplicates()
+        incidence.data[:] = 1
+
+        propagated = (incidence @ self.ancestors).tocsr()
+        return np.bincount(propagated.indices, minlength=len(self.term_ids))
+
+    def slim_summary(self, counts: np.ndarray, level: int = 2,
+                     namespace: Optional[str] = None,
+                     slim_terms: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Resumir conteos propagados en un nivel slim.
+
+        Args:
+            counts: Conteos propagados (salida de propagated_counts)
+            level: Profundidad mínima desde la raíz de los términos slim
+            namespace: Restringir a un namespace (ej: 'biological_process')
+            slim_terms: Lista explícita de términos slim (ignora level)
+
+        Returns:
+            DataFrame con GO_term, Name, Namespace, Level y Count ordenado
+        """
+        if slim_terms is not None:
+            selected = self.term_indices(slim_terms)
+            selected = selected[selected >= 0]
+        else:
+            selected = np.flatnonzero(self.depth == level)
+
+        if namespace is not None:
+            ns_code = NAMESPACES.index(namespace)
+            selected = selected[self.namespace[selected] == ns_code]
+
+        selected = selected[counts[selected] > 0]
+        summary = pd.DataFrame({
+            'GO_term': self.term_ids[selected],
+            'Name': self.names[selected],
+            'Namespace': [NAMESPACES[c] if c >= 0 else '' for c in self.namespace[selected]],
+            'Level': self.depth[selected],
+            'Count': counts[selected]
+        })
+        return summary.sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Visualizador Especializado para Resultados de HMMER (domtblout)
+===============================================================
+
+Visualizador para tablas por dominio de hmmscan/hmmsearch (--domtblout):
+- Frecuencia de dominios
+- Distribución de E-values por dominio
+- Resumen de puntuaciones por dominio
+- Arquitecturas de dominios por secuencia (solapamientos resueltos por i-Evalue)
+
+El lector divide cada línea por espacios sólo en los primeros 22 campos
+(la columna Description es texto libre y puede contener espacios), recorre
+el archivo por bloques (en paralelo con parallel_tsv si es grande) y
+convierte cada columna a un arreglo tipado.
+"""
+
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.ticker import FormatStrFormatter
+
+from .base_visualizer import BaseVisualizer
+from .compressed_io import open_input
+from .domain_architecture import Architectures, extract_architectures
+from .parallel_tsv import concat_frames, iter_parsed_blocks
+from .streaming_stats import describe_columns
+from .top_n import top_n_rows
+
+# Columnas de --domtblout: 22 campos fijos + descripción libre
+DOMTBLOUT_COLUMNS = [
+    "Target Name", "Accession", "tlen", "Query Name", "Query Accession",
+    "qlen", "E-value", "Score", "Bias", "Domain No", "of", "c-Evalue",
+    "i-Evalue", "Domain Score", "Domain Bias", "Hmm From", "Hmm To",
+    "Ali From", "Ali To", "Env From", "Env To", "Acc", "Description"
+]
+DOMTBLOUT_FIXED_FIELDS = 22
+
+DOMTBLOUT_DTYPES = {
+    "Target Name": 'category',
+    "Accession": 'category',
+    "tlen": np.int32,
+    "Query Name": 'category',
+    "Query Accession": 'category',
+    "qlen": np.int32,
+    "E-value": np.float64,
+    "Score": np.float32,
+    "Bias": np.float32,
+    "Domain No": np.int32,
+    "of": np.int32,
+    "c-Evalue": np.float64,
+    "i-Evalue": np.float64,
+    "Domain Score": np.float32,
+    "Domain Bias": np.float32,
+    "Hmm From": np.int32,
+    "Hmm To": np.int32,
+    "Ali From": np.int32,
+    "Ali To": np.int32,
+    "Env From": np.int32,
+    "Env To": np.int32,
+    "Acc": np.float32,
+    "Description": 'category',
+}
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Columnas numéricas resumidas en las estadísticas (momentos y cuantiles)
+HMMER_NUMERIC_COLUMNS = ["E-value", "Score", "i-Evalue", "Domain Score", "Acc"]
+
+
+def _empty_frame() -> pd.DataFrame:
+    """DataFrame vacío con las columnas y tipos de domtblout."""
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in DOMTBLOUT_DTYPES.items()})
+
+
+def _bytes_to_categorical(values) -> pd.Categorical:
+    """Factorizar valores en bytes y decodificar sólo las categorías únicas."""
+    codes, uniques = pd.factorize(np.array(values, dtype=object))
+    categories = np.array([u.decode('utf-8', errors='replace') for u in uniques], dtype=object)
+    if len(pd.unique(categories)) != len(categories):
+        # Bytes inválidos distintos pueden decodificar al mismo texto
+        return pd.Categorical(categories[codes])
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _tokenize_block(block: bytes) -> pd.DataFrame:
+    """
+    Convertir un bloque de líneas completas en un DataFrame tipado.
+
+    Sólo se separan por espacios los 22 campos fijos (maxsplit=22); el
+    resto de la línea queda intacto como Description. Las columnas de texto
+    se factorizan sobre bytes y sólo se decodifican los valores únicos.
+    """
+    rows = [line.split(None, DOMTBLOUT_FIXED_FIELDS)
+            for line in block.split(b'\n')
+            if line and not line.startswith(b'#')]
+    rows = [row for row in rows if len(row) >= DOMTBLOUT_FIXED_FIELDS]
+    if not rows:
+        return _empty_frame()
+
+    # Filas sin descripción: completar con '-' como hace HMMER
+    rows = [row if len(row) > DOMTBLOUT_FIXED_FIELDS else row + [b'-'] for row in rows]
+    # Matriz (filas x 23) de objetos bytes; cada columna se convierte por separado
+    table = np.array(list(chain.from_iterable(rows)), dtype=object).reshape(len(rows), -1)
+
+    data = {}
+    for i, name in enumerate(DOMTBLOUT_COLUMNS):
+        dtype = DOMTBLOUT_DTYPES[name]
+        values = table[:, i]
+        if dtype == 'category':
+            if name == "Description":
+                values = [value.rstrip() for value in values]
+            data[name] = _bytes_to_categorical(values)
+        else:
+            data[name] = values.astype('S').astype(dtype)
+
+    return pd.DataFrame(data)
+
+
+def iter_domtblout(file_path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[pd.DataFrame]:
+    """
+    Leer un domtblout por bloques alineados a salto de línea.
+
+    Los archivos grandes se tokenizan en paralelo (ver iter_parsed_blocks).
+
+    Args:
+        file_path: Ruta al archivo --domtblout
+        chunk_bytes: Tamaño aproximado de cada bloque
+
+    Yields:
+        DataFrames tipados con las columnas DOMTBLOUT_COLUMNS
+    """
+    for chunk in iter_parsed_blocks(file_path, _tokenize_block, chunk_bytes):
+        if not chunk.empty:
+            yield chunk
+
+
+def read_domtblout(file_path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> pd.DataFrame:
+    """
+    Leer un archivo --domtblout completo en un DataFrame tipado.
+
+    Los nombres de dominio/secuencia y las accesiones se devuelven como
+    columnas categóricas.
+
+    Args:
+        file_path: Ruta al archivo --domtblout
+        chunk_bytes: Tamaño aproximado de cada bloque leído
+
+    Returns:
+        DataFrame con las 23 columnas de DOMTBLOUT_COLUMNS
+    """
+    chunks = list(iter_domtblout(file_path, chunk_bytes))
+    if not chunks:
+        return _empty_frame()
+    return concat_frames(chunks)
+
+
+SUMMARY_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _segment_quantiles(values: np.ndarray, starts: np.ndarray, counts: np.ndarray,
+                       q: float) -> np.ndarray:
+    """Cuantil (interpolación lineal) de cada segmento de un arreglo ordenado."""
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    return values[starts + lower] + fraction * (values[starts + upper] - values[starts + lower])
+
+
+def domain_summary(data: pd.DataFrame, domain_col: str = 'Query Name') -> pd.DataFrame:
+    """
+    Tabla resumen por dominio calculada en una sola pasada sobre los códigos
+    categóricos: conteo, puntuación media/mediana, E-value mínimo/medio/
+    mediano y cuantiles de log10(E-value) con bigotes de Tukey (1.5 IQR).
+
+    Args:
+        data: DataFrame de domtblout
+        domain_col: Columna categórica con el nombre del dominio
+
+    Returns:
+        DataFrame indexado por dominio (sin ordenar; ver top_n_rows)
+    """
+    domains = data[domain_col].astype('category')
+    codes = domains.cat.codes.to_numpy()
+    valid = codes >= 0
+    codes = codes[valid]
+    n_groups = len(domains.cat.categories)
+
+    score = data['Score'].to_numpy(dtype=np.float64)[valid]
+    evalue = data['E-value'].to_numpy(dtype=np.float64)[valid]
+    log_evalue = np.log10(np.clip(evalue, 1e-300, None))
+
+    counts = np.bincount(codes, minlength=n_groups)
+    present = counts > 0
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        summary = {
+            'Count': counts,
+            'Score_mean': np.bincount(codes, weights=score, minlength=n_groups) / counts,
+            'Evalue_mean': np.bincount(codes, weights=evalue, minlength=n_groups) / counts,
+        }
+
+    # Un único ordenamiento por (dominio, valor) para cada columna
+    score_sorted = score[np.lexsort((score, codes))]
+    log_sorted = log_evalue[np.lexsort((log_evalue, codes))]
+    s, c = starts[present], counts[present]
+
+    def per_group(values):
+        full = np.full(n_groups, np.nan)
+        full[present] = values
+        return full
+
+    summary['Score_median'] = per_group(_segment_quantiles(score_sorted, s, c, 0.5))
+    summary['Evalue_min'] = per_group(10.0 ** log_sorted[s])
+    for q in SUMMARY_QUANTILES:
+        summary[f'log10_Evalue_q{int(q * 100):02d}'] = per_group(_segment_quantiles(log_sorted, s, c, q))
+    summary['Evalue_median'] = 10.0 ** summary['log10_Evalue_q50']
+
+    # Bigotes de Tukey: valores extremos dentro de [q1 - 1.5 IQR, q3 + 1.5 IQR]
+    q1, q3 = summary['log10_Evalue_q25'][present], summary['log10_Evalue_q75'][present]
+    iqr = q3 - q1
+    offset = log_sorted.min(initial=0.0)
+    span = (log_sorted.max(initial=0.0) - offset) + 1.0
+    group_ids = np.repeat(np.arange(len(s)), c)
+    keys = group_ids * span + (log_sorted - offset)
+    low_idx = np.searchsorted(keys, np.arange(len(s)) * span + (q1 - 1.5 * iqr - offset), side='left')
+    high_idx = np.searchsorted(keys, np.arange(len(s)) * span + (q3 + 1.5 * iqr - offset), side='right') - 1
+    summary['log10_Evalue_whislo'] = per_group(log_sorted[np.clip(low_idx, s, s + c - 1)])
+    summary['log10_Evalue_whishi'] = per_group(log_sorted[np.clip(high_idx, s, s + c - 1)])
+
+    table = pd.DataFrame(summary, index=pd.Index(domains.cat.categories.astype(str), name='Domain'))
+    return table[present]
+
+
+class HMMERVisualizer(BaseVisualizer):
+    """Visualizador especializado para tablas de dominios de HMMER."""
+
+    def __init__(self, output_dir: Path, config: Dict = None):
+        super().__init__(output_dir, config)
+        self.name = "HMMER Protein Domain Analysis"
+        self.top_n = int(self.config.get('top_n', 20))
+        self.max_ievalue = float(self.config.get('max_ievalue', 1e-3))
+        self._summary = None
+        self._architectures = None
+
+    def get_supported_extensions(self) -> List[str]:
+        """Extensiones soportadas para archivos HMMER."""
+        return ['.txt', '.out', '.analyze.txt', '.domtblout']
+
+    def validate_file(self, file_path: Path) -> bool:
+        """Validar que la primera línea de datos tenga el formato domtblout."""
+        try:
+            with open_input(file_path, 'rb') as f:
+                for line in f:
+                    if not line.strip() or line.startswith(b'#'):
+                        continue
+                    fields = line.split(None, DOMTBLOUT_FIXED_FIELDS)
+                    if len(fields) < DOMTBLOUT_FIXED_FIELDS:
+                        print(f"❌ Formato no válido - Se esperaban al menos {DOMTBLOUT_FIXED_FIELDS} columnas")
+                        return False
+                    # tlen, qlen, E-value y coordenadas deben ser numéricos
+                    for idx in (2, 5, 6, 7, 19, 20):
+                        float(fields[idx])
+                    print("✅ Archivo domtblout válido")
+                    return True
+
+            print("❌ Archivo vacío o sin datos válidos")
+            return False
+
+        except (ValueError, IndexError):
+            print("❌ Formato no válido - Columnas numéricas de domtblout no reconocidas")
+            return False
+        except Exception as e:
+            print(f"❌ Error validando archivo: {e}")
+            return False
+
+    def parse_file(self, file_path: Path) -> pd.DataFrame:
+        """Parsear archivo --domtblout."""
+        try:
+            df = read_domtblout(file_path)
+            print(f"✅ Parseados {len(df)} hits de dominio")
+            return df
+        except Exception as e:
+            raise ValueError(f"Error parseando archivo HMMER: {str(e)}")
+
+    def generate_visualizations(self, data: pd.DataFrame) -> List[str]:
+        """Generar todas las visualizaciones HMMER."""
+        graphs = []
+
+        try:
+            graphs.append(self._plot_domain_frequency(data))
+        except Exception as e:
+            print(f"Error creando gráfico de frecuencia: {e}")
+
+        try:
+            graphs.append(self._plot_evalue_distribution(data))
+        except Exception as e:
+            print(f"Error creando distribución de E-values: {e}")
+
+        try:
+            graphs.append(self._plot_score_heatmap(data))
+        except Exception as e:
+            print(f"Error creando resumen de dominios: {e}")
+
+        try:
+            graphs.extend(self._plot_architectures(data))
+        except Exception as e:
+            print(f"Error creando arquitecturas de dominios: {e}")
+
+        return [g for g in graphs if g]
+
+    def generate_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Generar estadísticas de dominios HMMER (servidas desde la tabla resumen)."""
+        summary = self.get_domain_summary(data)
+        evalue_min = summary['Evalue_min'].min() if len(summary) else np.nan
+        # Resumen exacto de las columnas numéricas (los datos ya están en memoria)
+        columns = describe_columns(data, HMMER_NUMERIC_COLUMNS)
+        stats = {
+            'total_hits': len(data),
+            'unique_domains': len(summary),
+            'unique_targets': int(data['Target Name'].nunique()),
+            'mean_score': float((summary['Score_mean'] * summary['Count']).sum() / max(len(data), 1)),
+            'median_evalue': columns['E-value']['q50'],
+            'min_evalue': float(evalue_min),
+            'significant_hits': int((data['i-Evalue'] <= 1e-5).sum())
+        }
+
+        architectures = self.get_architectures(data)
+        stats.update({
+            'resolved_domains': len(architectures.hits),
+            'proteins_with_domains': len(architectures.per_target),
+            'unique_architectures': len(architectures.frequencies),
+            'top_architectures': architectures.frequencies.head(self.top_n).to_dict(orient='records')
+        })
+
+        # Tabla resumen completa como JSON junto a los gráficos
+        summary_path = self.output_dir / 'domain_summary.json'
+        summary.reset_index().to_json(summary_path, orient='records', indent=2)
+        stats['domain_summary_file'] = str(summary_path)
+        stats['columns'] = columns
+        stats['top_domains'] = self.get_top_domains(data).reset_index()[
+            ['Domain', 'Count', 'Score_mean', 'Score_median', 'Evalue_min', 'Evalue_median']
+        ].to_dict(orient='records')
+        return stats
+
+    def get_domain_summary(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Tabla resumen por dominio, calculada una vez por DataFrame."""
+        if self._summary is None or self._summary[0] is not data:
+            self._summary = (data, domain_summary(data))
+        return self._summary[1]
+
+    def get_top_domains(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Los top N dominios más frecuentes de la tabla resumen (selección parcial)."""
+        return top_n_rows(self.get_domain_summary(data), 'Count', self.top_n)
+
+    def get_architectures(self, data: pd.DataFrame) -> Architectures:
+        """Arquitecturas de dominios, calculadas una vez por DataFrame."""
+        if self._architectures is None or self._architectures[0] is not data:
+            self._architectures = (data, extract_architectures(data, max_ievalue=self.max_ievalue))
+        return self._architectures[1]
+
+    # ========== GRÁFICOS ==========
+
+    def _plot_domain_frequency(self, data: pd.DataFrame) -> str:
+        """Frecuencia de dominios (top N + 'Otros')."""
+        top_n = self.top_n
+        domain_counts = self.get_domain_summary(data)['Count']
+        top_domains = self.get_top_domains(data)['Count']
+        if len(domain_counts) > top_n:
+            top_domains = pd.concat([top_domains, pd.Series({'Otros': domain_counts.sum() - top_domains.sum()})])
+
+        plt.figure(figsize=(12, max(8, top_n * 0.3)))
+        plt.barh(y=range(len(top_domains)), width=top_domains.values,
+                 color=sns.color_palette("husl", len(top_domains)))
+        plt.yticks(range(len(top_domains)), top_domains.index)
+        plt.xlabel('Frecuencia')
+        plt.title(f'Frecuencia de Dominios (Top {top_n})', fontsize=16, fontweight='bold')
+        for i, v in enumerate(top_domains.values):
+            plt.text(v, i, f' {v:,}', va='center')
+        plt.tight_layout()
+
+        return self.save_figure('domain_frequency')
+
+    def _plot_evalue_distribution(self, data: pd.DataFrame) -> str:
+        """Boxplot de E-values de los dominios más frecuentes desde cuantiles precalculados."""
+        top = self.get_top_domains(data)
+        top = top.sort_values('log10_Evalue_q50', kind='stable')
+
+        box_stats = [{
+            'label': domain,
+            'med': 10.0 ** row['log10_Evalue_q50'],
+            'q1': 10.0 ** row['log10_Evalue_q25'],
+            'q3': 10.0 ** row['log10_Evalue_q75'],
+            'whislo': 10.0 ** row['log10_Evalue_whislo'],
+            'whishi': 10.0 ** row['log10_Evalue_whishi'],
+        } for domain, row in top.iterrows()]
+
+        fig, ax = plt.subplots(figsize=(12, 8))
+        ax.bxp(box_stats, vert=False, showfliers=False, patch_artist=True,
+               boxprops={'facecolor': '#9ecae1'}, medianprops={'color': 'black'})
+        ax.invert_yaxis()
+        ax.set_xscale('log')
+        ax.set_xlabel('E-value (escala logarítmica)')
+        ax.set_ylabel('Dominio')
+        ax.set_title('Distribución de E-values por Dominio', fontsize=16, fontweight='bold')
+        ax.xaxis.set_major_formatter(FormatStrFormatter('%.0e'))
+        plt.tight_layout()
+
+        return self.save_figure('evalue_distribution', fig)
+
+    def _plot_score_heatmap(self, data: pd.DataFrame) -> str:
+        """Heatmap con puntuación media, -log10(E-value medio) y frecuencia."""
+        top = self.get_top_domains(data)
+
+        heatmap_data = pd.DataFrame({
+            'Puntuación Media': top['Score_mean'].values,
+            'E-value Medio': -np.log10(top['Evalue_mean'].clip(lower=1e-300)).values,
+            'Frecuencia': top['Count'].values
+        }, index=top.index)
+
+        plt.figure(figsize=(12, 8))
+        sns.heatmap(heatmap_data, annot=True, fmt='.2f', cmap='YlOrRd',
+                    center=0, cbar_kws={'label': 'Valor'})
+        plt.title(f'Resumen de Dominios (Top {self.top_n})', fontsize=16, fontweight='bold')
+        plt.ylabel('Dominio')
+        plt.tight_layout()
+
+        return self.save_figure('domain_summary_heatmap')
+
+    def _plot_architectures(self, data: pd.DataFrame) -> List[str]:
+        """Frecuencia de arquitecturas y número de dominios por proteína."""
+        architectures = self.get_architectures(data)
+        if architectures.per_target.empty:
+            return [self.create_basic_plot("Arquitecturas de Dominios",
+                                           f"Sin hits con i-Evalue <= {self.max_ievalue:g}", "lightyellow")]
+
+        # Tabla completa de arquitecturas por secuencia para descarga
+        architectures.per_target.to_csv(self.output_dir / 'domain_architectures.tsv', sep='\t', index=False)
+
+        top = architectures.frequencies.head(self.top_n)
+        labels = [label if len(label) <= 60 else label[:57] + '...' for label in top['Architecture']]
+
+        fig, axes = plt.subplots(1, 2, figsize=(18, max(8, len(top) * 0.35)),
+                                 gridspec_kw={'width_ratios': [3, 1]})
+        axes[0].barh(range(len(top)), top['Count'].values,
+                     color=sns.color_palette("viridis", len(top)))
+        axes[0].set_yticks(range(len(top)))
+        axes[0].set_yticklabels(labels)
+        axes[0].invert_yaxis()
+        axes[0].set_xlabel('Número de Proteínas')
+        axes[0].set_title(f'Arquitecturas Más Frecuentes (Top {self.top_n})')
+
+        domains_per_protein = np.bincount(architectures.per_target['Domains'].to_numpy())
+        axes[1].bar(np.arange(1, len(domains_per_protein)), domains_per_protein[1:],
+                    color='skyblue', edgecolor='black')
+        axes[1].set_xlabel('Dominios por Proteína')
+        axes[1].set_ylabel('Número de Proteínas')
+        axes[1].set_title('Dominios por Proteína')
+
+        plt.suptitle('🧩 Arquitecturas de Dominios', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+
+        return [self.save_figure('domain_architectures')]
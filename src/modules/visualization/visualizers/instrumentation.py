@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Instrumentación por Etapas de los Visualizadores
+================================================
+
+BaseVisualizer.process_file registra cada etapa (validate, parse, cada
+gráfico, stats, summary) con un StageRecorder:
+
+- wall_seconds: tiempo real (time.perf_counter)
+- cpu_seconds: tiempo de CPU del proceso (time.process_time), incluye
+  los hilos de descompresión y de BLAS
+- rss_bytes: memoria residente al terminar la etapa (/proc/self/statm)
+- peak_rss_bytes: pico de memoria residente del proceso hasta ese momento
+  (getrusage; es monótono, así que la etapa que lo eleva es la que importa)
+- peak_traced_bytes: pico de memoria de Python durante la etapa con
+  tracemalloc, sólo si VISUALIZATION_TRACEMALLOC=1 (tiene coste apreciable)
+
+El resumen se devuelve bajo la clave 'timings' de la respuesta y se exporta
+a Prometheus (paquete opcional prometheus_client) para /metrics. Con
+gunicorn las métricas de todos los workers se agregan en modo multiproceso
+(PROMETHEUS_MULTIPROC_DIR, ver gunicorn.conf.py).
+"""
+
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+# ru_maxrss está en KiB en Linux y en bytes en macOS
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def current_rss() -> Optional[int]:
+    """Memoria residente actual en bytes (None fuera de Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Pico de memoria residente del proceso en bytes."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+
+
+def tracemalloc_enabled() -> bool:
+    return os.environ.get('VISUALIZATION_TRACEMALLOC', '').lower() in ('1', 'true', 'yes')
+
+
+class StageTiming(NamedTuple):
+    """Medidas de una etapa."""
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    rss_bytes: Optional[int]
+    peak_rss_bytes: Optional[int]
+    peak_traced_bytes: Optional[int]
+
+    def summary(self) -> Dict:
+        return {
+            'stage': self.stage,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'rss_bytes': self.rss_bytes,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_traced_bytes': self.peak_traced_bytes
+        }
+
+
+class _Span:
+    __slots__ = ('wall', 'cpu', 'traced_peak')
+
+    def __init__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.traced_peak = 0
+
+
+class StageRecorder:
+    """
+    Registro de etapas de un procesamiento.
+
+    stage() mide un bloque (admite anidamiento, p. ej. 'linkage' dentro de
+    un gráfico); lap() mide desde la vuelta anterior, lo que permite
+    registrar cada gráfico desde save_figure sin tocar los visualizadores.
+    """
+
+    def __init__(self, trace_memory: Optional[bool] = None):
+        self.trace_memory = tracemalloc_enabled() if trace_memory is None else trace_memory
+        self.timings: List[StageTiming] = []
+        self._owns_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self._start = _Span()
+        self._open: List[_Span] = []
+        self._lap = _Span()
+
+    def _fold_traced_peak(self) -> None:
+        """Repartir el pico actual entre las etapas abiertas y reiniciarlo."""
+        if not self.trace_memory:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for span in (*self._open, self._lap):
+            span.traced_peak = max(span.traced_peak, peak)
+        tracemalloc.reset_peak()
+
+    def _record(self, name: str, span: _Span) -> StageTiming:
+        timing = StageTiming(
+            stage=name,
+            wall_seconds=time.perf_counter() - span.wall,
+            cpu_seconds=time.process_time() - span.cpu,
+            rss_bytes=current_rss(),
+            peak_rss_bytes=peak_rss(),
+            peak_traced_bytes=span.traced_peak if self.trace_memory else None
+        )
+        self.timings.append(timing)
+        return timing
+
+    @contextmanager
+    def stage(self, name: str):
+        """Medir el bloque como la etapa `name`."""
+        self._fold_traced_peak()
+        span = _Span()
+        self._open.append(span)
+        try:
+            yield
+        finally:
+            self._fold_traced_peak()
+            self._open.remove(span)
+            self._record(name, span)
+
+    def mark(self) -> None:
+        """Iniciar una vuelta nueva (descarta el tiempo desde la anterior)."""
+        self._fold_traced_peak()
+        self._lap = _Span()
+
+    def lap(self, name: str) -> StageTiming:
+        """Registrar como `name` el tiempo desde la vuelta anterior."""
+        self._fold_traced_peak()
+        timing = self._record(name, self._lap)
+        self._lap = _Span()
+        return timing
+
+    def elapsed(self) -> float:
+        """Segundos desde la creación del registro."""
+        return time.perf_counter() - self._start.wall
+
+    def finish(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def summary(self) -> Dict:
+        return {
+            'total_wall_seconds': round(self.elapsed(), 4),
+            'total_cpu_seconds': round(time.process_time() - self._start.cpu, 4),
+            'peak_rss_bytes': peak_rss(),
+            'tracemalloc': self.trace_memory,
+            'stages': [timing.summary() for timing in self.timings]
+        }
+
+
+# ========== MÉTRICAS PROMETHEUS ==========
+
+_metrics = None
+
+
+def _get_metrics():
+    """Crear las métricas la primera vez (None si prometheus_client no está instalado)."""
+    global _metrics
+    if _metrics is None:
+        try:
+            from prometheus_client import Counter, Gauge, Histogram
+        except ImportError:
+            _metrics = False
+            return None
+        _metrics = {
+            'wall': Histogram('visualization_stage_wall_seconds', 'Tiempo real por etapa',
+                              ['visualizer', 'stage'], buckets=STAGE_BUCKETS),
+            'cpu': Histogram('visualization_stage_cpu_seconds', 'Tiempo de CPU por etapa',
+                             ['visualizer', 'stage'], buckets=STAGE_BUCKETS),
+            'rss': Gauge('visualization_stage_peak_rss_bytes', 'Pico de RSS observado al terminar la etapa',
+                         ['visualizer', 'stage'], multiprocess_mode='max'),
+            'files': Counter('visualization_files_processed', 'Archivos procesados',
+                             ['visualizer', 'status']),
+            'total': Histogram('visualization_process_seconds', 'Tiempo total de process_file',
+                               ['visualizer'], buckets=STAGE_BUCKETS)
+        }
+    return _metrics or None
+
+
+def observe(visualizer: str, recorder: StageRecorder, status: str) -> None:
+    """Exportar un procesamiento a las métricas Prometheus (no-op sin prometheus_client)."""
+    metrics = _get_metrics()
+    if metrics is None:
+        return
+    try:
+        for timing in recorder.timings:
+            metrics['wall'].labels(visualizer, timing.stage).observe(timing.wall_seconds)
+            metrics['cpu'].labels(visualizer, timing.stage).observe(timing.cpu_seconds)
+            if timing.peak_rss_bytes is not None:
+                # ru_maxrss es monótono: el último valor ya es el máximo del worker
+                metrics['rss'].labels(visualizer, timing.stage).set(timing.peak_rss_bytes)
+        metrics['files'].labels(visualizer, status).inc()
+        metrics['total'].labels(visualizer).observe(recorder.elapsed())
+    except Exception as e:
+        logger.warning(f"No se pudieron exportar métricas: {e}")
+
+
+def render_metrics() -> Optional[Tuple[bytes, str]]:
+    """
+    Exposición de texto Prometheus de todas las métricas.
+
+    Returns:
+        (cuerpo, content type) o None si prometheus_client no está instalado
+    """
+    try:
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+    except ImportError:
+        return None
+    _get_metrics()
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Lectura Paralela de Tablas por Bloques
+======================================
+
+Lector compartido por los visualizadores para archivos tabulares grandes:
+
+1. El archivo se divide en rangos de bytes alineados a salto de línea.
+2. Cada rango se parsea en un proceso del pool (el worker abre el archivo y
+   lee sólo su rango, sin copiar datos desde el proceso principal) y
+   devuelve un DataFrame con columnas tipadas.
+3. Los bloques se entregan en el orden del archivo y concat_frames() los
+   une (las columnas categóricas se combinan sin pasar por object).
+
+Los archivos comprimidos no admiten acceso aleatorio: se descomprimen en el
+proceso principal (ver compressed_io) y los bloques se envían al pool. Los
+archivos pequeños se parsean en el mismo proceso, sin crear el pool.
+
+La función de parseo de bloque debe ser de nivel de módulo (o un
+functools.partial de una) para poder enviarse a los workers.
+"""
+
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .compressed_io import file_compression, iter_line_blocks
+
+DEFAULT_BLOCK_BYTES = 32 * 1024 * 1024
+# Por debajo de este tamaño en disco no compensa crear el pool
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+BlockParser = Callable[[bytes], pd.DataFrame]
+
+
+def default_workers() -> int:
+    """Procesos de parseo (VISUALIZATION_PARSE_WORKERS o núcleos disponibles)."""
+    configured = os.environ.get('VISUALIZATION_PARSE_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def byte_ranges(file_path: Path, block_bytes: int = DEFAULT_BLOCK_BYTES) -> List[Tuple[int, int]]:
+    """
+    Dividir un archivo plano en rangos [inicio, fin) alineados a salto de línea.
+
+    Args:
+        file_path: Ruta al archivo (sin comprimir)
+        block_bytes: Tamaño aproximado de cada rango
+
+    Returns:
+        Lista de rangos que cubren el archivo completo
+    """
+    size = Path(file_path).stat().st_size
+    ranges = []
+    with open(file_path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = start + block_bytes
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()
+                end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_range(parse_block: BlockParser, file_path: str, start: int, end: int) -> pd.DataFrame:
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return parse_block(f.read(end - start))
+
+
+def iter_parsed_blocks(file_path: Path, parse_block: BlockParser,
+                       block_bytes: int = DEFAULT_BLOCK_BYTES,
+                       workers: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parsear un archivo por bloques, en paralelo si es grande.
+
+    Args:
+        file_path: Ruta al archivo (plano, gzip, bgzip o zstd)
+        parse_block: Función bytes -> DataFrame aplicada a cada bloque
+        block_bytes: Tamaño aproximado de cada bloque
+        workers: Procesos de parseo (por defecto default_workers())
+
+    Yields:
+        DataFrames de cada bloque, en el orden del archivo
+    """
+    file_path = Path(file_path)
+    workers = workers or default_workers()
+    if workers <= 1 or file_path.stat().st_size < PARALLEL_MIN_BYTES:
+        for block in iter_line_blocks(file_path, block_bytes):
+            yield parse_block(block)
+        return
+
+    compressed = file_compression(file_path) is not None
+    with ProcessPoolExecutor(workers) as pool:
+        # Crear los workers antes de que la descompresión lance sus hilos
+        pool.submit(os.getpid).result()
+
+        if compressed:
+            tasks = ((parse_block, block) for block in iter_line_blocks(file_path, block_bytes))
+        else:
+            tasks = ((_parse_range, parse_block, str(file_path), start, end)
+                     for start, end in byte_ranges(file_path, block_bytes))
+
+        # Ventana acotada de bloques en vuelo: la memoria no depende del archivo
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(*task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenar bloques con las mismas columnas.
+
+    Las columnas categóricas se unen con union_categoricals (las categorías
+    de cada bloque pueden diferir) y el resto con np.concatenate.
+    """
+    frames = [frame for frame in frames if not frame.empty] or frames[:1]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    data = {}
+    for name, dtype in frames[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            data[name] = union_categoricals([frame[name] for frame in frames])
+        else:
+            data[name] = np.concatenate([frame[name].to_numpy() for frame in frames])
+    return pd.DataFrame(data)
+
+
+def read_blocks(file_path: Path, parse_block: BlockParser,
+                block_bytes: int = DEFAULT_BLOCK_BYTES,
+                workers: Optional[int] = None) -> pd.DataFrame:
+    """Parsear el archivo completo (ver iter_parsed_blocks) en un DataFrame."""
+    return concat_frames(list(iter_parsed_blocks(file_path, parse_block, block_bytes, workers)))
+
+
+def drop_comment_lines(block: bytes) -> bytes:
+    """Quitar las líneas que empiezan por '#' (encabezados y resúmenes)."""
+    if not block.startswith(b'#') and b'\n#' not in block:
+        return block
+    return b'\n'.join(line for line in block.split(b'\n') if not line.startswith(b'#'))
+
+
+def parse_tsv_block(block: bytes, names: List[str], dtype: Optional[Dict[str, Any]] = None,
+                    sep: str = '\t', usecols: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    Parsear un bloque de texto tabular sin encabezado con pandas.
+
+    Las líneas de comentario se descartan antes de parsear; las columnas
+    faltantes quedan como NaN.
+    """
+    block = drop_comment_lines(block)
+    if not block.strip():
+        empty = pd.DataFrame({name: pd.Series(dtype=object) for name in names})
+        return empty.astype(dtype or {})
+    return pd.read_csv(io.BytesIO(block), sep=sep, header=None, names=names,
+                       usecols=usecols, dtype=dtype, low_memory=False)
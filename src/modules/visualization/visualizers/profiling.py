@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Perfilado Bajo Demanda de Peticiones
+====================================
+
+Cuando un administrador lo pide (ver app.py), el procesamiento de un archivo
+se ejecuta con dos perfiladores a la vez y los resultados se guardan en el
+directorio oculto `.profile/` del trabajo (no se sirven por /graphs ni se
+incluyen en el paquete de descarga):
+
+- profile.pstats: cProfile determinista (abrir con `python -m pstats`,
+  snakeviz o gprof2dot)
+- profile.collapsed: pilas muestreadas cada SAMPLE_INTERVAL segundos en
+  formato "a;b;c N", listo para flamegraph.pl o speedscope
+- profile.txt: las funciones con más tiempo acumulado
+
+Sin perfilado no se importa ni se ejecuta nada de este módulo.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+PROFILE_DIRNAME = '.profile'
+PROFILE_FILES = ('profile.pstats', 'profile.collapsed', 'profile.txt')
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 40
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Muestreo periódico de la pila de un hilo (sys._current_frames)."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Contexto que perfila el bloque y guarda los resultados junto al trabajo.
+
+    Uso:
+        with RequestProfiler(output_dir) as profiler:
+            ...
+        profiler.summary('/jobs/<id>/profile')
+    """
+
+    def __init__(self, job_dir: Path, interval: float = SAMPLE_INTERVAL):
+        self.profile_dir = Path(job_dir) / PROFILE_DIRNAME
+        self.interval = interval
+        self._profile = cProfile.Profile()
+        self._sampler: Optional[StackSampler] = None
+
+    def __enter__(self) -> 'RequestProfiler':
+        self._sampler = StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._profile.disable()
+        self._sampler.stop()
+        self.save()
+        return False
+
+    def save(self) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(str(self.profile_dir / 'profile.pstats'))
+        (self.profile_dir / 'profile.collapsed').write_text(self._sampler.collapsed())
+
+        report = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+        (self.profile_dir / 'profile.txt').write_text(report.getvalue())
+
+    def summary(self, url_prefix: str) -> Dict:
+        """URLs de los archivos generados y número de muestras de pila."""
+        return {
+            'files': {name: f"{url_prefix}/{name}" for name in PROFILE_FILES},
+            'samples': sum(self._sampler.stacks.values()) if self._sampler else 0,
+            'sample_interval': self.interval
+        }
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Visualizador Especializado para Ortólogos Semilla (eggNOG-mapper)
+=================================================================
+
+Visualizador para archivos .emapper.seed_orthologs:
+- Distribución de e-values (bins logarítmicos fijos)
+- Bitscore vs. porcentaje de identidad como histograma 2D de densidad con
+  una muestra aleatoria (reservoir sampling) superpuesta
+- Bitscore de las secuencias con mejor puntuación
+- Mapa de calor de coberturas agregado en bins (qcov x scov)
+- Matriz de correlación
+
+Todos los gráficos dibujan un número acotado de elementos (bins, hexágonos o
+puntos muestreados), por lo que el tiempo de renderizado no crece con el
+número de proteínas del archivo. Todos se dibujan desde un resumen de una
+sola pasada (SeedSummary); los archivos grandes se leen por bloques sin
+cargarlos completos en memoria.
+"""
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import LogNorm
+
+from .base_visualizer import BaseVisualizer, logger
+from .compressed_io import file_compression, open_input
+from .instrumentation import StageRecorder
+from .parallel_tsv import iter_parsed_blocks, parse_tsv_block, read_blocks
+from .streaming_stats import DistinctSketch, FixedHistogram, FixedHistogram2D, StreamingStats
+from .top_n import top_n_rows
+
+SEED_NUMERIC_COLUMNS = ['evalue', 'bitscore', 'qstart', 'qend', 'sstart', 'send', 'pident', 'qcov', 'scov']
+SEED_CORRELATION_COLUMNS = ['evalue', 'bitscore', 'pident', 'qcov', 'scov']
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+
+class ReservoirSample:
+    """
+    Muestra aleatoria uniforme de tamaño fijo sobre un flujo de filas.
+
+    Implementa el algoritmo R de forma vectorizada: la fila i-ésima del flujo
+    (i >= size) reemplaza una posición aleatoria de la reserva con
+    probabilidad size / (i + 1). Admite alimentarse por bloques.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = 0):
+        self.size = int(size)
+        self.seen = 0
+        self.indices = np.empty(0, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, count: int) -> None:
+        """Procesar las siguientes `count` filas del flujo."""
+        positions = np.arange(self.seen, self.seen + count, dtype=np.int64)
+        free = max(0, min(count, self.size - len(self.indices)))
+        if free:
+            self.indices = np.concatenate([self.indices, positions[:free]])
+
+        rest = positions[free:]
+        if len(rest):
+            slots = (self._rng.random(len(rest)) * (rest + 1)).astype(np.int64)
+            accepted = slots < self.size
+            # Asignación en orden: un reemplazo posterior sobrescribe al anterior
+            self.indices[slots[accepted]] = rest[accepted]
+
+        self.seen += count
+
+    @classmethod
+    def from_lengths(cls, lengths: Iterable[int], size: int, seed: Optional[int] = 0) -> 'ReservoirSample':
+        """Construir la muestra a partir de los tamaños de bloque del flujo."""
+        sample = cls(size, seed)
+        for length in lengths:
+            sample.update(length)
+        return sample
+
+
+def _read_header(file_path: Path) -> List[str]:
+    """Columnas del encabezado '#qseqid'."""
+    with open_input(file_path, 'r') as f:
+        for line in f:
+            if line.startswith('##'):
+                continue
+            if line.startswith('#'):
+                header_line = line[1:].strip().split('\t')
+                break
+        else:
+            raise ValueError("No se encontró la línea de encabezado en el archivo")
+
+    missing = [col for col in SEED_NUMERIC_COLUMNS if col not in header_line]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(missing)}")
+    return header_line
+
+
+def _clean_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertir las columnas numéricas y descartar filas no numéricas."""
+    df[SEED_NUMERIC_COLUMNS] = df[SEED_NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    return df.dropna(subset=SEED_NUMERIC_COLUMNS)
+
+
+def _parse_seed_block(block: bytes, header_line: List[str]) -> pd.DataFrame:
+    """Parsear y limpiar un bloque de líneas (se ejecuta en los workers)."""
+    dtypes = {col: 'category' for col in ('qseqid', 'sseqid') if col in header_line}
+    return _clean_numeric(parse_tsv_block(block, header_line, dtypes))
+
+
+def read_seed_orthologs(file_path: Path) -> pd.DataFrame:
+    """
+    Leer un archivo .emapper.seed_orthologs respetando su encabezado '#qseqid'.
+
+    Las columnas numéricas se convierten a float y las filas con valores no
+    numéricos se descartan. Los archivos grandes se parsean en paralelo.
+
+    Args:
+        file_path: Ruta al archivo de ortólogos semilla
+
+    Returns:
+        DataFrame con las columnas del encabezado
+    """
+    header_line = _read_header(file_path)
+    return read_blocks(file_path, partial(_parse_seed_block, header_line=header_line))
+
+
+def iter_seed_orthologs(file_path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[pd.DataFrame]:
+    """
+    Leer un archivo de ortólogos semilla por bloques alineados a salto de línea.
+
+    Cada bloque pasa por la misma limpieza que read_seed_orthologs; los
+    bloques se parsean en paralelo y se entregan en orden.
+    """
+    header_line = _read_header(file_path)
+    yield from iter_parsed_blocks(file_path, partial(_parse_seed_block, header_line=header_line), chunk_bytes)
+
+
+class SeedSummary(NamedTuple):
+    """Resumen de una pasada sobre un archivo de ortólogos semilla."""
+    stats: StreamingStats       # momentos, correlación, histogramas y cuantiles
+    sample: pd.DataFrame        # muestra uniforme de filas (reservoir sampling)
+    top: pd.DataFrame           # filas con mayor bitscore
+    unique_queries: int         # exacto hasta DistinctSketch.k distintos, luego estimado
+    unique_subjects: int
+    unique_approximate: bool    # algún conteo de distintos es una estimación
+    high_coverage_hits: int     # qcov >= 80 y scov >= 80
+
+
+def new_seed_stats(coverage_bins: int = 20) -> StreamingStats:
+    """Acumulador con los histogramas de bordes fijos que usan los gráficos."""
+    coverage_edges = np.linspace(0, 100, coverage_bins + 1)
+    return StreamingStats(
+        SEED_CORRELATION_COLUMNS,
+        histograms={
+            'evalue': FixedHistogram(np.arange(-300, 3.5, 0.5), log=True),
+        },
+        histograms_2d={
+            ('bitscore', 'pident'): FixedHistogram2D(np.arange(0, 5.05, 0.05), np.arange(0, 102, 2),
+                                                     x_log=True),
+            ('qcov', 'scov'): FixedHistogram2D(coverage_edges, coverage_edges),
+        },
+        log_quantiles=['evalue'])
+
+
+def summarize_seed_orthologs(chunks: Iterable[pd.DataFrame], sample_size: int = 2000,
+                             top_n: int = 50, coverage_bins: int = 20,
+                             seed: Optional[int] = 0) -> SeedSummary:
+    """
+    Resumir bloques de ortólogos semilla en una sola pasada y memoria acotada.
+
+    Los qseqid/sseqid distintos se cuentan con DistinctSketch: exactos en
+    archivos con pocos identificadores y aproximados (~1 %) por encima de k,
+    sin guardar un hash por identificador.
+
+    Args:
+        chunks: Bloques limpios (ver iter_seed_orthologs); un DataFrame
+            completo puede pasarse como único bloque
+        sample_size: Filas de la muestra para superponer en dispersión
+        top_n: Filas con mayor bitscore a conservar
+        coverage_bins: Bins por eje del mapa de coberturas
+        seed: Semilla del muestreo
+
+    Returns:
+        SeedSummary
+    """
+    stats = new_seed_stats(coverage_bins)
+    reservoir = ReservoirSample(sample_size, seed)
+    sample = top = None
+    queries, subjects = DistinctSketch(), DistinctSketch()
+    high_coverage = 0
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        start = reservoir.seen
+        chunk = chunk.set_axis(pd.RangeIndex(start, start + len(chunk)))
+
+        stats.update(chunk)
+        high_coverage += int(((chunk['qcov'] >= 80) & (chunk['scov'] >= 80)).sum())
+        if 'qseqid' in chunk.columns:
+            queries.update(chunk['qseqid'].astype(str).to_numpy())
+        if 'sseqid' in chunk.columns:
+            subjects.update(chunk['sseqid'].astype(str).to_numpy())
+
+        reservoir.update(len(chunk))
+        selected = chunk.loc[chunk.index.intersection(reservoir.indices)]
+        sample = selected if sample is None else pd.concat(
+            [sample[sample.index.isin(reservoir.indices)], selected])
+
+        best = top_n_rows(chunk, 'bitscore', top_n)
+        top = best if top is None else top_n_rows(pd.concat([top, best]), 'bitscore', top_n)
+
+    if sample is None:
+        raise ValueError("No se encontraron datos válidos en el archivo")
+
+    return SeedSummary(stats=stats, sample=sample.sort_index(), top=top,
+                       unique_queries=queries.count(), unique_subjects=subjects.count(),
+                       unique_approximate=queries.approximate or subjects.approximate,
+                       high_coverage_hits=high_coverage)
+
+
+class SeedOrthologsVisualizer(BaseVisualizer):
+    """Visualizador especializado para ortólogos semilla de eggNOG-mapper."""
+
+    def __init__(self, output_dir: Path, config: Dict = None):
+        super().__init__(output_dir, config)
+        self.name = "eggNOG Seed Orthologs"
+        self.top_n = int(self.config.get('top_n', 50))
+        self.scatter_sample = int(self.config.get('scatter_sample', 2000))
+        self.coverage_bins = int(self.config.get('coverage_bins', 20))
+        self.seed = self.config.get('seed', 0)
+        # Archivos mayores se resumen por bloques sin cargarlos completos
+        self.streaming_threshold = int(self.config.get('streaming_threshold_mb', 256)) * 1024 * 1024
+        self.chunk_bytes = int(self.config.get('chunk_mb', DEFAULT_CHUNK_BYTES // (1024 * 1024))) * 1024 * 1024
+        self._summary = None
+
+    def get_supported_extensions(self) -> List[str]:
+        """Extensiones soportadas para ortólogos semilla."""
+        return ['.seed_orthologs', '.orthologs', '.emapper.seed_orthologs']
+
+    def validate_file(self, file_path: Path) -> bool:
+        """Validar que el archivo tenga el encabezado de ortólogos semilla."""
+        try:
+            with open_input(file_path, 'r') as f:
+                for line in f:
+                    if line.startswith('##'):
+                        continue
+                    if line.startswith('#'):
+                        columns = line[1:].strip().split('\t')
+                        missing = [col for col in SEED_NUMERIC_COLUMNS if col not in columns]
+                        if missing:
+                            print(f"❌ Faltan columnas requeridas: {', '.join(missing)}")
+                            return False
+                        print(f"✅ Archivo seed_orthologs válido - {len(columns)} columnas")
+                        return True
+                    break
+
+            print("❌ No se encontró el encabezado '#qseqid' de eggNOG-mapper")
+            return False
+
+        except Exception as e:
+            print(f"❌ Error validando archivo: {e}")
+            return False
+
+    def parse_file(self, file_path: Path) -> pd.DataFrame:
+        """Parsear archivo de ortólogos semilla."""
+        try:
+            df = read_seed_orthologs(file_path)
+            print(f"✅ Parseados {len(df)} ortólogos semilla")
+            return df
+        except Exception as e:
+            raise ValueError(f"Error parseando ortólogos semilla: {str(e)}")
+
+    def _run_stages(self, file_path: Path,
+                    recorder: StageRecorder) -> Tuple[List[str], Dict[str, Any], Dict[str, Any]]:
+        """
+        Etapas de process_file; los archivos grandes se resumen en streaming.
+
+        Los archivos comprimidos siempre se procesan en streaming: su tamaño
+        en disco no indica cuánto ocupan descomprimidos.
+        """
+        if file_path.stat().st_size < self.streaming_threshold and file_compression(file_path) is None:
+            return super()._run_stages(file_path, recorder)
+
+        # Lectura y resumen ocurren juntos: cada bloque se acumula al leerse
+        logger.info(f"🌊 Resumen en streaming: {file_path.name}")
+        with recorder.stage('parse'):
+            summary = self.summarize(iter_seed_orthologs(file_path, self.chunk_bytes))
+        logger.info(f"📊 Datos resumidos: {summary.stats.count} filas")
+
+        recorder.mark()
+        with recorder.stage('visualize'):
+            graphs = self.render_summary(summary)
+        logger.info(f"📈 Generados {len(graphs)} gráficos")
+
+        with recorder.stage('stats'):
+            stats = self.summary_statistics(summary)
+
+        with recorder.stage('summary'):
+            data_summary = {
+                'total_rows': int(summary.stats.count),
+                'total_columns': len(summary.sample.columns),
+                'columns': list(summary.sample.columns),
+                'data_types': {col: str(dtype) for col, dtype in summary.sample.dtypes.items()},
+                'streaming': True
+            }
+
+        return graphs, stats, data_summary
+
+    def summarize(self, chunks: Iterable[pd.DataFrame]) -> SeedSummary:
+        """Resumen de una pasada con la configuración del visualizador."""
+        return summarize_seed_orthologs(chunks, sample_size=self.scatter_sample, top_n=self.top_n,
+                                        coverage_bins=self.coverage_bins, seed=self.seed)
+
+    def get_summary(self, data: pd.DataFrame) -> SeedSummary:
+        """Resumen del DataFrame completo, calculado una vez por DataFrame."""
+        if self._summary is None or self._summary[0] is not data:
+            self._summary = (data, self.summarize([data]))
+        return self._summary[1]
+
+    def generate_visualizations(self, data: pd.DataFrame) -> List[str]:
+        """Generar todas las visualizaciones de ortólogos semilla."""
+        return self.render_summary(self.get_summary(data))
+
+    def render_summary(self, summary: SeedSummary) -> List[str]:
+        """Dibujar todos los gráficos desde un resumen."""
+        graphs = []
+
+        plots = [
+            (self._plot_evalue_distribution, 'distribución de e-values'),
+            (self._plot_bitscore_vs_pident, 'bitscore vs. identidad'),
+            (self._plot_bitscore_per_sequence, 'bitscore por secuencia'),
+            (self._plot_coverage_heatmap, 'mapa de calor de coberturas'),
+            (self._plot_correlation_matrix, 'matriz de correlación'),
+        ]
+        for plot, label in plots:
+            try:
+                graphs.append(plot(summary))
+            except Exception as e:
+                print(f"Error creando {label}: {e}")
+
+        return [g for g in graphs if g]
+
+    def generate_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Generar estadísticas de ortólogos semilla."""
+        return self.summary_statistics(self.get_summary(data))
+
+    def summary_statistics(self, summary: SeedSummary) -> Dict[str, Any]:
+        """Estadísticas servidas desde el resumen de una pasada."""
+        describe = summary.stats.describe()
+        stats = {
+            'total_hits': int(summary.stats.count),
+            'unique_queries': summary.unique_queries,
+            'unique_subjects': summary.unique_subjects,
+            'unique_counts_approximate': summary.unique_approximate,
+            'mean_bitscore': describe['bitscore']['mean'],
+            'median_evalue': describe['evalue']['q50'],
+            'mean_pident': describe['pident']['mean'],
+            'mean_qcov': describe['qcov']['mean'],
+            'mean_scov': describe['scov']['mean'],
+            'high_coverage_hits': summary.high_coverage_hits,
+            'columns': describe,
+        }
+        return stats
+
+    # ========== GRÁFICOS ==========
+
+    def _plot_evalue_distribution(self, summary: SeedSummary) -> str:
+        """Histograma de e-values con bins logarítmicos."""
+        histogram = summary.stats.histograms['evalue']
+        counts, edges = histogram.trimmed()
+
+        plt.figure(figsize=(10, 6))
+        plt.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                color='skyblue', edgecolor='white')
+        plt.xscale('log')
+        plt.title('Distribución de e-values', fontsize=16, fontweight='bold')
+        plt.xlabel('e-value')
+        plt.ylabel('Frecuencia')
+        if histogram.nonpositive:
+            plt.annotate(f'{histogram.nonpositive:,} hits con e-value = 0', xy=(0.02, 0.95),
+                         xycoords='axes fraction', va='top')
+        plt.tight_layout()
+
+        return self.save_figure('evalue_distribution')
+
+    def _plot_bitscore_vs_pident(self, summary: SeedSummary) -> str:
+        """Densidad 2D de bitscore vs. identidad con muestra superpuesta."""
+        histogram = summary.stats.histograms_2d[('bitscore', 'pident')]
+        counts = np.ma.masked_equal(histogram.counts.T, 0)
+
+        fig, ax = plt.subplots(figsize=(10, 6))
+        mesh = ax.pcolormesh(histogram.x.bin_edges(), histogram.y.bin_edges(), counts,
+                             cmap='viridis', norm=LogNorm(vmin=1, vmax=max(1, counts.max())))
+        fig.colorbar(mesh, ax=ax, label='Número de hits')
+
+        sample = summary.sample
+        ax.scatter(sample['bitscore'], sample['pident'], s=4, alpha=0.35,
+                   color='coral', edgecolors='none',
+                   label=f'Muestra aleatoria ({len(sample):,} de {summary.stats.count:,})')
+        ax.legend(loc='lower right')
+
+        nonzero = np.flatnonzero(histogram.counts.sum(axis=1))
+        if len(nonzero):
+            edges = histogram.x.bin_edges()
+            ax.set_xlim(edges[nonzero[0]], edges[nonzero[-1] + 1])
+        ax.set_xscale('log')
+        ax.set_title('Bitscore vs. Porcentaje de Identidad', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Bitscore (escala logarítmica)')
+        ax.set_ylabel('Porcentaje de Identidad (%)')
+        plt.tight_layout()
+
+        return self.save_figure('bitscore_vs_pident', fig)
+
+    def _plot_bitscore_per_sequence(self, summary: SeedSummary) -> str:
+        """Bitscore de las secuencias de consulta con mejor puntuación."""
+        top = summary.top
+
+        plt.figure(figsize=(12, 8))
+        plt.bar(range(len(top)), top['bitscore'].values,
+                color=sns.color_palette('muted', len(top)))
+        plt.xticks(range(len(top)), top['qseqid'].astype(str), rotation=90)
+        plt.title(f'Bitscore por Secuencia de Consulta (Top {self.top_n})', fontsize=16, fontweight='bold')
+        plt.xlabel('ID de Secuencia de Consulta')
+        plt.ylabel('Bitscore')
+        plt.tight_layout()
+
+        return self.save_figure('bitscore_per_sequence')
+
+    def _plot_coverage_heatmap(self, summary: SeedSummary) -> str:
+        """Mapa de calor de coberturas agregado en bins de qcov x scov."""
+        histogram = summary.stats.histograms_2d[('qcov', 'scov')]
+        labels = [f'{edge:.0f}' for edge in histogram.x.edges[:-1]]
+        heatmap = pd.DataFrame(histogram.counts.T, index=labels, columns=labels).iloc[::-1]
+
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(heatmap.where(heatmap > 0), cmap='viridis',
+                    norm=LogNorm(vmin=1, vmax=max(1, histogram.counts.max())),
+                    cbar_kws={'label': 'Número de hits'})
+        plt.title('Mapa de Calor de Coberturas', fontsize=16, fontweight='bold')
+        plt.xlabel('Cobertura de la consulta, qcov (%)')
+        plt.ylabel('Cobertura del sujeto, scov (%)')
+        plt.tight_layout()
+
+        return self.save_figure('coverage_heatmap')
+
+    def _plot_correlation_matrix(self, summary: SeedSummary) -> str:
+        """Matriz de correlación entre las métricas numéricas."""
+        corr_matrix = summary.stats.correlation
+
+        plt.figure(figsize=(8, 6))
+        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
+        plt.title('Matriz de Correlación', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+
+        return self.save_figure('correlation_matrix')
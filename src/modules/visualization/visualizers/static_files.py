@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Servicio de Gráficos Generados
+==============================
+
+Sirve los archivos de OUTPUT_DIR con validadores de caché:
+
+- ETag fuerte: SHA-256 del contenido (cacheado por ruta, tamaño y mtime,
+  de modo que cada archivo se lee una sola vez por proceso).
+- URLs con versión: versioned_url() añade `?v=<hash>`; una petición cuya
+  versión coincide con el contenido se marca como inmutable durante un año.
+  Sin versión (o con una antigua) se responde `no-cache` y el navegador
+  revalida con If-None-Match, que se contesta con 304 sin abrir el archivo.
+- Rangos: werkzeug atiende `Range` (206) al enviar el archivo.
+- Proxy frontal (opcional, VISUALIZATION_SENDFILE):
+    'x-sendfile'       -> cabecera X-Sendfile con la ruta absoluta (Apache, lighttpd)
+    'x-accel-redirect' -> cabecera X-Accel-Redirect con
+                          VISUALIZATION_ACCEL_PREFIX + ruta relativa (nginx)
+  En ambos casos el proxy transmite el archivo y Python no copia ningún byte.
+"""
+
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from flask import current_app, request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+HASH_CHUNK_BYTES = 1 << 20
+# Caracteres del hash usados como versión en las URLs
+VERSION_LENGTH = 16
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+SENDFILE_MODES = ('x-sendfile', 'x-accel-redirect')
+
+
+@lru_cache(maxsize=4096)
+def _hash_file(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(file_path: Path) -> str:
+    """SHA-256 del contenido (recalculado sólo si cambian tamaño o mtime)."""
+    stat = os.stat(file_path)
+    return _hash_file(str(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def versioned_url(prefix: str, root: Path, file_path: Path) -> str:
+    """
+    URL con versión de contenido para un archivo bajo root.
+
+    Args:
+        prefix: Prefijo de la ruta (p. ej. '/graphs')
+        root: Directorio servido
+        file_path: Archivo dentro de root
+
+    Returns:
+        URL del tipo '/graphs/<trabajo>/<archivo>?v=<hash>'
+    """
+    relative_path = Path(file_path).relative_to(root).as_posix()
+    return f"{prefix}/{relative_path}?v={content_hash(file_path)[:VERSION_LENGTH]}"
+
+
+def sendfile_mode() -> Optional[str]:
+    mode = os.environ.get('VISUALIZATION_SENDFILE', '').strip().lower()
+    return mode if mode in SENDFILE_MODES else None
+
+
+def _set_cache_headers(response, digest: str) -> None:
+    response.set_etag(digest)
+    if request.args.get('v') == digest[:VERSION_LENGTH]:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+
+def send_static(root: Path, filename: str):
+    """
+    Respuesta para un archivo bajo root con ETag, 304, rangos y sendfile.
+
+    Args:
+        root: Directorio servido
+        filename: Ruta relativa pedida por el cliente
+
+    Returns:
+        Respuesta de Flask
+
+    Raises:
+        NotFound: Si la ruta sale de root o el archivo no existe
+    """
+    # Los archivos y directorios ocultos (índice, perfiles) no se sirven
+    if any(part.startswith('.') for part in Path(filename).parts):
+        raise NotFound()
+    path = safe_join(str(root), filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    digest = content_hash(path)
+    response_class = current_app.response_class
+
+    # Revalidación: 304 sin abrir el archivo
+    if request.if_none_match.contains(digest):
+        response = response_class(status=304)
+        _set_cache_headers(response, digest)
+        return response
+
+    mode = sendfile_mode()
+    if mode == 'x-accel-redirect':
+        prefix = os.environ.get('VISUALIZATION_ACCEL_PREFIX', '/protected-graphs/')
+        response = response_class(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + Path(path).relative_to(root).as_posix()
+    else:
+        response = send_file(path, request.environ, conditional=True, etag=digest,
+                             use_x_sendfile=mode == 'x-sendfile', response_class=response_class)
+    _set_cache_headers(response, digest)
+    return response
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Estadísticas en Streaming para Columnas Numéricas
+=================================================
+
+Acumuladores de una sola pasada y memoria constante para resumir archivos
+tabulares grandes leídos por bloques (p. ej. ortólogos semilla):
+
+- Media, varianza y covarianza con la actualización por bloques de
+  Welford/Chan (numéricamente estable), de la que sale la matriz de correlación
+- Histogramas 1D y 2D de bordes fijos, opcionalmente sobre log10
+- Cuantiles aproximados con t-digest (variante "merging", escala k1)
+- Conteo aproximado de valores distintos con un sketch KMV (k valores mínimos)
+
+Todos los acumuladores admiten merge(), por lo que también pueden
+combinarse resultados calculados en paralelo sobre distintos bloques.
+
+Para datos ya cargados en memoria, describe_values()/describe_columns() dan
+el mismo resumen de forma exacta: una copia de los valores finitos, una
+única selección parcial (np.partition) para mínimo, máximo y todos los
+cuantiles, y los momentos sobre esa misma copia. Es el núcleo compartido por
+generate_statistics y generate_data_summary de los visualizadores.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def quantile_key(q: float) -> str:
+    """Clave de un cuantil en los resúmenes (0.05 -> 'q05', 0.5 -> 'q50')."""
+    return f'q{int(round(q * 100)):02d}'
+
+
+class TDigest:
+    """
+    Resumen t-digest para cuantiles aproximados en memoria acotada.
+
+    Los valores se acumulan en un búfer y se fusionan con los centroides
+    existentes; cada centroide abarca como máximo una unidad de la función de
+    escala k1(q) = compression / (2π) · asin(2q − 1), lo que da más resolución
+    en las colas (q cercano a 0 o 1) que en la mediana.
+
+    Con log=True el resumen se construye sobre log10 de los valores (valores
+    <= 0 se acotan a 1e-300), adecuado para E-values que abarcan cientos de
+    órdenes de magnitud.
+    """
+
+    def __init__(self, compression: float = 200, buffer_size: int = 50_000, log: bool = False):
+        self.compression = float(compression)
+        self.buffer_size = int(buffer_size)
+        self.log = log
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        """Número de valores acumulados."""
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values: np.ndarray) -> None:
+        """Añadir valores (los no finitos se ignoran)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        if self.log:
+            values = np.log10(np.maximum(values, 1e-300))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other: 'TDigest') -> None:
+        """Incorporar los centroides de otro t-digest."""
+        other._compress()
+        if len(other.means) == 0:
+            return
+        self._compress()
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._merge_centroids(np.concatenate([self.means, other.means]),
+                              np.concatenate([self.weights, other.weights]))
+
+    def _compress(self) -> None:
+        """Fusionar el búfer con los centroides existentes."""
+        if not self._buffer:
+            return
+        buffered = np.concatenate(self._buffer)
+        self._buffer, self._buffered = [], 0
+        self._merge_centroids(np.concatenate([self.means, buffered]),
+                              np.concatenate([self.weights, np.ones(len(buffered))]))
+
+    def _merge_centroids(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # Grupo de cada centroide: unidad de k1 en la que cae su cuantil derecho
+        q = np.clip(np.cumsum(weights) / total, 0.0, 1.0)
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        _, groups = np.unique(groups, return_inverse=True)
+
+        merged_weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=weights * means) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q) -> np.ndarray:
+        """Cuantiles aproximados (q en [0, 1], escalar o arreglo)."""
+        self._compress()
+        q = np.asarray(q, dtype=np.float64)
+        if len(self.means) == 0:
+            return np.full(q.shape, np.nan)
+
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(q * total, positions, values)
+        return 10.0 ** result if self.log else result
+
+
+class FixedHistogram:
+    """
+    Histograma de bordes fijos, opcionalmente sobre log10 de los valores.
+
+    Los valores fuera de rango se acumulan en los bins extremos para que el
+    total coincida con el número de valores. Con log=True los valores <= 0 se
+    cuentan aparte en `nonpositive`.
+    """
+
+    def __init__(self, edges: Sequence[float], log: bool = False):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.log = log
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.nonpositive = 0
+
+    def _transform(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if self.log:
+            positive = values > 0
+            self.nonpositive += int(len(values) - positive.sum())
+            values = np.log10(values[positive])
+        return values
+
+    def _bin(self, values: np.ndarray) -> np.ndarray:
+        bins = np.searchsorted(self.edges, values, side='right') - 1
+        return np.clip(bins, 0, len(self.counts) - 1)
+
+    def update(self, values: np.ndarray) -> None:
+        """Añadir valores."""
+        values = self._transform(values)
+        self.counts += np.bincount(self._bin(values), minlength=len(self.counts))
+
+    def merge(self, other: 'FixedHistogram') -> None:
+        """Sumar otro histograma con los mismos bordes."""
+        self.counts += other.counts
+        self.nonpositive += other.nonpositive
+
+    def bin_edges(self) -> np.ndarray:
+        """Bordes en la escala original de los valores."""
+        return 10.0 ** self.edges if self.log else self.edges
+
+    def trimmed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Conteos y bordes (escala original) sin los bins vacíos de los extremos."""
+        nonzero = np.flatnonzero(self.counts)
+        if len(nonzero) == 0:
+            return self.counts[:0], self.bin_edges()[:1]
+        first, last = nonzero[0], nonzero[-1] + 1
+        return self.counts[first:last], self.bin_edges()[first:last + 1]
+
+
+class FixedHistogram2D:
+    """Histograma 2D de bordes fijos (cada eje puede ir en log10)."""
+
+    def __init__(self, x_edges: Sequence[float], y_edges: Sequence[float],
+                 x_log: bool = False, y_log: bool = False):
+        self.x = FixedHistogram(x_edges, x_log)
+        self.y = FixedHistogram(y_edges, y_log)
+        self.counts = np.zeros((len(self.x.counts), len(self.y.counts)), dtype=np.int64)
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Añadir pares (x, y); se descartan los no finitos o no positivos en ejes log."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        valid = np.isfinite(x) & np.isfinite(y)
+        if self.x.log:
+            valid &= x > 0
+        if self.y.log:
+            valid &= y > 0
+        x, y = x[valid], y[valid]
+        if self.x.log:
+            x = np.log10(x)
+        if self.y.log:
+            y = np.log10(y)
+
+        flat = self.x._bin(x) * self.counts.shape[1] + self.y._bin(y)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other: 'FixedHistogram2D') -> None:
+        """Sumar otro histograma 2D con los mismos bordes."""
+        self.counts += other.counts
+
+
+class DistinctSketch:
+    """
+    Conteo de valores distintos en memoria constante (sketch KMV).
+
+    Conserva los k hashes de 64 bits más pequeños. Mientras haya menos de k
+    valores distintos el conteo es exacto; a partir de ahí se estima como
+    (k - 1) / (h_k / 2^64), con h_k el mayor hash conservado, y el error
+    relativo típico es 1 / sqrt(k - 2) (~0.8 % con k = 16384).
+    """
+
+    def __init__(self, k: int = 16384):
+        self.k = int(k)
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    @property
+    def approximate(self) -> bool:
+        """True si el sketch está lleno y count() es una estimación."""
+        return len(self.hashes) >= self.k
+
+    def _add(self, hashes: np.ndarray) -> None:
+        if self.approximate:
+            # Sólo pueden entrar los hashes menores que el k-ésimo actual
+            hashes = hashes[hashes < self.hashes[-1]]
+            if len(hashes) == 0:
+                return
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.k]
+
+    def update(self, values) -> None:
+        """Añadir valores (cadenas u otros objetos con hash de pandas)."""
+        self._add(pd.util.hash_array(np.asarray(values, dtype=object)))
+
+    def merge(self, other: 'DistinctSketch') -> None:
+        """Combinar con otro sketch del mismo k."""
+        self._add(other.hashes)
+
+    def count(self) -> int:
+        """Número (exacto o estimado) de valores distintos."""
+        if not self.approximate:
+            return len(self.hashes)
+        return int(round((self.k - 1) / ((float(self.hashes[-1]) + 1.0) / 2.0 ** 64)))
+
+
+class StreamingStats:
+    """
+    Acumulador de una pasada para varias columnas numéricas.
+
+    Cada bloque se reduce a (n, media, co-momentos) y se combina con lo
+    acumulado usando la fórmula de Chan para Welford por bloques. Las filas
+    con algún valor no numérico en las columnas seguidas se descartan, igual
+    que dropna(subset=columns).
+
+    Args:
+        columns: Columnas numéricas a resumir
+        histograms: Histogramas 1D por columna
+        histograms_2d: Histogramas 2D por par de columnas (x, y)
+        compression: Compresión de los t-digest por columna
+        log_quantiles: Columnas cuyos cuantiles se estiman en escala log10
+    """
+
+    def __init__(self, columns: Sequence[str],
+                 histograms: Optional[Dict[str, FixedHistogram]] = None,
+                 histograms_2d: Optional[Dict[Tuple[str, str], FixedHistogram2D]] = None,
+                 compression: float = 200, log_quantiles: Sequence[str] = ()):
+        self.columns = list(columns)
+        self.histograms = histograms or {}
+        self.histograms_2d = histograms_2d or {}
+        self.digests = {col: TDigest(compression, log=col in log_quantiles) for col in self.columns}
+
+        p = len(self.columns)
+        self.count = 0
+        self._mean = np.zeros(p)
+        self._comoment = np.zeros((p, p))
+        self._min = np.full(p, np.inf)
+        self._max = np.full(p, -np.inf)
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Acumular un bloque de filas."""
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        values = values[np.isfinite(values).all(axis=1)]
+        n = len(values)
+        if n == 0:
+            return
+
+        mean = values.mean(axis=0)
+        centered = values - mean
+        self._combine(n, mean, centered.T @ centered)
+        self._min = np.minimum(self._min, values.min(axis=0))
+        self._max = np.maximum(self._max, values.max(axis=0))
+
+        for j, col in enumerate(self.columns):
+            self.digests[col].update(values[:, j])
+            if col in self.histograms:
+                self.histograms[col].update(values[:, j])
+        for (x, y), hist in self.histograms_2d.items():
+            hist.update(values[:, self.columns.index(x)], values[:, self.columns.index(y)])
+
+    def merge(self, other: 'StreamingStats') -> None:
+        """Combinar con un acumulador de las mismas columnas."""
+        if other.count == 0:
+            return
+        self._combine(other.count, other._mean, other._comoment)
+        self._min = np.minimum(self._min, other._min)
+        self._max = np.maximum(self._max, other._max)
+        for col in self.columns:
+            self.digests[col].merge(other.digests[col])
+        for col, hist in self.histograms.items():
+            hist.merge(other.histograms[col])
+        for key, hist in self.histograms_2d.items():
+            hist.merge(other.histograms_2d[key])
+
+    def _combine(self, n: int, mean: np.ndarray, comoment: np.ndarray) -> None:
+        total = self.count + n
+        delta = mean - self._mean
+        self._comoment += comoment + np.outer(delta, delta) * (self.count * n / total)
+        self._mean += delta * (n / total)
+        self.count = total
+
+    # ========== RESULTADOS ==========
+
+    @property
+    def mean(self) -> pd.Series:
+        return pd.Series(self._mean if self.count else np.nan, index=self.columns)
+
+    @property
+    def variance(self) -> pd.Series:
+        """Varianza muestral (ddof=1)."""
+        return pd.Series(np.diag(self.covariance.to_numpy()), index=self.columns)
+
+    @property
+    def std(self) -> pd.Series:
+        return np.sqrt(self.variance)
+
+    @property
+    def covariance(self) -> pd.DataFrame:
+        """Matriz de covarianza muestral (ddof=1)."""
+        cov = self._comoment / (self.count - 1) if self.count > 1 else np.full_like(self._comoment, np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    @property
+    def correlation(self) -> pd.DataFrame:
+        """Matriz de correlación de Pearson (como DataFrame.corr())."""
+        cov = self.covariance.to_numpy()
+        scale = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(scale, scale)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def quantiles(self, q: Iterable[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        """Cuantiles aproximados (filas = q, columnas = variables)."""
+        q = np.asarray(list(q), dtype=np.float64)
+        return pd.DataFrame({col: self.digests[col].quantile(q) for col in self.columns}, index=q)
+
+    def describe(self) -> Dict[str, Dict[str, float]]:
+        """Resumen serializable por columna (similar a DataFrame.describe())."""
+        quantiles = self.quantiles(DEFAULT_QUANTILES)
+        mean, std = self.mean, self.std
+        summary = {}
+        for j, col in enumerate(self.columns):
+            summary[col] = {
+                'count': int(self.count),
+                'mean': float(mean[col]),
+                'std': float(std[col]),
+                'min': float(self._min[j]),
+                'max': float(self._max[j]),
+                **{quantile_key(q): float(v) for q, v in quantiles[col].items()}
+            }
+        return summary
+
+
+# ========== RESUMEN EXACTO EN MEMORIA ==========
+
+def describe_values(values, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+    """
+    Resumen exacto de un vector numérico (los valores no finitos se ignoran).
+
+    Sustituye a las llamadas sueltas mean()/std()/min()/max()/median()/
+    quantile() de pandas, cada una de las cuales recorre (y, en el caso de
+    los cuantiles, ordena) la columna por separado:
+
+    - Se copian una vez los valores finitos y se hace una sola selección
+      parcial con todas las posiciones necesarias (0, n-1 y los dos vecinos
+      de cada cuantil), de la que salen mínimo, máximo y cuantiles.
+    - Media y varianza muestral (ddof=1) se calculan sobre la misma copia,
+      centrándola en el sitio.
+
+    Los cuantiles usan interpolación lineal, como pandas y numpy por defecto.
+
+    Returns:
+        {'count', 'mean', 'std', 'min', 'max', 'q05', ...} con floats de Python
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    values = values[np.isfinite(values)]  # copia propia, se puede reordenar
+    n = len(values)
+    keys = [quantile_key(q) for q in quantiles]
+    if n == 0:
+        return {'count': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan,
+                **{key: np.nan for key in keys}}
+
+    position = np.asarray(quantiles, dtype=np.float64) * (n - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    values.partition(np.unique(np.concatenate(([0, n - 1], lower, upper))))
+
+    low, high = values[lower], values[upper]
+    quantile_values = low + (position - lower) * (high - low)
+    minimum, maximum = float(values[0]), float(values[n - 1])
+
+    mean = values.sum() / n
+    values -= mean
+    summary = {
+        'count': n,
+        'mean': float(mean),
+        'std': float(np.sqrt(np.dot(values, values) / (n - 1))) if n > 1 else np.nan,
+        'min': minimum,
+        'max': maximum,
+    }
+    summary.update((key, float(v)) for key, v in zip(keys, quantile_values))
+    return summary
+
+
+def describe_columns(data: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                     quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Dict[str, float]]:
+    """
+    describe_values() para varias columnas de un DataFrame.
+
+    Args:
+        data: DataFrame en memoria
+        columns: Columnas a resumir (por defecto, todas las numéricas)
+        quantiles: Cuantiles a calcular
+
+    Returns:
+        Resumen por columna, con las mismas claves que StreamingStats.describe()
+    """
+    if columns is None:
+        columns = [col for col, dtype in data.dtypes.items()
+                   if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+    return {col: describe_values(data[col].to_numpy(dtype=np.float64, na_value=np.nan), quantiles)
+            for col in columns if col in data.columns}
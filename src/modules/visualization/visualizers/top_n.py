@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Selección Parcial Top-N
+=======================
+
+Primitivas de selección en tiempo lineal para los gráficos "Top N":
+np.argpartition separa los N mejores sin ordenar el arreglo completo y sólo
+esos N se ordenan después. Los empates se resuelven por posición, igual que
+un ordenamiento estable, para que los gráficos sean reproducibles.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def top_n_indices(values, n: int, largest: bool = True) -> np.ndarray:
+    """
+    Índices de los N mejores valores, ordenados del mejor al peor.
+
+    Los NaN se consideran los peores valores.
+
+    Args:
+        values: Arreglo 1D de valores numéricos
+        n: Número de elementos a seleccionar
+        largest: True para los mayores, False para los menores
+
+    Returns:
+        Arreglo de índices (int64) de longitud min(n, len(values))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    key = -values if largest else values.copy()
+    key[np.isnan(key)] = np.inf
+    n = max(0, min(int(n), len(key)))
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if n < len(key):
+        threshold = np.partition(key, n - 1)[n - 1]
+        better = np.flatnonzero(key < threshold)
+        ties = np.flatnonzero(key == threshold)[:n - len(better)]
+        selected = np.sort(np.concatenate([better, ties]))
+    else:
+        selected = np.arange(len(key))
+
+    return selected[np.argsort(key[selected], kind='stable')]
+
+
+def top_n_rows(frame: pd.DataFrame, column: str, n: int, largest: bool = True) -> pd.DataFrame:
+    """Filas con los N mejores valores de una columna (como nlargest/nsmallest)."""
+    return frame.iloc[top_n_indices(frame[column].to_numpy(), n, largest)]
+
+
+def nearest_neighbors(distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    K vecinos más cercanos por fila de una matriz de distancias cuadrada.
+
+    La diagonal (cada elemento consigo mismo) se excluye.
+
+    Args:
+        distances: Matriz (n, n) de distancias
+        k: Vecinos por fila
+
+    Returns:
+        Tupla (índices, distancias) de forma (n, min(k, n - 1)), ordenadas
+        de más cercano a más lejano
+    """
+    distances = np.array(distances, dtype=np.float64)
+    np.fill_diagonal(distances, np.inf)
+    k = max(0, min(int(k), distances.shape[1] - 1))
+    if k == 0:
+        empty = np.empty((len(distances), 0))
+        return empty.astype(np.int64), empty
+
+    candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+    order = np.argsort(candidate_distances, axis=1, kind='stable')
+    return (np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(candidate_distances, order, axis=1))
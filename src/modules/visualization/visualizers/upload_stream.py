@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Recepción de Archivos en Streaming
+==================================
+
+Destino de escritura para las subidas multipart: Werkzeug escribe cada
+fragmento del cuerpo de la petición directamente en un archivo de
+UPLOAD_DIR y, en la misma pasada, se calcula el SHA-256, se guarda la
+cabecera del archivo para la detección de tipo y se cuentan las líneas.
+Al aceptar la subida el archivo sólo se renombra (sin copiarlo), de modo
+que un archivo de varios GB se recorre una única vez antes del parseo.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, NamedTuple
+
+# Bytes iniciales que se conservan para detectar el tipo de archivo
+SNIFF_BYTES = 8192
+
+COPY_CHUNK_BYTES = 1 << 20
+
+
+class UploadInfo(NamedTuple):
+    """Resultado de recibir un archivo subido."""
+    path: Path
+    sha256: str
+    size: int
+    lines: int
+    head: bytes
+
+    def summary(self) -> Dict[str, Any]:
+        """Metadatos serializables para la respuesta JSON."""
+        return {
+            'sha256': self.sha256,
+            'size_bytes': self.size,
+            'lines': self.lines
+        }
+
+
+class UploadSink:
+    """
+    Archivo temporal en disco que hashea, muestrea y cuenta líneas a medida
+    que se escribe. Se usa como stream_factory de Werkzeug.
+
+    Si la subida no se acepta con commit(), el archivo se elimina al cerrarse
+    (Flask cierra los archivos de la petición al terminarla).
+    """
+
+    def __init__(self, directory: Path, sniff_bytes: int = SNIFF_BYTES):
+        fd, name = tempfile.mkstemp(prefix='.upload_', suffix='.part', dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+        self.path = Path(name)
+        self.sniff_bytes = sniff_bytes
+        self.size = 0
+        self.newlines = 0
+        self.committed = False
+        self._sha256 = hashlib.sha256()
+        self._head = bytearray()
+        self._last_byte = b''
+
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        self._sha256.update(data)
+        if len(self._head) < self.sniff_bytes:
+            self._head += data[:self.sniff_bytes - len(self._head)]
+        self.newlines += data.count(b'\n')
+        self._last_byte = data[-1:]
+        self.size += len(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        # read, seek, tell, flush... se delegan al archivo real
+        return getattr(self._file, name)
+
+    @property
+    def lines(self) -> int:
+        """Número de líneas (la última puede no terminar en salto de línea)."""
+        unterminated = self.size > 0 and self._last_byte != b'\n'
+        return self.newlines + int(unterminated)
+
+    def commit(self, destination: Path) -> UploadInfo:
+        """
+        Aceptar la subida moviendo el archivo a su ruta definitiva.
+
+        Args:
+            destination: Ruta final (en el mismo sistema de archivos)
+
+        Returns:
+            UploadInfo con hash, tamaño, líneas y cabecera
+        """
+        self._file.flush()
+        os.replace(self.path, destination)
+        self.path = Path(destination)
+        self.committed = True
+        return UploadInfo(self.path, self._sha256.hexdigest(), self.size, self.lines, bytes(self._head))
+
+    def close(self) -> None:
+        self._file.close()
+        if not self.committed:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_upload(file, destination: Path) -> UploadInfo:
+    """
+    Guardar un FileStorage en destination y devolver sus metadatos.
+
+    Si la petición se recibió con UploadSink el archivo ya está en disco y
+    sólo se renombra; en otro caso (p. ej. el stream por defecto de
+    Werkzeug) se copia por bloques calculando los mismos metadatos.
+
+    Args:
+        file: werkzeug.datastructures.FileStorage
+        destination: Ruta final del archivo
+
+    Returns:
+        UploadInfo del archivo guardado
+    """
+    if isinstance(file.stream, UploadSink):
+        return file.stream.commit(destination)
+
+    with UploadSink(Path(destination).parent) as sink:
+        shutil.copyfileobj(file.stream, sink, COPY_CHUNK_BYTES)
+        return sink.commit(destination)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Preparación del Stack Científico
+================================
+
+Configuración de estilo de matplotlib y precarga de las dependencias
+pesadas de los visualizadores. En producción (gunicorn.conf.py) warm_up()
+se ejecuta en el proceso maestro antes de crear los workers, que heredan los
+módulos ya importados, la caché de fuentes y el backend Agg inicializado.
+"""
+
+import importlib
+import io
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Módulos pesados que usan los visualizadores
+PRELOAD_MODULES = [
+    'numpy',
+    'pandas',
+    'matplotlib.pyplot',
+    'seaborn',
+    'scipy.stats',
+    'scipy.sparse',
+    'scipy.cluster.hierarchy',
+    'scipy.spatial.distance',
+    'sklearn.manifold',
+    # Visualizadores (app.py los importa bajo demanda)
+    'visualizers.base_visualizer',
+    'visualizers.bindash_visualizer',
+    'visualizers.annotations_visualizer',
+    'visualizers.hmmer_visualizer',
+    'visualizers.seed_orthologs_visualizer',
+    'visualizers.enrichment',
+]
+
+_style_ready = False
+
+
+def setup_plot_style() -> None:
+    """Aplicar el estilo común de los gráficos (una sola vez por proceso)."""
+    global _style_ready
+    if _style_ready:
+        return
+
+    import matplotlib
+    matplotlib.use('Agg')  # Backend no interactivo
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    _style_ready = True
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Precargar módulos, construir la caché de fuentes y renderizar una figura
+    mínima para que la primera petición real no pague esos costos.
+
+    Returns:
+        Segundos empleados por etapa
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"⚠️ No se pudo precargar {module}: {e}")
+    timings['imports'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    setup_plot_style()
+    from matplotlib import font_manager
+    font_manager.fontManager.findfont('DejaVu Sans')
+    timings['style'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(1, 1))
+    ax.plot([0, 1], [0, 1])
+    ax.set_title('warmup')
+    fig.savefig(io.BytesIO(), format='png', dpi=72)
+    plt.close(fig)
+    timings['render'] = time.perf_counter() - start
+
+    logger.info("🔥 Stack científico precargado: " +
+                ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+    return timings